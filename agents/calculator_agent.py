@@ -1,61 +1,94 @@
 from state import AgentState
-from llms.ollama_llms import llm_agent # LLM specifically bound to tools
-from tools.tools import tools # All available tools
+from llms import ollama_llms # LLMs are built on first use; access them as 'ollama_llms.llm_calculator'
+from tools.tools import perform_calculation, evaluate_expression
+from tools.executor import build_tool_index, execute_tool_calls, aexecute_tool_calls # Shared concurrent tool executor
+from agents.context import context_projector # Trims the history to what this agent needs
+from supervisor.speculation import speculative_executor # Commits a speculative first LLM call
 from langchain_core.messages import HumanMessage, ToolMessage, AIMessage
+from typing import List
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Tool index restricted to the tools this agent is allowed to execute (and its LLM is bound to).
+CALCULATOR_TOOLS = build_tool_index([perform_calculation, evaluate_expression])
+
+def _calculator_update(state: AgentState, response: AIMessage, executions: List) -> dict:
+    """
+    Builds the calculator agent's state update from the LLM response and the executed tool calls.
+    """
+    # Collect only the messages produced during this step; the state reducer appends them
+    # to the conversation history, so the existing history must not be returned again.
+    new_messages = [response]
+    # A direct answer (no tool calls) is final, so the graph can end without a supervisor round trip.
+    handoff = "END"
+
+    if executions:
+        # Add all generated ToolMessages (results) to this step's update.
+        new_messages.extend(execution.message for execution in executions)
+        logger.info("---Tool messages added to state---")
+
+        # The calculation results are the answer, so the run ends here. Only if a tool failed does the
+        # flow return to the supervisor, which may route back to the calculator agent or to a
+        # different agent to recover.
+        handoff = "END" if all(execution.ok for execution in executions) else None
+
+    return {"messages": new_messages, "handoff": handoff, "steps": state.get('steps', 0) + 1}
+
+def call_llm(state: AgentState) -> AIMessage:
+    """
+    The agent's first step: the response of the LLM bound to this agent's tools, called with the
+    agent's projection of the conversation (see agents/context.py). It has no side effects, so the
+    supervisor may start it speculatively (see supervisor/speculation.py).
+    """
+    messages = context_projector.for_agent("calculator_agent", state['messages'], CALCULATOR_TOOLS)
+    return ollama_llms.llm_calculator.invoke(messages)
+
+async def acall_llm(state: AgentState) -> AIMessage:
+    """Async variant of 'call_llm'."""
+    messages = context_projector.for_agent("calculator_agent", state['messages'], CALCULATOR_TOOLS)
+    return await ollama_llms.llm_calculator.ainvoke(messages)
 
 def calculator_agent(state: AgentState) -> AgentState:
     """
     An agent designed to handle mathematical calculation requests.
-    It uses a tool-calling LLM to decide if and how to use the 'perform_calculation' tool,
-    and then manually executes the tool.
+    It uses a tool-calling LLM to decide if and how to use the calculation tools ('evaluate_expression'
+    for whole expressions and lists of values, 'perform_calculation' for a single operation), and then
+    executes the requested tool calls through the shared tool executor. A multi-step calculation is
+    a single 'evaluate_expression' call, so it takes one LLM turn.
     """
-    print("---Executing Calculator Agent---")
-    messages = state['messages']
+    logger.info("---Executing Calculator Agent---")
 
-    # Invoke the tool-calling LLM.
-    # The LLM analyzes the messages and decides if a tool call (specifically 'perform_calculation')
+    # Invoke the tool-calling LLM, unless the supervisor already ran this call speculatively.
+    # The LLM analyzes the messages and decides if a tool call (e.g., 'evaluate_expression')
     # is needed to fulfill the request.
-    response = llm_agent.invoke(messages)
-
-    # Add the LLM's response (which may contain tool calls or a direct answer) to the state.
-    messages.append(response)
+    response = speculative_executor.take("calculator_agent", state) or call_llm(state)
 
-    # --- Manual Tool Calling Execution Logic ---
+    # --- Tool Calling Execution Logic ---
     # Check if the LLM's response includes any tool calls.
     tool_calls = response.tool_calls if hasattr(response, 'tool_calls') else []
+    executions = []
 
     if tool_calls:
-        print(f"---Calculator Agent received tool calls: {tool_calls}---")
-        tool_messages = [] # To store the results of tool executions
-
-        for tool_call in tool_calls:
-            tool_name = tool_call['name']
-            tool_args = tool_call['args']
-            tool_call_id = tool_call['id']
-
-            # Locate the specific tool function from the imported 'tools' list.
-            executed_tool = next((t for t in tools if t.name == tool_name), None)
-
-            if executed_tool:
-                try:
-                    # Execute the tool with the arguments provided by the LLM.
-                    tool_result = executed_tool.invoke(tool_args)
-                    print(f"---Tool '{tool_name}' executed, result: {tool_result}---")
-                    # Append a ToolMessage with the result to be added to the state.
-                    tool_messages.append(ToolMessage(content=str(tool_result), tool_call_id=tool_call_id))
-                except Exception as e:
-                    print(f"---Error executing tool '{tool_name}': {e}---")
-                    tool_messages.append(ToolMessage(content=f"Error: {e}", tool_call_id=tool_call_id))
-            else:
-                print(f"---Tool '{tool_name}' not found by Calculator Agent---")
-                tool_messages.append(ToolMessage(content=f"Tool '{tool_name}' not found.", tool_call_id=tool_call_id))
-
-        # Add all generated ToolMessages (results) back to the conversation history in the state.
-        messages.extend(tool_messages)
-        print("---Tool messages added to state---")
-
-        # After tool execution, the flow typically returns to the supervisor to decide the next step.
-        # The supervisor might route back to the calculator agent or to a different agent
-        # to process the tool results or generate a final user-facing response.
-
-    return {"messages": messages}
\ No newline at end of file
+        logger.debug("---Calculator Agent received tool calls: %s---", tool_calls)
+        # Execute all tool calls concurrently; the results come back in the order of the calls.
+        executions = execute_tool_calls(tool_calls, tools_by_name=CALCULATOR_TOOLS)
+
+    return _calculator_update(state, response, executions)
+
+async def acalculator_agent(state: AgentState) -> AgentState:
+    """
+    Async variant of 'calculator_agent': the LLM call is awaited and the tool calls run
+    concurrently on the event loop.
+    """
+    logger.info("---Executing Calculator Agent---")
+    response = await speculative_executor.atake("calculator_agent", state) or await acall_llm(state)
+
+    tool_calls = response.tool_calls if hasattr(response, 'tool_calls') else []
+    executions = []
+
+    if tool_calls:
+        logger.debug("---Calculator Agent received tool calls: %s---", tool_calls)
+        executions = await aexecute_tool_calls(tool_calls, tools_by_name=CALCULATOR_TOOLS)
+
+    return _calculator_update(state, response, executions)
@@ -0,0 +1,222 @@
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage, ToolMessage
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Collection, Dict, List, Optional, Tuple
+import json
+import logging
+import os
+import threading
+
+from observability.tracing import tracer
+from sessions.compaction import split_turns
+from supervisor.prompts import estimate_tokens, truncate_to_tokens
+from supervisor.speculation import defer_until_used
+
+logger = logging.getLogger(__name__)
+
+# --- Per-Agent Context Projection ---
+# The graph state holds the whole conversation: every agent's tool calls and results (e.g., full
+# news lists) and every earlier turn. A worker agent needs little of it, so its LLM is called with
+# a projection of the history instead:
+#   - the current turn as it is, except for other agents' tool exchanges;
+#   - earlier turns only if they are recent (follow-ups such as "and divide that by 2") or used
+#     this agent's tools, with their requests and answers truncated;
+#   - the agent's own tool exchanges of the current turn (calls and results), so it can continue
+#     or fix them;
+#   - every other tool exchange collapsed into one short note, with truncated results. This
+#     includes the agent's own exchanges in earlier turns: their answers already summarize the
+#     results, which for the news tools are long article lists that would otherwise be resent in
+#     every later news call;
+#   - the summary of a compacted session.
+# The estimated input tokens of the full and the projected context (messages plus the bound tool
+# schemas) are recorded per agent and on the calling node's trace span. The tool schemas are not
+# projected: the LLM needs them to call its tools. For the news agent, whose messages are short
+# once earlier article lists are collapsed, they are about half of what is still sent.
+# Set AGENT_CONTEXT_PROJECTION=0 to send the full history again (the token counts are still recorded).
+
+CONTEXT_PROJECTION_ENABLED = os.environ.get("AGENT_CONTEXT_PROJECTION", "1") != "0"
+# Number of turns before the current one that are always kept.
+CONTEXT_RECENT_TURNS = 2
+# Upper bound (in estimated tokens) for an earlier turn's request or answer.
+CONTEXT_MESSAGE_TOKENS = 150
+# Upper bound (in estimated tokens) for each call and each result in a tool note.
+CONTEXT_TOOL_RESULT_TOKENS = 60
+
+
+def estimate_message_tokens(messages: List[BaseMessage]) -> int:
+    """Estimates the input tokens of a list of messages, including the tool calls they carry."""
+    total = 0
+    for msg in messages:
+        total += estimate_tokens(str(msg.content))
+        tool_calls = getattr(msg, 'tool_calls', None)
+        if tool_calls:
+            total += estimate_tokens(json.dumps([{"name": call['name'], "args": call['args']} for call in tool_calls],
+                                                default=str))
+    return total
+
+
+@lru_cache(maxsize=None)
+def tool_schema_tokens(tool_names: Optional[Tuple[str, ...]] = None) -> int:
+    """
+    Estimates the input tokens taken by the schemas of the given tools (all tools if None),
+    which are sent with every request to an LLM they are bound to.
+    """
+    from langchain_core.utils.function_calling import convert_to_openai_tool
+    from tools.tools import tools
+    return sum(estimate_tokens(json.dumps(convert_to_openai_tool(t))) for t in tools
+               if tool_names is None or t.name in tool_names)
+
+
+@dataclass
+class ContextStats:
+    """Token counts of one agent's LLM calls."""
+    calls: int = 0
+    full_tokens: int = 0
+    """Estimated input tokens with the whole history and every tool schema (the unprojected call)."""
+    projected_tokens: int = 0
+    """Estimated input tokens actually sent: the projected history and the agent's own tool schemas."""
+
+    @property
+    def reduction(self) -> float:
+        return 1 - self.projected_tokens / self.full_tokens if self.full_tokens else 0.0
+
+    def as_dict(self) -> dict:
+        return {**self.__dict__, "reduction": self.reduction}
+
+
+class ContextProjector:
+    """
+    Builds the history a worker agent's LLM is called with and records the tokens it saves.
+    """
+
+    def __init__(self, recent_turns: int = CONTEXT_RECENT_TURNS, message_tokens: int = CONTEXT_MESSAGE_TOKENS,
+                 tool_result_tokens: int = CONTEXT_TOOL_RESULT_TOKENS, enabled: bool = CONTEXT_PROJECTION_ENABLED):
+        """
+        Args:
+            recent_turns (int): Number of turns before the current one that are always kept.
+            message_tokens (int): Token bound for an earlier turn's request or answer.
+            tool_result_tokens (int): Token bound for each call and result in a tool note.
+            enabled (bool): If False, 'for_agent' returns the full history (and still records token counts).
+        """
+        self.recent_turns = recent_turns
+        self.message_tokens = message_tokens
+        self.tool_result_tokens = tool_result_tokens
+        self.enabled = enabled
+        self.stats: Dict[str, ContextStats] = {}
+        self._lock = threading.Lock()
+
+    def project(self, messages: List[BaseMessage], own_tools: Collection[str]) -> List[BaseMessage]:
+        """
+        Projects a conversation onto what an agent needs.
+
+        Args:
+            messages (List[BaseMessage]): The conversation messages from the AgentState.
+            own_tools (Collection[str]): Names of the tools the agent executes.
+
+        Returns:
+            List[BaseMessage]: The projected messages. Every kept tool call is followed by its
+            results, so the list is a valid chat model input.
+        """
+        turns = split_turns(messages)
+        current = len(turns) - 1
+        projected: List[BaseMessage] = []
+        for index, turn in enumerate(turns):
+            if index == current:
+                projected.extend(self._project_turn(turn, own_tools, truncate=False))
+            elif index >= current - self.recent_turns or self._uses_tools(turn, own_tools):
+                projected.extend(self._project_turn(turn, own_tools, truncate=True))
+            else:
+                # An unrelated earlier turn; only a compaction summary in it is kept.
+                projected.extend(msg for msg in turn if isinstance(msg, SystemMessage))
+        return projected
+
+    @staticmethod
+    def _uses_tools(turn: List[BaseMessage], own_tools: Collection[str]) -> bool:
+        return any(call['name'] in own_tools for msg in turn if isinstance(msg, AIMessage)
+                   for call in msg.tool_calls or [])
+
+    def _project_turn(self, turn: List[BaseMessage], own_tools: Collection[str], truncate: bool) -> List[BaseMessage]:
+        results = {msg.tool_call_id: msg for msg in turn if isinstance(msg, ToolMessage)}
+        projected: List[BaseMessage] = []
+        for msg in turn:
+            if isinstance(msg, SystemMessage):
+                projected.append(msg)
+            elif isinstance(msg, HumanMessage):
+                projected.append(self._truncated(msg, HumanMessage) if truncate else msg)
+            elif isinstance(msg, AIMessage) and msg.tool_calls:
+                call_results = [results.get(call['id']) for call in msg.tool_calls]
+                own = any(call['name'] in own_tools for call in msg.tool_calls)
+                if own and not truncate and all(result is not None for result in call_results):
+                    projected.append(msg)
+                    projected.extend(call_results)
+                else:
+                    heading = "Earlier tool results:" if own else "Tool results from another agent:"
+                    projected.append(AIMessage(content=self._tool_note(heading, msg.tool_calls, call_results)))
+            elif isinstance(msg, AIMessage) and str(msg.content).strip():
+                projected.append(self._truncated(msg, AIMessage) if truncate else msg)
+            # ToolMessages are added right after their calls above.
+        return projected
+
+    def _truncated(self, msg: BaseMessage, message_type: type) -> BaseMessage:
+        content = str(msg.content)
+        shortened = truncate_to_tokens(content, self.message_tokens)
+        if shortened == content:
+            return msg
+        return message_type(content=shortened)
+
+    def _tool_note(self, heading: str, tool_calls: List[dict], call_results: List[Optional[ToolMessage]]) -> str:
+        # A tool exchange as one line per call: the call and the start of its result.
+        lines = [heading]
+        for call, result in zip(tool_calls, call_results):
+            args = ", ".join(f"{name}={value!r}" for name, value in call['args'].items())
+            call_text = truncate_to_tokens(f"{call['name']}({args})", self.tool_result_tokens)
+            content = " ".join(str(result.content).split()) if result is not None else "(no result)"
+            lines.append(f"- {call_text} -> {truncate_to_tokens(content, self.tool_result_tokens)}")
+        return "\n".join(lines)
+
+    def for_agent(self, agent: str, messages: List[BaseMessage], own_tools: Collection[str]) -> List[BaseMessage]:
+        """
+        Returns the messages to call an agent's LLM with and records their token counts.
+
+        Args:
+            agent (str): The agent's node name, under which the token counts are recorded.
+            messages (List[BaseMessage]): The conversation messages from the AgentState.
+            own_tools (Collection[str]): Names of the tools bound to the agent's LLM.
+
+        Returns:
+            List[BaseMessage]: The projected messages (the full history if projection is disabled).
+        """
+        projected = self.project(messages, own_tools) if self.enabled else messages
+        full_tokens = estimate_message_tokens(messages) + tool_schema_tokens()
+        # The agent's LLM is bound only to its own tools, projection or not; every tool schema is
+        # counted only in the full (unprojected, all-tools) figure.
+        projected_tokens = estimate_message_tokens(projected) + tool_schema_tokens(tuple(sorted(own_tools)))
+
+        def record():
+            with self._lock:
+                stats = self.stats.setdefault(agent, ContextStats())
+                stats.calls += 1
+                stats.full_tokens += full_tokens
+                stats.projected_tokens += projected_tokens
+            tracer.annotate(context_tokens=projected_tokens, full_context_tokens=full_tokens,
+                            context_messages=len(projected))
+
+        # A speculative call's counts are recorded only if the agent uses its response.
+        defer_until_used(record)
+        logger.debug("---%s context: %d of %d estimated tokens, %d of %d messages---",
+                     agent, projected_tokens, full_tokens, len(projected), len(messages))
+        return projected
+
+    def report(self) -> Dict[str, dict]:
+        """Returns the token counts recorded per agent."""
+        with self._lock:
+            return {agent: stats.as_dict() for agent, stats in self.stats.items()}
+
+    def reset(self) -> None:
+        """Drops the recorded token counts."""
+        with self._lock:
+            self.stats.clear()
+
+
+# Shared projector used by the worker agents.
+context_projector = ContextProjector()
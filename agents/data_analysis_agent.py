@@ -1,32 +1,89 @@
 from state import AgentState
-from langchain_core.messages import HumanMessage, AIMessage
+from llms import ollama_llms # LLMs are built on first use; access them as 'ollama_llms.llm_data_analysis'
+from langchain_core.messages import AIMessage
+from typing import List
+import logging
 
-# Uncomment the following imports if this agent needs to use an LLM or specific tools
-# from llms.ollama_llms import llm_agent
-# from tools.tools import tools # Import all tools if this agent is tool-enabled
+# Import the specific tools this agent will use and the shared tool executor
+from tools.tools import describe_dataset, aggregate_dataset
+from tools.executor import build_tool_index, execute_tool_calls, aexecute_tool_calls
+from supervisor.speculation import speculative_executor # Commits a speculative first LLM call
+from agents.context import context_projector # Trims the history to what this agent needs
+
+logger = logging.getLogger(__name__)
+
+# Tool index restricted to the tools this agent is allowed to execute (and its LLM is bound to).
+DATA_TOOLS = build_tool_index([describe_dataset, aggregate_dataset])
+
+def _data_analysis_update(state: AgentState, response: AIMessage, executions: List) -> dict:
+    """
+    Builds the data analysis agent's state update from the LLM response and the executed tool calls.
+    """
+    # Only this step's messages are returned; the state reducer appends them to the history.
+    new_messages = [response]
+    # A direct answer (no tool calls) is final, so the graph can end without a supervisor round trip.
+    handoff = "END"
+
+    if executions:
+        # The tool results are compact summaries (schema, statistics, top groups), never raw rows,
+        # so they can be added to the history as they are.
+        new_messages.extend(execution.message for execution in executions)
+        logger.info("---Tool messages added to state---")
+
+        # The summaries answer the request. If a tool failed (e.g., an unknown column), the flow
+        # returns to the supervisor, which may route back here to retry with the error in context.
+        handoff = "END" if all(execution.ok for execution in executions) else None
+
+    return {"messages": new_messages, "handoff": handoff, "steps": state.get('steps', 0) + 1}
+
+def call_llm(state: AgentState) -> AIMessage:
+    """
+    The agent's first step: the response of the LLM bound to this agent's tools, called with the
+    agent's projection of the conversation (see agents/context.py). It has no side effects, so the
+    supervisor may start it speculatively (see supervisor/speculation.py).
+    """
+    messages = context_projector.for_agent("data_analysis_agent", state['messages'], DATA_TOOLS)
+    return ollama_llms.llm_data_analysis.invoke(messages)
+
+async def acall_llm(state: AgentState) -> AIMessage:
+    """Async variant of 'call_llm'."""
+    messages = context_projector.for_agent("data_analysis_agent", state['messages'], DATA_TOOLS)
+    return await ollama_llms.llm_data_analysis.ainvoke(messages)
 
 def data_analysis_agent(state: AgentState) -> AgentState:
     """
-    An agent dedicated to handling data manipulation and analysis tasks.
-    This agent can be extended to integrate with databases, run analytical scripts,
-    or use an LLM for complex data interpretations.
-    """
-    print("---Executing Data Analysis Agent---")
-    messages = state['messages']
-
-    # --- Agent Logic Placeholder ---
-    # Implement your data analysis logic here. Examples:
-    # 1. Using an LLM to process data insights:
-    #    response = llm_agent.invoke(messages)
-    #    messages.append(response)
-    # 2. Interacting with external data sources (e.g., pandas, SQL databases):
-    #    data = fetch_data_from_db(state['query_params'])
-    #    analysis_result = perform_analysis(data)
-    #    messages.append(AIMessage(content=f"Data analysis complete: {analysis_result}"))
-    # 3. Calling specific data-related tools (if bound to llm_agent):
-    #    ... (similar tool calling logic as in calculator_agent) ...
-
-    # For demonstration purposes, we'll just add a placeholder message:
-    messages.append(AIMessage(content="Data Analysis Agent processed the data. Further integration needed for actual analysis."))
-
-    return {"messages": messages}
\ No newline at end of file
+    An agent dedicated to analyzing local CSV and Parquet files.
+    It uses a tool-calling LLM to pick the dataset tools ('describe_dataset' for the schema and column
+    statistics, 'aggregate_dataset' for aggregations and group-bys) and executes them through the
+    shared tool executor. The files are processed in chunks by the dataset engine, so they may be
+    larger than memory; only compact summaries reach the LLM.
+    """
+    logger.info("---Executing Data Analysis Agent---")
+    response = speculative_executor.take("data_analysis_agent", state) or call_llm(state)
+
+    tool_calls = response.tool_calls if hasattr(response, 'tool_calls') else []
+    executions = []
+
+    if tool_calls:
+        logger.debug("---Data Analysis Agent received tool calls: %s---", tool_calls)
+        # Calls to tools outside DATA_TOOLS are reported back to the LLM as errors.
+        executions = execute_tool_calls(tool_calls, tools_by_name=DATA_TOOLS)
+
+    return _data_analysis_update(state, response, executions)
+
+async def adata_analysis_agent(state: AgentState) -> AgentState:
+    """
+    Async variant of 'data_analysis_agent': the LLM call is awaited and the tool calls run
+    concurrently on the event loop.
+    """
+    logger.info("---Executing Data Analysis Agent---")
+    response = await speculative_executor.atake("data_analysis_agent", state) or await acall_llm(state)
+
+    tool_calls = response.tool_calls if hasattr(response, 'tool_calls') else []
+    executions = []
+
+    if tool_calls:
+        logger.debug("---Data Analysis Agent received tool calls: %s---", tool_calls)
+        executions = await aexecute_tool_calls(tool_calls, tools_by_name=DATA_TOOLS)
+
+    return _data_analysis_update(state, response, executions)
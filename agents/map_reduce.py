@@ -0,0 +1,165 @@
+from langchain_core.messages import HumanMessage
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, List
+import asyncio
+import logging
+import time
+
+from tools.text import chunk_text
+
+logger = logging.getLogger(__name__)
+
+# --- Map-Reduce over Long Documents ---
+# A document too long for one prompt is split into chunks (see 'tools.text.chunk_text');
+# every chunk is processed by its own LLM call (map), at most 'max_concurrency' at a time, and the
+# partial results are combined by a final LLM call (reduce). When the partial results are still
+# too long for one prompt, they are reduced in parallel groups first, level by level. The latency
+# therefore grows with (number of chunks / max_concurrency) rather than with the document length,
+# and no prompt exceeds roughly 'chunk_chars' characters plus the instructions.
+
+MAP_PROMPT = """Task: {instruction}
+
+The text below is part {index} of a longer document. Apply the task to this part only.
+Report only what is relevant to the task, concisely, without any introduction.
+
+Part {index}:
+{chunk}
+"""
+
+REDUCE_PROMPT = """Task: {instruction}
+
+The results below were produced from consecutive parts of a longer document, in order.
+Combine them into a single, coherent answer to the task. Merge repeated points and keep the
+original order of events. Do not mention the parts.
+
+{partials}
+"""
+
+DIRECT_PROMPT = """Task: {instruction}
+
+Document:
+{chunk}
+"""
+
+
+@dataclass
+class MapReduceResult:
+    """The answer of a map-reduce run and its cost."""
+    answer: str
+    chunks: int
+    """Number of chunks the document was split into (one map call each)."""
+    reduce_calls: int
+    """Number of reduce calls (0 when the document fits into a single chunk)."""
+    reduce_levels: int
+    """Number of reduce levels (1 unless the partial results were themselves too long)."""
+    elapsed: float
+    """Wall time in seconds."""
+
+    def as_dict(self) -> dict:
+        return {"chunks": self.chunks, "reduce_calls": self.reduce_calls, "reduce_levels": self.reduce_levels,
+                "elapsed": self.elapsed}
+
+
+class MapReduceProcessor:
+    """
+    Applies an instruction (e.g., "Summarize this document") to a document of any length with
+    parallel per-chunk LLM calls and a reduce step.
+    """
+
+    def __init__(self, chunk_chars: int = 6_000, overlap: int = 200, max_concurrency: int = 4):
+        """
+        Args:
+            chunk_chars (int): Maximum characters per chunk, and per group of partial results in a reduce call.
+            overlap (int): Characters shared between consecutive chunks.
+            max_concurrency (int): Maximum number of LLM calls in flight at once.
+        """
+        self.chunk_chars = chunk_chars
+        self.overlap = overlap
+        self.max_concurrency = max(1, max_concurrency)
+
+    # --- Prompts ---
+
+    @staticmethod
+    def _content(response: Any) -> str:
+        return str(getattr(response, "content", response)).strip()
+
+    def _map_prompt(self, instruction: str, index: int, chunk: str, single: bool) -> List[HumanMessage]:
+        template = DIRECT_PROMPT if single else MAP_PROMPT
+        return [HumanMessage(content=template.format(instruction=instruction, index=index, chunk=chunk))]
+
+    def _reduce_groups(self, instruction: str, partials: List[str]) -> List[List[HumanMessage]]:
+        # Consecutive partial results are packed into groups of at most 'chunk_chars' characters;
+        # a single group is the final reduce.
+        groups: List[List[str]] = [[]]
+        size = 0
+        for partial in partials:
+            if groups[-1] and size + len(partial) > self.chunk_chars:
+                groups.append([])
+                size = 0
+            groups[-1].append(partial)
+            size += len(partial)
+        if len(groups) == len(partials):
+            # Every partial result is as long as a chunk; pair them up so each level still halves the count.
+            groups = [partials[i:i + 2] for i in range(0, len(partials), 2)]
+        return [[HumanMessage(content=REDUCE_PROMPT.format(
+                    instruction=instruction, partials="\n\n".join(f"Result {i}:\n{p}" for i, p in enumerate(group, 1))))]
+                for group in groups]
+
+    def _chunks(self, text: str) -> List[str]:
+        chunks = list(chunk_text(text, self.chunk_chars, self.overlap))
+        return chunks or [text]
+
+    # --- Execution ---
+
+    def run(self, llm: Any, instruction: str, text: str) -> MapReduceResult:
+        """
+        Runs the map and reduce steps with a thread pool of 'max_concurrency' workers.
+
+        Args:
+            llm (Any): The chat model (anything with 'invoke').
+            instruction (str): What to do with the document.
+            text (str): The document.
+
+        Returns:
+            MapReduceResult: The combined answer and the number of calls made.
+        """
+        started = time.perf_counter()
+        chunks = self._chunks(text)
+        single = len(chunks) == 1
+        logger.info("---Map-reduce over %d chunk(s) with up to %d parallel calls---", len(chunks), self.max_concurrency)
+        with ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="map-reduce") as pool:
+            # 'map' keeps the results in chunk order regardless of completion order.
+            partials = [self._content(r) for r in pool.map(
+                llm.invoke, [self._map_prompt(instruction, i, chunk, single) for i, chunk in enumerate(chunks, 1)])]
+            reduce_calls = reduce_levels = 0
+            while len(partials) > 1:
+                prompts = self._reduce_groups(instruction, partials)
+                partials = [self._content(r) for r in pool.map(llm.invoke, prompts)]
+                reduce_calls += len(prompts)
+                reduce_levels += 1
+        return MapReduceResult(partials[0], len(chunks), reduce_calls, reduce_levels, time.perf_counter() - started)
+
+    async def arun(self, llm: Any, instruction: str, text: str) -> MapReduceResult:
+        """
+        Async variant of 'run': the LLM calls are awaited, at most 'max_concurrency' at a time.
+        """
+        started = time.perf_counter()
+        chunks = self._chunks(text)
+        single = len(chunks) == 1
+        logger.info("---Map-reduce over %d chunk(s) with up to %d parallel calls---", len(chunks), self.max_concurrency)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def call(prompt: List[HumanMessage]) -> str:
+            async with semaphore:
+                return self._content(await llm.ainvoke(prompt))
+
+        partials = await asyncio.gather(*(call(self._map_prompt(instruction, i, chunk, single))
+                                          for i, chunk in enumerate(chunks, 1)))
+        reduce_calls = reduce_levels = 0
+        while len(partials) > 1:
+            prompts = self._reduce_groups(instruction, partials)
+            partials = await asyncio.gather(*(call(prompt) for prompt in prompts))
+            reduce_calls += len(prompts)
+            reduce_levels += 1
+        return MapReduceResult(partials[0], len(chunks), reduce_calls, reduce_levels, time.perf_counter() - started)
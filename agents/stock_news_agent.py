@@ -1,109 +1,256 @@
 from state import AgentState
-from llms.ollama_llms import llm_agent # LLM bound to tools
-from langchain_core.messages import HumanMessage, ToolMessage, AIMessage
-from typing import List, Dict, Any
-import json # Useful if tool output were stringified JSON, though not strictly needed here
+from llms import ollama_llms # LLMs are built on first use; access them as 'ollama_llms.llm_stock_news'
+from langchain_core.messages import HumanMessage, AIMessage
+from typing import List, Dict, Optional, Tuple
+import logging
+import os
 
-# Import the specific tool this agent will use
-from tools.tools import get_stock_news
+# Import the specific tools this agent will use and the shared tool executor
+from tools.tools import get_stock_news, get_stock_news_batch, merge_ticker_news
+from tools.executor import build_tool_index, execute_tool_calls, aexecute_tool_calls
+from supervisor.speculation import speculative_executor # Commits a speculative first LLM call
+from agents.context import context_projector # Trims the history to what this agent needs
+from tools.sentiment import sentiment_scorer, summarize
 
-def stock_news_agent(state: AgentState) -> AgentState:
+logger = logging.getLogger(__name__)
+
+# Tool index restricted to the tools this agent is allowed to execute (and its LLM is bound to).
+NEWS_TOOLS = build_tool_index([get_stock_news, get_stock_news_batch])
+
+# Sentiment is always scored locally; set NEWS_THEMES_LLM=1 to also have the LLM summarize the key themes.
+NEWS_THEMES_LLM = os.environ.get("NEWS_THEMES_LLM", "0") == "1"
+
+def _collect_news(executions: List) -> Tuple[Dict[str, List[Dict[str, str]]], Dict[str, str]]:
+    """
+    Gathers the fetched news from all executed tool calls, whether the LLM issued one batch call
+    or several single-ticker calls.
+
+    Returns:
+        Tuple[Dict[str, List[Dict[str, str]]], Dict[str, str]]: The articles per ticker (in request
+        order) and an error message per ticker that returned no news.
+    """
+    news_by_ticker: Dict[str, List[Dict[str, str]]] = {}
+    errors: Dict[str, str] = {}
+    for execution in executions:
+        if not execution.ok:
+            continue
+        result = execution.result
+        if execution.tool_call['name'] == "get_stock_news_batch":
+            for article in result.get('articles', []):
+                for ticker in article.get('tickers', []):
+                    news_by_ticker.setdefault(ticker, []).append(
+                        {"title": article.get('title', 'No Title Found'), "summary": article.get('summary', '')})
+            errors.update(result.get('errors', {}))
+        else:
+            ticker = str(execution.tool_call['args'].get('ticker', 'the stock')).upper()
+            # The tool returns a list of dictionaries (for news) or a list with a single string (for errors).
+            if result and isinstance(result, list) and isinstance(result[0], dict):
+                news_by_ticker[ticker] = result
+            elif result and isinstance(result, list) and isinstance(result[0], str):
+                errors[ticker] = result[0]
+    return news_by_ticker, errors
+
+def _sentiment_by_ticker(news_by_ticker: Dict[str, List[Dict[str, str]]]) -> Dict[str, dict]:
+    """
+    Scores the sentiment of every fetched article locally and summarizes it per ticker.
+    All articles are scored in one vectorized batch; articles scored before (or shared between
+    tickers) come from the scorer's cache.
+
+    Returns:
+        Dict[str, dict]: The aggregate sentiment per ticker (see 'tools.sentiment.summarize').
+    """
+    articles = [article for ticker_articles in news_by_ticker.values() for article in ticker_articles]
+    scores = sentiment_scorer.score_articles(articles)
+    sentiment = {}
+    offset = 0
+    for ticker, ticker_articles in news_by_ticker.items():
+        sentiment[ticker] = summarize(scores[offset:offset + len(ticker_articles)])
+        offset += len(ticker_articles)
+    return sentiment
+
+def _themes_prompt(news_by_ticker: Dict[str, List[Dict[str, str]]], sentiment: Dict[str, dict]) -> Optional[str]:
+    """
+    Builds a single prompt asking for the key themes of every ticker's news. The sentiment is
+    already scored locally and is only given to the LLM as context.
+
+    Returns:
+        Optional[str]: The prompt, or None if there are no summaries to analyze.
     """
-    An agent that specializes in fetching the latest stock news and performing
-    a basic sentiment analysis on the retrieved information.
+    tickers = list(news_by_ticker)
+    if len(tickers) == 1:
+        # Extract news summaries, filtering out empty ones, to feed to the LLM.
+        ticker = tickers[0]
+        news_summaries = [item.get('summary', '') for item in news_by_ticker[ticker] if item.get('summary', '').strip()]
+        if not news_summaries:
+            return None
+        return f"""
+                Analyze the following news summaries for {ticker.upper()} (overall sentiment: {sentiment[ticker]['label']})
+                and summarize the key themes and important points from the news.
+
+                News Summaries:
+                {'- '.join(news_summaries)}
+
+                Provide your response as a concise summary of the key themes.
+                """
+
+    # Several tickers: one batched prompt over the de-duplicated articles.
+    articles = [article for article in merge_ticker_news(news_by_ticker) if article['summary'].strip()]
+    if not articles:
+        return None
+    article_lines = "\n".join(f"{i}. [{', '.join(article['tickers'])}] {article['title']}: {article['summary']}"
+                              for i, article in enumerate(articles, start=1))
+    return f"""
+                Analyze the following news articles for the stocks {', '.join(tickers)}. Each article is tagged
+                with the ticker(s) it relates to.
+                For EACH ticker, summarize the key themes of its news.
+
+                News Articles:
+                {article_lines}
+
+                Respond with exactly one line per ticker in the form "TICKER: <key themes>".
+                """
+
+def _format_sentiment(sentiment: dict) -> str:
+    return (f"{sentiment['label']} ({sentiment['score']:+.2f} over {sentiment['articles']} articles: "
+            f"{sentiment['positive']} positive, {sentiment['negative']} negative, {sentiment['neutral']} neutral)")
+
+def _final_response(news_by_ticker: Dict[str, List[Dict[str, str]]], errors: Dict[str, str],
+                    sentiment: Dict[str, dict], themes: Optional[str]) -> Optional[AIMessage]:
     """
-    print("---Executing Stock News Agent---")
-    messages = state['messages']
+    Builds the final, user-facing response from the fetched news, the local sentiment scores and
+    (if requested and not empty) the LLM's themes summary. The aggregate scores are also attached
+    to the message as 'additional_kwargs["sentiment"]' for programmatic callers.
+
+    Returns:
+        Optional[AIMessage]: The final answer, or None if no tool produced any news or error.
+    """
+    if not news_by_ticker:
+        if errors:
+            # Handle cases where the tool returned an error message string (e.g., "No news found...").
+            logger.info("---News tool returned an error message---")
+            return AIMessage(content="Could not fetch news: " + "\n".join(errors.values()))
+        return None
 
-    # Invoke the tool-calling LLM with the current conversation history.
-    # The LLM will decide if the 'get_stock_news' tool should be called based on the user's request.
-    response = llm_agent.invoke(messages)
+    tickers = list(news_by_ticker)
+    if len(tickers) == 1:
+        headlines_text = "\n".join([f"- {item.get('title', 'No Title Found')}" for item in news_by_ticker[tickers[0]]])
+        sentiment_text = f"Overall Sentiment: {_format_sentiment(sentiment[tickers[0]])}"
+    else:
+        headlines_text = "\n\n".join(f"{ticker}:\n" + "\n".join(f"- {item.get('title', 'No Title Found')}" for item in articles)
+                                     for ticker, articles in news_by_ticker.items())
+        sentiment_text = "Overall Sentiment:\n" + "\n".join(f"{ticker}: {_format_sentiment(sentiment[ticker])}"
+                                                           for ticker in tickers)
+    content = f"Here is the latest news for {', '.join(t.upper() for t in tickers)}:\n{headlines_text}\n\n{sentiment_text}"
 
-    # Append the LLM's response (which may contain tool calls) to the state.
-    messages.append(response)
+    if themes and str(themes).strip():
+        logger.info("---Themes summary generated---")
+        content += f"\n\nKey Themes:\n{themes}"
+
+    if errors:
+        content += "\n\nCould not fetch news for: " + "; ".join(errors.values())
+    return AIMessage(content=content, additional_kwargs={"sentiment": sentiment})
+
+def _news_update(state: AgentState, response: AIMessage, executions: List, final_message: Optional[AIMessage]) -> dict:
+    """
+    Builds the agent's state update: the LLM response, the tool results and the final answer (if any).
+    """
+    # Collect only the messages produced during this step (starting with the LLM's response);
+    # the state reducer appends them to the conversation history.
+    new_messages = [response]
+    # A direct answer (no tool calls) is final, so the graph can end without a supervisor round trip.
+    handoff = "END"
+
+    if executions:
+        # Add the results of the tool execution (ToolMessages) to this step's update.
+        new_messages.extend(execution.message for execution in executions)
+        logger.info("---Tool messages added to state---")
+        # Without a final response, control returns to the supervisor.
+        handoff = None
+
+    if final_message is not None:
+        new_messages.append(final_message)
+        handoff = "END" # The final user-facing answer is complete
+
+    return {"messages": new_messages, "handoff": handoff, "steps": state.get('steps', 0) + 1}
+
+def call_llm(state: AgentState) -> AIMessage:
+    """
+    The agent's first step: the response of the LLM bound to this agent's tools, called with the
+    agent's projection of the conversation (see agents/context.py). It has no side effects, so the
+    supervisor may start it speculatively (see supervisor/speculation.py).
+    """
+    messages = context_projector.for_agent("stock_news_agent", state['messages'], NEWS_TOOLS)
+    return ollama_llms.llm_stock_news.invoke(messages)
+
+async def acall_llm(state: AgentState) -> AIMessage:
+    """Async variant of 'call_llm'."""
+    messages = context_projector.for_agent("stock_news_agent", state['messages'], NEWS_TOOLS)
+    return await ollama_llms.llm_stock_news.ainvoke(messages)
+
+def stock_news_agent(state: AgentState) -> AgentState:
+    """
+    An agent that specializes in fetching the latest stock news and scoring
+    the sentiment of the retrieved articles.
+    Several tickers are fetched concurrently; the sentiment is scored locally, and the optional
+    themes summary covers every ticker in a single LLM call.
+    """
+    logger.info("---Executing Stock News Agent---")
+
+    # Invoke the tool-calling LLM with the current conversation history, unless the supervisor
+    # already ran this call speculatively.
+    # The LLM will decide if 'get_stock_news' (one ticker) or 'get_stock_news_batch' (several tickers)
+    # should be called based on the user's request.
+    response = speculative_executor.take("stock_news_agent", state) or call_llm(state)
 
     # --- Tool Calling Execution Logic ---
     tool_calls = response.tool_calls if hasattr(response, 'tool_calls') else []
+    executions = []
+    final_message = None
 
     if tool_calls:
-        print(f"---Stock News Agent received tool calls: {tool_calls}---")
-        tool_messages = []
-        fetched_news_data = None # Variable to store the news data fetched by the tool
-
-        for tool_call in tool_calls:
-            tool_name = tool_call['name']
-            tool_args = tool_call['args']
-            tool_call_id = tool_call['id']
-
-            # Ensure the LLM called the expected tool
-            if tool_name == "get_stock_news":
-                try:
-                    ticker = tool_args.get('ticker')
-                    if ticker:
-                        # Manually invoke the 'get_stock_news' tool with the extracted ticker.
-                        tool_result = get_stock_news.invoke(ticker)
-                        print(f"---Tool '{tool_name}' executed, result: {tool_result}---")
-                        fetched_news_data = tool_result # Store the result for sentiment analysis
-                        tool_messages.append(ToolMessage(content=str(tool_result), tool_call_id=tool_call_id))
-                    else:
-                        error_msg = "Missing 'ticker' argument for get_stock_news tool."
-                        print(f"---Error executing tool '{tool_name}': {error_msg}---")
-                        tool_messages.append(ToolMessage(content=f"Error: {error_msg}", tool_call_id=tool_call_id))
-
-                except Exception as e:
-                    print(f"---Error executing tool '{tool_name}': {e}---")
-                    tool_messages.append(ToolMessage(content=f"Error: {e}", tool_call_id=tool_call_id))
-            else:
-                print(f"---Stock News Agent received call for unknown tool: {tool_name}---")
-                tool_messages.append(ToolMessage(content=f"Unknown tool: {tool_name}", tool_call_id=tool_call_id))
-
-        # Add the results of the tool execution (ToolMessages) back to the conversation history.
-        messages.extend(tool_messages)
-        print("---Tool messages added to state---")
+        logger.debug("---Stock News Agent received tool calls: %s---", tool_calls)
+        # Execute the tool calls concurrently through the shared executor. Only the news tools
+        # are resolvable for this agent; any other tool name is reported back as not found.
+        executions = execute_tool_calls(tool_calls, tools_by_name=NEWS_TOOLS)
+        news_by_ticker, errors = _collect_news(executions)
 
         # --- Sentiment Analysis and Response Generation ---
-        # Proceed with sentiment analysis only if news data was successfully fetched and is in the expected format.
-        # The tool returns a list of dictionaries (for news) or a list with a single string (for errors).
-        if fetched_news_data and isinstance(fetched_news_data, list) and fetched_news_data and isinstance(fetched_news_data[0], dict):
-            print("---Performing sentiment analysis on news data---")
-            # Extract news summaries, filtering out empty ones, to feed to the LLM for sentiment analysis.
-            news_summaries = [item.get('summary', '') for item in fetched_news_data if item.get('summary', '').strip()]
-            ticker = tool_calls[0]['args'].get('ticker', 'the stock') # Get ticker from the initial tool call
-
-            if news_summaries:
-                # Construct a prompt for the LLM to perform sentiment analysis on the summaries.
-                sentiment_prompt = f"""
-                Analyze the following news summaries for {ticker.upper()} and provide a brief overall sentiment assessment
-                (e.g., generally positive, negative, mixed, neutral).
-                Also, summarize the key themes and important points from the news.
+        # Sentiment is scored locally in milliseconds. The LLM is only asked for the themes, if
+        # enabled, in a single call covering every ticker. The unbound agent model is used, since a
+        # model bound to the news tools could answer the summarization prompt with a tool call.
+        sentiment = _sentiment_by_ticker(news_by_ticker)
+        themes = None
+        themes_prompt = _themes_prompt(news_by_ticker, sentiment) if NEWS_THEMES_LLM and news_by_ticker else None
+        if themes_prompt:
+            logger.info("---Summarizing news themes---")
+            themes = ollama_llms.llm_agent_model.invoke([HumanMessage(content=themes_prompt)]).content
+        final_message = _final_response(news_by_ticker, errors, sentiment, themes)
 
-                News Summaries:
-                {'- '.join(news_summaries)}
+    return _news_update(state, response, executions, final_message)
 
-                Provide your response as a concise summary of the sentiment and key themes.
-                """
-                # Invoke the LLM with the sentiment analysis prompt.
-                sentiment_response = llm_agent.invoke([HumanMessage(content=sentiment_prompt)])
-                sentiment_summary = sentiment_response.content
-
-                # Generate a final, user-facing response combining headlines and sentiment analysis.
-                headlines_text = "\n".join([f"- {item.get('title', 'No Title Found')}" for item in fetched_news_data])
-                final_response_content = f"Here is the latest news for {ticker.upper()}:\n{headlines_text}\n\nOverall Sentiment & Themes:\n{sentiment_summary}"
-                messages.append(AIMessage(content=final_response_content))
-                print("---Sentiment analysis performed and final response generated---")
-
-            else:
-                # If no summaries were found (e.g., only headlines available), still list headlines.
-                headlines_text = "\n".join([f"- {item.get('title', 'No Title Found')}" for item in fetched_news_data])
-                final_response_content = f"Here is the latest news for {ticker.upper()}:\n{headlines_text}\n\nCould not perform detailed sentiment analysis as summaries were not available."
-                messages.append(AIMessage(content=final_response_content))
-                print("---No summaries found, listed headlines---")
-
-        elif fetched_news_data and isinstance(fetched_news_data, list) and fetched_news_data and isinstance(fetched_news_data[0], str):
-            # Handle cases where the tool returned an error message string (e.g., "No news found...").
-            error_message = fetched_news_data[0]
-            final_response_content = f"Could not fetch news: {error_message}"
-            messages.append(AIMessage(content=final_response_content))
-            print("---News tool returned an error message---")
+async def astock_news_agent(state: AgentState) -> AgentState:
+    """
+    Async variant of 'stock_news_agent': the LLM calls are awaited and the news lookups run
+    concurrently on the event loop.
+    """
+    logger.info("---Executing Stock News Agent---")
+    response = await speculative_executor.atake("stock_news_agent", state) or await acall_llm(state)
+
+    tool_calls = response.tool_calls if hasattr(response, 'tool_calls') else []
+    executions = []
+    final_message = None
+
+    if tool_calls:
+        logger.debug("---Stock News Agent received tool calls: %s---", tool_calls)
+        executions = await aexecute_tool_calls(tool_calls, tools_by_name=NEWS_TOOLS)
+        news_by_ticker, errors = _collect_news(executions)
+
+        sentiment = _sentiment_by_ticker(news_by_ticker)
+        themes = None
+        themes_prompt = _themes_prompt(news_by_ticker, sentiment) if NEWS_THEMES_LLM and news_by_ticker else None
+        if themes_prompt:
+            logger.info("---Summarizing news themes---")
+            themes = (await ollama_llms.llm_agent_model.ainvoke([HumanMessage(content=themes_prompt)])).content
+        final_message = _final_response(news_by_ticker, errors, sentiment, themes)
 
-    return {"messages": messages}
\ No newline at end of file
+    return _news_update(state, response, executions, final_message)
@@ -1,29 +1,171 @@
 from state import AgentState
+from llms import ollama_llms # LLMs are built on first use; access them as 'ollama_llms.llm_text_processing'
 from langchain_core.messages import HumanMessage, AIMessage
+from typing import List, Optional, Tuple
+import logging
+import os
+import re
 
-# Uncomment the following imports if this agent needs to use an LLM or specific tools
-# from llms.ollama_llms import llm_agent
-# from tools.tools import tools # Import all tools if this agent is tool-enabled
+from agents.context import context_projector
+from agents.map_reduce import MapReduceProcessor
+from observability.tracing import tracer
+from tools import text as text_ops
+
+logger = logging.getLogger(__name__)
+
+# --- Local Operations ---
+# Requests for counts, extraction, de-duplication, keywords or an extractive summary are answered
+# locally by 'tools/text.py', without an LLM call. Each operation is selected by keywords in the
+# request's instruction; several can be combined ("count the words and list the emails").
+_OPERATIONS = {
+    "statistics": re.compile(r"\b(count|how many|statistics|stats|word count|length of)\b"),
+    "deduplicate": re.compile(r"\b(dedup\w*|duplicates?|duplicated|unique lines|repeated lines)\b"),
+    "keywords": re.compile(r"\b(keywords?|key ?phrases?|key terms|main topics)\b"),
+    "extractive": re.compile(r"\b(extractive|key sentences|most important sentences|tl;?dr)\b"),
+}
+# Extraction requests, by the pattern name in 'tools.text.PATTERNS'.
+_EXTRACTIONS = {
+    "emails": re.compile(r"\be-?mails?\b"),
+    "urls": re.compile(r"\b(urls?|links?|websites?)\b"),
+    "phones": re.compile(r"\bphone( numbers?)?\b"),
+    "dates": re.compile(r"\bdates?\b"),
+    "numbers": re.compile(r"\b(numbers|figures)\b"),
+    "hashtags": re.compile(r"\bhashtags?\b"),
+    "mentions": re.compile(r"\b(mentions|handles)\b"),
+}
+# Maximum length of an instruction that precedes its document (on the first line, or before a colon).
+_INSTRUCTION_LINE = 300
+# A request is only split into instruction and document if the instruction refers to a document
+# ("summarize this text:", "the following", "below"), the document is fenced (``` or """), or the
+# document is at least _MIN_DOCUMENT_CHARS long. Otherwise a question such as "Question: why is
+# the sky blue?" would be taken for the instruction "Question" applied to a document.
+_DOCUMENT_MARKER = re.compile(r"\b(texts?|documents?|articles?|passages?|paragraphs?|transcripts?|content|e-?mails?"
+                              r"|reports?|notes|essay|lines|the following|below)\b", re.IGNORECASE)
+_FENCES = ("```", '"""')
+_MIN_DOCUMENT_CHARS = 500
+
+# --- Long Documents ---
+# Documents are split into chunks of TEXT_CHUNK_CHARS characters; requests the local operations
+# cannot answer (e.g., "summarize", "translate") are processed chunk by chunk with at most
+# TEXT_MAX_CONCURRENCY parallel LLM calls, then combined by a reduce call.
+map_reduce = MapReduceProcessor(
+    chunk_chars=int(os.environ.get("TEXT_CHUNK_CHARS", "6000")),
+    max_concurrency=int(os.environ.get("TEXT_MAX_CONCURRENCY", "4")),
+)
+
+def split_request(content: str) -> Tuple[str, str]:
+    """
+    Separates the instruction from the document it applies to, e.g. "Summarize this:\\n<document>".
+
+    Returns:
+        Tuple[str, str]: The instruction, and the document (empty if the request has none).
+    """
+    content = content.strip()
+    first_line, _, rest = content.partition("\n")
+    if rest.strip() and len(first_line) <= _INSTRUCTION_LINE and _is_document(first_line, rest):
+        return first_line.strip(), rest.strip()
+    head, colon, tail = content.partition(":")
+    if colon and len(head) <= _INSTRUCTION_LINE and len(tail) > len(head) and _is_document(head, tail):
+        return head.strip(), tail.strip()
+    return content, ""
+
+def _is_document(instruction: str, document: str) -> bool:
+    # Whether the text after an instruction is a document rather than the rest of a plain question.
+    document = document.strip()
+    return (bool(_DOCUMENT_MARKER.search(instruction)) or document.startswith(_FENCES)
+            or len(document) >= _MIN_DOCUMENT_CHARS)
+
+def _local_answer(instruction: str, document: str) -> Optional[str]:
+    """
+    Runs the local operations the instruction asks for.
+
+    Returns:
+        Optional[str]: The combined answer, or None if no local operation applies.
+    """
+    request = instruction.lower()
+    sections: List[str] = []
+
+    if _OPERATIONS["statistics"].search(request):
+        stats = text_ops.text_statistics(document)
+        top_words = ", ".join(f"{word} ({count})" for word, count in stats.pop("top_words"))
+        sections.append("Statistics:\n" + "\n".join(f"- {name.replace('_', ' ')}: {value}" for name, value in stats.items())
+                        + f"\n- most frequent words: {top_words or 'none'}")
+    for kind, pattern in _EXTRACTIONS.items():
+        if pattern.search(request):
+            matches = text_ops.extract(document, kind)
+            sections.append(f"{kind.capitalize()} ({len(matches)}):\n" + ("\n".join(f"- {m}" for m in matches) or "- none found"))
+    if _OPERATIONS["deduplicate"].search(request):
+        result = text_ops.deduplicate(document, unit="sentences" if "sentence" in request else "lines")
+        sections.append(f"Removed {result['removed']} duplicate(s), kept {result['kept']}:\n"
+                        + text_ops.preview(result["text"]))
+    if _OPERATIONS["keywords"].search(request):
+        sections.append("Keywords: " + (", ".join(text_ops.keywords(document)) or "none found"))
+    if _OPERATIONS["extractive"].search(request):
+        sections.append("Key sentences:\n" + "\n".join(f"- {s}" for s in text_ops.extractive_summary(document)))
+
+    return "\n\n".join(sections) if sections else None
+
+def _prepare(state: AgentState) -> Tuple[str, str, Optional[AIMessage]]:
+    """
+    Splits the latest user message and answers it locally if possible.
+
+    Returns:
+        Tuple[str, str, Optional[AIMessage]]: The instruction, the document and the local answer (if any).
+    """
+    latest = next((m for m in reversed(state['messages']) if isinstance(m, HumanMessage)), None)
+    instruction, document = split_request(str(latest.content) if latest is not None else "")
+    local = _local_answer(instruction, document) if document else None
+    if local is not None:
+        logger.info("---Text request answered locally---")
+        tracer.annotate(text_mode="local", document_chars=len(document))
+        return instruction, document, AIMessage(content=local)
+    return instruction, document, None
+
+def _update(state: AgentState, message: AIMessage, handoff: Optional[str] = "END") -> dict:
+    # Only the new message is returned; the state reducer appends it to the history.
+    return {"messages": [message], "handoff": handoff, "steps": state.get('steps', 0) + 1}
+
+def _llm_update(state: AgentState, response: AIMessage) -> dict:
+    # This agent's LLM is bound to no tools, so its answer is normally final. Should it still ask
+    # for a tool, the request belongs to another agent, so control returns to the supervisor.
+    return _update(state, response, None if getattr(response, 'tool_calls', None) else "END")
 
 def text_processing_agent(state: AgentState) -> AgentState:
     """
-    An agent designed for general text processing and handling simple, non-tool-specific queries.
-    This serves as a default agent when other specialized agents are not applicable.
-    It can be expanded to leverage an LLM for conversational responses or specific text operations.
+    An agent for general text processing and simple, non-tool-specific queries; the default agent
+    when no specialized agent applies.
+    Counts, regex extraction, de-duplication, keywords and extractive summaries are computed locally.
+    Other requests about a document (e.g., a summary) are sent to the LLM in parallel chunks with a
+    reduce step, so long documents neither exceed the context window nor run in one long call.
+    Requests without a document are answered by the LLM directly, from this agent's projection of
+    the conversation (see agents/context.py).
     """
-    print("---Executing Text Processing Agent---")
-    messages = state['messages']
+    logger.info("---Executing Text Processing Agent---")
+    instruction, document, local = _prepare(state)
+    if local is not None:
+        return _update(state, local)
+
+    if document:
+        result = map_reduce.run(ollama_llms.llm_text_processing, instruction, document)
+        tracer.annotate(text_mode="map_reduce", document_chars=len(document), **result.as_dict())
+        return _update(state, AIMessage(content=result.answer))
 
-    # --- Agent Logic Placeholder ---
-    # Implement your text processing logic here. Examples:
-    # 1. Using an LLM for general conversation or information retrieval:
-    #    response = llm_agent.invoke(messages)
-    #    messages.append(response)
-    # 2. Performing string manipulations, regex matching, etc.
-    #    processed_text = perform_text_operation(messages[-1].content)
-    #    messages.append(AIMessage(content=f"Processed text: {processed_text}"))
+    messages = context_projector.for_agent("text_processing_agent", state['messages'], ())
+    return _llm_update(state, ollama_llms.llm_text_processing.invoke(messages))
+
+async def atext_processing_agent(state: AgentState) -> AgentState:
+    """
+    Async variant of 'text_processing_agent': the chunk and reduce calls are awaited concurrently.
+    """
+    logger.info("---Executing Text Processing Agent---")
+    instruction, document, local = _prepare(state)
+    if local is not None:
+        return _update(state, local)
 
-    # For demonstration purposes, we'll just add a placeholder message:
-    messages.append(AIMessage(content="Text Processing Agent handled the request. For specific tasks, specialized agents are available."))
+    if document:
+        result = await map_reduce.arun(ollama_llms.llm_text_processing, instruction, document)
+        tracer.annotate(text_mode="map_reduce", document_chars=len(document), **result.as_dict())
+        return _update(state, AIMessage(content=result.answer))
 
-    return {"messages": messages}
\ No newline at end of file
+    messages = context_projector.for_agent("text_processing_agent", state['messages'], ())
+    return _llm_update(state, await ollama_llms.llm_text_processing.ainvoke(messages))
@@ -0,0 +1,232 @@
+"""
+Offline batch runner: replays a JSONL file of requests through the compiled graph.
+
+Requests are read lazily (one JSON object per line) and run on a bounded pool of async workers
+sharing one event loop. One JSONL result is appended per request as soon as it finishes (answer,
+route taken, per-node latency, token usage), so a crashed run can be resumed with '--resume':
+requests whose id already appears in the output file are skipped. Throughput and latency
+percentiles are printed at the end.
+
+Usage (from the repository root):
+    python batch_runner.py requests.jsonl -o results.jsonl [--concurrency 8] [--resume]
+    python batch_runner.py requests.jsonl -o results.jsonl --id-field request_id --input-field body
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from langchain_core.callbacks import UsageMetadataCallbackHandler
+
+from main import astream_agent, final_message_in
+from observability.exporters import percentile
+from observability.logs import configure_logging
+from observability.tracing import configure_tracing
+
+# Percentiles reported in the summary.
+PERCENTILES = (50, 90, 95, 99)
+
+
+def read_requests(path: str, id_field: str, input_field: str) -> Iterator[Tuple[str, str]]:
+    """
+    Lazily reads (request id, input text) pairs from a JSONL file. Blank lines are skipped and
+    requests without an id are identified by their line number.
+
+    Args:
+        path (str): The JSONL file with one request object per line.
+        id_field (str): The field holding the request id.
+        input_field (str): The field holding the user's input message.
+
+    Yields:
+        Tuple[str, str]: The request id and its input message.
+    """
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if isinstance(record, str):
+                yield str(line_number), record
+                continue
+            yield str(record.get(id_field, line_number)), str(record[input_field])
+
+
+def completed_ids(path: str) -> Set[str]:
+    """
+    Collects the ids of the requests already recorded in a results file. A line truncated by a
+    crash is ignored, so its request is run again.
+    """
+    done: Set[str] = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                done.add(str(json.loads(line)["id"]))
+            except (ValueError, KeyError, TypeError):
+                continue
+    return done
+
+
+def _total_usage(callback: UsageMetadataCallbackHandler) -> Dict[str, int]:
+    totals = {"input_tokens": 0, "output_tokens": 0, "total_tokens": 0}
+    for usage in callback.usage_metadata.values():
+        for key in totals:
+            totals[key] += usage.get(key, 0)
+    return totals
+
+
+async def run_request(request_id: str, input_message: str, config: Optional[dict] = None) -> Dict[str, Any]:
+    """
+    Runs one request through the graph and builds its result record.
+
+    Returns:
+        Dict[str, Any]: The result with 'id', 'input', 'answer', 'route', 'node_latencies',
+        'latency_s', 'tokens' and 'error' (None on success).
+    """
+    usage = UsageMetadataCallbackHandler()
+    run_config = {**(config or {}), "callbacks": [usage]}
+    route: List[str] = []
+    node_latencies: List[Dict[str, Any]] = []
+    node_started: Dict[str, float] = {}
+    final_message = None
+    error = None
+    started = time.perf_counter()
+
+    try:
+        async for event in astream_agent(input_message, run_config, tokens=False):
+            if event.kind == "node_start":
+                node_started[event.node] = event.elapsed
+            elif event.kind == "node_end":
+                route.append(event.node)
+                node_latencies.append({"node": event.node,
+                                       "latency_s": round(event.elapsed - node_started.pop(event.node, event.elapsed), 6)})
+                final_message = final_message_in(event.data) or final_message
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+
+    return {
+        "id": request_id,
+        "input": input_message,
+        "answer": str(final_message.content) if final_message is not None else None,
+        "route": route,
+        "node_latencies": node_latencies,
+        "latency_s": round(time.perf_counter() - started, 6),
+        "tokens": _total_usage(usage),
+        "error": error,
+    }
+
+
+async def run_batch(requests: Iterator[Tuple[str, str]], output_path: str, concurrency: int = 8,
+                    skip_ids: Optional[Set[str]] = None, config: Optional[dict] = None) -> Dict[str, Any]:
+    """
+    Runs requests with at most 'concurrency' in flight, appending each result to 'output_path'
+    as soon as it finishes.
+
+    Args:
+        requests (Iterator[Tuple[str, str]]): (request id, input message) pairs, consumed lazily.
+        output_path (str): The JSONL results file (appended to).
+        concurrency (int): Maximum number of requests running at the same time.
+        skip_ids (Optional[Set[str]]): Ids of requests to skip (e.g., already completed ones).
+        config (Optional[dict]): Extra run configuration applied to every request.
+
+    Returns:
+        Dict[str, Any]: Summary with request counts, throughput and latency percentiles.
+    """
+    skip_ids = skip_ids or set()
+    # A small buffer keeps the workers busy without reading the whole file into memory.
+    queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+    latencies: List[float] = []
+    counts = {"completed": 0, "errors": 0, "skipped": 0}
+
+    # Start on a fresh line if a previous run crashed in the middle of writing one.
+    needs_newline = os.path.exists(output_path) and os.path.getsize(output_path) > 0
+    if needs_newline:
+        with open(output_path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            needs_newline = f.read(1) != b"\n"
+
+    with open(output_path, "a", encoding="utf-8") as output:
+        if needs_newline:
+            output.write("\n")
+
+        async def worker():
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+                result = await run_request(*item, config=config)
+                # Lines are written from the event loop thread only, so they never interleave.
+                output.write(json.dumps(result, ensure_ascii=False) + "\n")
+                output.flush()
+                latencies.append(result["latency_s"])
+                counts["completed"] += 1
+                if result["error"]:
+                    counts["errors"] += 1
+
+        started = time.perf_counter()
+        workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+        for request_id, input_message in requests:
+            if request_id in skip_ids:
+                counts["skipped"] += 1
+                continue
+            await queue.put((request_id, input_message))
+        for _ in workers:
+            await queue.put(None)
+        await asyncio.gather(*workers)
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        **counts,
+        "elapsed_s": elapsed,
+        "throughput_rps": counts["completed"] / elapsed if elapsed > 0 else 0.0,
+        **{f"latency_p{p}_s": percentile(latencies, p) for p in PERCENTILES},
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("input", help="JSONL file with one request per line.")
+    parser.add_argument("-o", "--output", required=True, help="JSONL file the results are appended to.")
+    parser.add_argument("--concurrency", type=int, default=8, help="Maximum number of requests in flight.")
+    parser.add_argument("--resume", action="store_true", help="Skip requests already present in the output file.")
+    parser.add_argument("--id-field", default="id", help="Request field holding the request id.")
+    parser.add_argument("--input-field", default="input", help="Request field holding the user's message.")
+    parser.add_argument("--verbose", action="store_true", help="Show the per-node progress output.")
+    parser.add_argument("--trace-jsonl", help="Append every trace span (runs, nodes, LLM and tool calls) to this file.")
+    parser.add_argument("--histograms", action="store_true", help="Print per-node/LLM/tool latency percentiles at the end.")
+    parser.add_argument("--warmup", action="store_true",
+                        help="Load the model and prime the supervisor prompt prefix before the first request.")
+    args = parser.parse_args(argv)
+
+    if not args.resume and os.path.exists(args.output) and os.path.getsize(args.output) > 0:
+        parser.error(f"{args.output} already exists; pass --resume to continue it or choose another file.")
+
+    skip_ids = completed_ids(args.output) if args.resume else set()
+    requests = read_requests(args.input, args.id_field, args.input_field)
+    # The per-node progress output is noise at batch scale; only warnings are shown unless requested.
+    configure_logging("INFO" if args.verbose else "WARNING")
+    histograms = configure_tracing(args.trace_jsonl, args.histograms or None)
+    if args.warmup:
+        from llms import ollama_llms
+        from supervisor.prompts import SUPERVISOR_PROMPT_PREFIX
+        warmup = ollama_llms.llm_backend.warm_up(SUPERVISOR_PROMPT_PREFIX)
+        if warmup is not None:
+            print(f"Warm-up: cold request {warmup.cold_ms:.0f} ms, warm request {warmup.warm_ms:.0f} ms")
+    summary = asyncio.run(run_batch(requests, args.output, args.concurrency, skip_ids))
+
+    print(f"Completed {summary['completed']} requests ({summary['errors']} errors, "
+          f"{summary['skipped']} skipped) in {summary['elapsed_s']:.1f}s")
+    print(f"Throughput: {summary['throughput_rps']:.2f} requests/s")
+    print("Latency: " + ", ".join(f"p{p} {summary[f'latency_p{p}_s']:.2f}s" for p in PERCENTILES))
+    if histograms is not None:
+        print("\n" + histograms.format_table())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
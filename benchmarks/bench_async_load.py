@@ -0,0 +1,113 @@
+"""
+Async load test: many concurrent sessions sharing one event loop.
+
+Every session runs the compiled graph through 'aget_final_answer' against fake LLMs with a fixed
+simulated latency (no Ollama required). Half of the requests take the LLM-routed text path and
+half take the fast-path calculator route with a tool call, so each session waits on at least one
+LLM call. Because the waits overlap on the event loop, throughput grows with concurrency only
+until the event loop's own CPU work per turn (graph steps, checkpointing, prompt formatting) is
+the bottleneck; beyond that, more sessions in flight add latency, not throughput. The benchmark
+reports the level at which throughput saturates: the first level after which a higher one adds
+less than 10% throughput (around 100 sessions with the defaults on a typical machine).
+
+Usage (from the repository root):
+    python -m benchmarks.bench_async_load [--sessions 400] [--concurrency 1 10 100 400] [--latency 0.05]
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import statistics
+import sys
+import time
+
+from benchmarks.fake_llm import fake_agent, fake_supervisor, patch_llms
+from observability.exporters import percentile
+
+
+def _request(index: int) -> str:
+    return f"What is {index} plus 7?" if index % 2 else f"Tell me something interesting #{index}"
+
+
+async def _run_level(aget_final_answer, sessions: int, concurrency: int) -> dict:
+    """Runs 'sessions' requests with at most 'concurrency' in flight and measures throughput."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(index: int):
+        async with semaphore:
+            started = time.perf_counter()
+            await aget_final_answer(_request(index))
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(sessions)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "sessions": sessions,
+        "elapsed_s": elapsed,
+        "throughput_rps": sessions / elapsed,
+        "latency_p50_s": statistics.median(latencies),
+        "latency_p95_s": percentile(latencies, 95),
+    }
+
+
+# A higher concurrency level must add at least this share of throughput to count as scaling.
+SATURATION_GAIN = 0.10
+
+
+def saturation(results: list) -> dict:
+    """Returns the level at which throughput stops growing (the best level if it never does)."""
+    for current, higher in zip(results, results[1:]):
+        if higher["throughput_rps"] < current["throughput_rps"] * (1 + SATURATION_GAIN):
+            return current
+    return max(results, key=lambda r: r["throughput_rps"])
+
+
+def run(sessions: int, levels: list, latency: float) -> list:
+    # Imported lazily so the fake LLMs are patched into already-loaded modules.
+    from main import aget_final_answer
+
+    results = []
+    with patch_llms(supervisor=fake_supervisor(latency), agent=fake_agent(latency)):
+        for concurrency in levels:
+            # Silence the per-node progress output; it is not what is being measured.
+            with contextlib.redirect_stdout(io.StringIO()):
+                result = asyncio.run(_run_level(aget_final_answer, sessions, concurrency))
+            results.append(result)
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 100, 400])
+    parser.add_argument("--latency", type=float, default=0.05, help="Simulated seconds per LLM call.")
+    parser.add_argument("--json", help="Optional path for machine-readable results.")
+    args = parser.parse_args(argv)
+
+    results = run(args.sessions, args.concurrency, args.latency)
+    baseline = results[0]["throughput_rps"]
+    print(f"{'concurrency':>11} {'throughput':>12} {'speedup':>8} {'p50':>9} {'p95':>9}")
+    for r in results:
+        print(f"{r['concurrency']:>11} {r['throughput_rps']:>8.1f} rps {r['throughput_rps'] / baseline:>7.1f}x "
+              f"{r['latency_p50_s'] * 1e3:>6.0f} ms {r['latency_p95_s'] * 1e3:>6.0f} ms")
+    saturated = saturation(results)
+    if saturated is not results[-1]:
+        print(f"\nThroughput saturates at concurrency {saturated['concurrency']} "
+              f"({saturated['throughput_rps']:.1f} rps); higher levels add latency, not throughput.")
+    else:
+        print(f"\nThroughput still grows at concurrency {saturated['concurrency']} "
+              f"({saturated['throughput_rps']:.1f} rps); try higher levels to find saturation.")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"levels": results, "saturation_concurrency": saturated["concurrency"]}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
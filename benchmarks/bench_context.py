@@ -0,0 +1,116 @@
+"""
+Context projection benchmark: input tokens of the worker agents' LLM calls with and without projection.
+
+Replays one multi-turn session (news for several tickers, calculations, follow-ups) through the
+graph with fake LLMs, once with the context projection disabled (full history) and once enabled
+(see agents/context.py). For each agent it reports the estimated input tokens sent (messages plus
+the agent's own tool schemas) and the messages the LLM actually received. The reduction compares
+the projected calls with the unprojected baseline of the same calls: the whole history and every
+tool schema, as sent before agents had their own context and tools. The benchmark fails if it is
+below '--min-reduction', if an answer changes, or if a projected input holds a tool result
+without its call.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_context [--turns 12] [--min-reduction 0.5] [--json results.json]
+"""
+import argparse
+import json
+import sys
+
+from langchain_core.messages import AIMessage, ToolMessage
+
+from benchmarks.fake_llm import calculator_or_news_tool_calls, fake_news_fetcher, fake_supervisor, FakeChatModel, patch_llms
+
+REQUESTS = ["Get the latest news for AAPL", "What is 12 plus 30?", "Any news on MSFT and NVDA?",
+            "Multiply 7 by 6", "Show me news for TSLA", "What is 100 minus 58?"]
+
+
+def _valid(messages) -> bool:
+    # Every tool result must follow the AI message that called it.
+    called = set()
+    for msg in messages:
+        if isinstance(msg, AIMessage):
+            called.update(call['id'] for call in msg.tool_calls)
+        elif isinstance(msg, ToolMessage) and msg.tool_call_id not in called:
+            return False
+    return True
+
+
+def run(turns: int) -> dict:
+    """
+    Replays the session with projection off and on.
+
+    Returns:
+        dict: Per-mode token counts per agent, the answers' agreement and the validity check.
+    """
+    # Imported lazily so the fakes are patched into already-loaded modules.
+    import main
+    from agents.context import context_projector
+    from tools.tools import news_cache
+
+    received = []
+
+    def respond(messages):
+        received.append(list(messages))
+        return calculator_or_news_tool_calls(messages)
+
+    results = {"turns": turns, "modes": {}}
+    answers = {}
+    default_fetcher, default_enabled = news_cache.fetcher, context_projector.enabled
+    news_cache.fetcher = fake_news_fetcher()
+    try:
+        with patch_llms(supervisor=fake_supervisor(), agent=FakeChatModel(responder=respond)):
+            for enabled in (False, True):
+                mode = "projected" if enabled else "full"
+                context_projector.enabled = enabled
+                context_projector.reset()
+                received.clear()
+                config = {"configurable": {"thread_id": f"context-{mode}", "fast_path": False}}
+                answers[mode] = [getattr(main.get_final_answer(REQUESTS[i % len(REQUESTS)], config), "content", None)
+                                 for i in range(turns)]
+                results["modes"][mode] = {
+                    "agents": context_projector.report(),
+                    "llm_calls": len(received),
+                    "max_messages": max((len(messages) for messages in received), default=0),
+                    "valid": all(_valid(messages) for messages in received),
+                }
+    finally:
+        news_cache.fetcher, context_projector.enabled = default_fetcher, default_enabled
+
+    agents = results["modes"]["projected"]["agents"].values()
+    full = sum(agent["full_tokens"] for agent in agents)
+    projected = sum(agent["projected_tokens"] for agent in agents)
+    results["reduction"] = 1 - projected / full if full else 0.0
+    results["answers_match"] = answers["full"] == answers["projected"]
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--turns", type=int, default=12, help="Number of turns in the replayed session.")
+    parser.add_argument("--min-reduction", type=float, default=0.5, help="Minimum share of input tokens saved.")
+    parser.add_argument("--json", help="Optional path for machine-readable results.")
+    args = parser.parse_args(argv)
+
+    results = run(args.turns)
+    print(f"Session of {results['turns']} turns, estimated agent LLM input tokens:")
+    for mode, data in results["modes"].items():
+        print(f"\n{mode} ({data['llm_calls']} calls, up to {data['max_messages']} messages per call):")
+        for agent, stats in data["agents"].items():
+            print(f"  {agent:<20}{stats['calls']:>4} calls {stats['projected_tokens']:>10} tokens "
+                  f"({stats['projected_tokens'] / stats['calls']:.0f} per call)")
+    print(f"\nReduction against the full history with every tool: {results['reduction']:.0%} "
+          f"(min {args.min_reduction:.0%}), "
+          f"answers match: {results['answers_match']}, "
+          f"valid inputs: {results['modes']['projected']['valid']}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+    ok = results["reduction"] >= args.min_reduction and results["answers_match"] and results["modes"]["projected"]["valid"]
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,149 @@
+"""
+Dataset engine benchmark: throughput and peak memory of the data analysis tools on large files.
+
+Generates a CSV and a Parquet file at two sizes ('--rows' and 4x as many rows), then profiles each
+file and runs a group-by aggregation in a fresh interpreter, recording the wall time and the
+process's peak RSS. The engine reads files in fixed-size chunks, so the peak memory must not scale
+with the file size: the benchmark fails if the larger file needs more than MEMORY_SLACK_MB more
+memory than the smaller one. A repeated 'describe' call must be answered from the profile cache.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_datasets [--rows 1000000] [--chunk-rows 250000] [--dir /tmp/data] [--json results.json]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.fake_llm import REPO_ROOT
+
+# Peak memory the larger file may use beyond the smaller one's.
+MEMORY_SLACK_MB = 32.0
+# Rows generated per write, so generating the files is memory-bounded too.
+GENERATE_CHUNK_ROWS = 200_000
+
+# Runs in a fresh interpreter; prints the timings of each phase and the peak RSS as JSON.
+_PROBE = """
+import json, resource, sys, time
+import pandas, pyarrow.parquet
+from tools.datasets import DatasetEngine
+
+def peak_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024 # kB on Linux
+
+engine = DatasetEngine(root=%r, chunk_rows=%d)
+started = time.perf_counter()
+profile = engine.profile(%r)
+profiled = time.perf_counter()
+engine.aggregate(%r, "revenue", "sum", group_by=["region", "store"])
+aggregated = time.perf_counter()
+engine.profile(%r)
+cached = time.perf_counter()
+print(json.dumps({"rows": profile.rows, "profile_s": profiled - started, "group_by_s": aggregated - profiled,
+                  "cached_profile_s": cached - aggregated, "peak_mb": peak_mb()}))
+"""
+
+
+def generate(directory: str, rows: int, seed: int = 0) -> dict:
+    """
+    Writes a synthetic sales table with 'rows' rows as CSV and Parquet, chunk by chunk.
+
+    Returns:
+        dict: The file names and their sizes in MB.
+    """
+    import numpy as np
+    import pandas as pd
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    rng = np.random.default_rng(seed)
+    csv_name, parquet_name = f"sales_{rows}.csv", f"sales_{rows}.parquet"
+    csv_path, parquet_path = os.path.join(directory, csv_name), os.path.join(directory, parquet_name)
+    writer = None
+    for start in range(0, rows, GENERATE_CHUNK_ROWS):
+        size = min(GENERATE_CHUNK_ROWS, rows - start)
+        chunk = pd.DataFrame({
+            "region": rng.choice(["north", "south", "east", "west"], size),
+            "store": rng.integers(0, 200, size),
+            "revenue": rng.gamma(2.0, 50.0, size).round(2),
+            "quantity": rng.integers(1, 20, size),
+            "note": rng.choice(["", "promo", "return", "online"], size),
+        })
+        chunk.to_csv(csv_path, mode="w" if start == 0 else "a", header=start == 0, index=False)
+        table = pa.Table.from_pandas(chunk, preserve_index=False)
+        if writer is None:
+            writer = pq.ParquetWriter(parquet_path, table.schema)
+        writer.write_table(table)
+    writer.close()
+    return {name: os.path.getsize(os.path.join(directory, name)) / 2**20 for name in (csv_name, parquet_name)}
+
+
+def probe(directory: str, name: str, chunk_rows: int) -> dict:
+    """Profiles and aggregates one file in a new interpreter and reports time and memory."""
+    output = subprocess.run([sys.executable, "-c", _PROBE % (directory, chunk_rows, name, name, name)],
+                            cwd=REPO_ROOT, capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def run(directory: str, rows: int, chunk_rows: int) -> dict:
+    """
+    Generates the files and measures every (format, size) combination.
+
+    Returns:
+        dict: Per-file results and, per format, whether the peak memory stayed bounded.
+    """
+    sizes = {}
+    for count in (rows, rows * 4):
+        sizes.update(generate(directory, count))
+
+    files = {}
+    for name, size_mb in sizes.items():
+        result = probe(directory, name, chunk_rows)
+        result["file_mb"] = size_mb
+        result["rows_per_s"] = result["rows"] / result["profile_s"] if result["profile_s"] else 0.0
+        files[name] = result
+
+    bounded = {}
+    for extension in ("csv", "parquet"):
+        small = files[f"sales_{rows}.{extension}"]["peak_mb"]
+        large = files[f"sales_{rows * 4}.{extension}"]["peak_mb"]
+        bounded[extension] = large <= small + MEMORY_SLACK_MB
+    cache_hits = all(f["cached_profile_s"] < f["profile_s"] / 10 for f in files.values())
+    return {"rows": rows, "chunk_rows": chunk_rows, "files": files, "memory_bounded": bounded,
+            "profile_cache_hits": cache_hits}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Rows of the smaller file (the larger has 4x).")
+    parser.add_argument("--chunk-rows", type=int, default=250_000, help="Rows read per chunk by the engine.")
+    parser.add_argument("--dir", help="Directory for the generated files (default: a temporary directory).")
+    parser.add_argument("--json", help="Optional path for machine-readable results.")
+    args = parser.parse_args(argv)
+
+    if args.dir:
+        os.makedirs(args.dir, exist_ok=True)
+        results = run(os.path.abspath(args.dir), args.rows, args.chunk_rows)
+    else:
+        with tempfile.TemporaryDirectory() as directory:
+            results = run(directory, args.rows, args.chunk_rows)
+
+    print(f"{'file':<28}{'MB':>9}{'profile s':>11}{'rows/s':>13}{'group-by s':>12}{'cached ms':>11}{'peak MB':>10}")
+    for name, f in results["files"].items():
+        print(f"{name:<28}{f['file_mb']:>9.1f}{f['profile_s']:>11.2f}{f['rows_per_s']:>13,.0f}"
+              f"{f['group_by_s']:>12.2f}{f['cached_profile_s'] * 1e3:>11.2f}{f['peak_mb']:>10.1f}")
+    for extension, ok in results["memory_bounded"].items():
+        print(f"{extension}: peak memory {'bounded' if ok else 'GROWS WITH FILE SIZE'}")
+    print(f"Profile cache: {'hit' if results['profile_cache_hits'] else 'MISSED'}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+    return 0 if all(results["memory_bounded"].values()) and results["profile_cache_hits"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
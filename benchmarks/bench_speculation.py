@@ -0,0 +1,130 @@
+"""
+Speculative execution benchmark: turn latency with and without speculative agent calls.
+
+Runs LLM-routed turns (the deterministic pre-router is disabled, so every turn asks the supervisor
+LLM) through the graph with fake LLMs of fixed latency, once serially and once in speculative
+mode, in the synchronous and the async graph. When the predicted agent is confirmed, its first
+LLM call has already run alongside the supervisor's, so a turn should cost about one LLM latency
+less. The benchmark fails unless the speculative median is at most 75% of the serial median, or
+if a misprediction (a supervisor that overrules the prediction) changes the answer.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_speculation [--runs 5] [--latency 0.1] [--json results.json]
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+
+from langchain_core.messages import AIMessage
+
+from benchmarks.fake_llm import fake_agent, fake_news_fetcher, fake_supervisor, patch_llms, route_by_keyword
+from supervisor.prompts import ROUTE_LABELS
+
+REQUESTS = ["What is 12 plus 30?", "Get the latest news for AAPL", "Multiply 7 by 6", "Any news on MSFT today?"]
+# Speculative turns must take at most this fraction of the serial turn time.
+MAX_RATIO = 0.75
+
+_TEXT_LABEL = next(label for label, route in ROUTE_LABELS.items() if route == "text_processing_agent")
+
+
+def overrule(messages) -> AIMessage:
+    """Supervisor responder that routes the first request to the text processing agent, then ends."""
+    route = route_by_keyword(messages)
+    latest = str(messages[-1].content).rsplit("Latest message:", 1)[-1].lower()
+    return route if "agent handled" in latest or latest.strip().startswith(("ai:", "here is", "the answer")) \
+        else AIMessage(content=_TEXT_LABEL)
+
+
+def _config(speculative: bool, thread: str) -> dict:
+    return {"configurable": {"fast_path": False, "speculative": speculative, "thread_id": thread}}
+
+
+def _time_turns(main, speculative: bool, runs: int, use_async: bool) -> list:
+    timings = []
+    for run in range(runs):
+        for i, request in enumerate(REQUESTS):
+            config = _config(speculative, f"spec-{speculative}-{use_async}-{run}-{i}")
+            started = time.perf_counter()
+            if use_async:
+                asyncio.run(main.aget_final_answer(request, config))
+            else:
+                main.get_final_answer(request, config)
+            timings.append(time.perf_counter() - started)
+    return timings
+
+
+def run(runs: int, latency: float) -> dict:
+    """
+    Times the turns in both modes and checks a mispredicted turn.
+
+    Returns:
+        dict: Median turn latencies per mode, speculation statistics and the pass/fail checks.
+    """
+    # Imported lazily so the fakes are patched into already-loaded modules.
+    import main
+    from supervisor.speculation import SpeculationStats, speculative_executor
+    from tools.tools import news_cache
+
+    results = {"latency_s": latency, "runs": runs, "modes": {}}
+    default_fetcher = news_cache.fetcher
+    news_cache.fetcher = fake_news_fetcher()
+    try:
+        with patch_llms(supervisor=fake_supervisor(latency), agent=fake_agent(latency)):
+            for use_async in (False, True):
+                graph = "async" if use_async else "sync"
+                for speculative in (False, True):
+                    speculative_executor.stats = SpeculationStats()
+                    timings = _time_turns(main, speculative, runs, use_async)
+                    results["modes"][f"{graph}.{'speculative' if speculative else 'serial'}"] = {
+                        "median_s": statistics.median(timings), "speculation": speculative_executor.stats.as_dict()}
+
+        # A misprediction: the classifier predicts the calculator, the supervisor picks another agent.
+        speculative_executor.stats = SpeculationStats()
+        answers = []
+        with patch_llms(supervisor=fake_supervisor(latency, responder=overrule), agent=fake_agent(latency)):
+            for speculative in (False, True):
+                answer = main.get_final_answer(REQUESTS[0], _config(speculative, f"miss-{speculative}"))
+                answers.append(answer.content if answer is not None else None)
+        results["misprediction"] = {"answers_match": answers[0] == answers[1],
+                                    "speculation": speculative_executor.stats.as_dict()}
+    finally:
+        news_cache.fetcher = default_fetcher
+
+    modes = results["modes"]
+    results["ratios"] = {graph: modes[f"{graph}.speculative"]["median_s"] / modes[f"{graph}.serial"]["median_s"]
+                         for graph in ("sync", "async")}
+    results["faster"] = all(ratio <= MAX_RATIO for ratio in results["ratios"].values())
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5, help="Passes over the request set per mode.")
+    parser.add_argument("--latency", type=float, default=0.1, help="Simulated latency per LLM call (seconds).")
+    parser.add_argument("--json", help="Optional path for machine-readable results.")
+    args = parser.parse_args(argv)
+
+    results = run(args.runs, args.latency)
+    print(f"Median turn latency ({len(REQUESTS)} requests x {args.runs} runs, {args.latency * 1e3:.0f} ms per LLM call):")
+    for name, mode in results["modes"].items():
+        hit_rate = f"   hit rate: {mode['speculation']['hit_rate']:.0%}" if mode["speculation"]["started"] else ""
+        print(f"  {name:<18}{mode['median_s'] * 1e3:>10.1f} ms{hit_rate}")
+    for graph, ratio in results["ratios"].items():
+        print(f"  {graph} speculative / serial: {ratio:.2f} (max {MAX_RATIO})")
+    miss = results["misprediction"]
+    print(f"\nMisprediction: answers match: {miss['answers_match']}, "
+          f"misses: {miss['speculation']['misses']}, used: {miss['speculation']['used']}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+    overruled = miss["speculation"]["misses"] > 0 and miss["speculation"]["used"] == 0
+    return 0 if results["faster"] and miss["answers_match"] and overruled else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+"""
+Startup benchmark: how long a fresh process takes to import 'main' and to compile the graph.
+
+Each measurement runs in a new interpreter, so nothing is shared with earlier imports (the OS
+file cache is, which is what short-lived batch workers see too). Besides the wall times, the
+benchmark checks that importing 'main' does not load the heavy dependencies (langgraph, the
+OpenAI client, yfinance), which are only needed once the graph is built or a tool first runs,
+and lists the slowest imports reported by 'python -X importtime'.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_startup [--runs 10] [--top 15] [--json results.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List
+
+from benchmarks.fake_llm import REPO_ROOT
+
+# Modules that must not be loaded by 'import main'.
+HEAVY_MODULES = ("langgraph", "langchain_openai", "openai", "httpx", "yfinance", "pandas")
+
+# Timed in a fresh interpreter; prints the elapsed seconds of each phase as JSON.
+_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import main
+imported = time.perf_counter()
+heavy = sorted({name.split(".")[0] for name in sys.modules} & set(%r))
+if %r:
+    main.get_app()
+compiled = time.perf_counter()
+print(json.dumps({"import_s": imported - started, "compile_s": compiled - imported, "heavy_modules": heavy}))
+"""
+
+
+def probe(compile_graph: bool) -> dict:
+    """Imports 'main' (and optionally compiles the graph) in a new interpreter and times it."""
+    output = subprocess.run([sys.executable, "-c", _PROBE % (HEAVY_MODULES, compile_graph)], cwd=REPO_ROOT,
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def slowest_imports(top: int) -> List[Dict[str, object]]:
+    """
+    Runs 'import main' under 'python -X importtime'.
+
+    Returns:
+        List[Dict[str, object]]: The 'top' modules with the largest cumulative import time.
+    """
+    stderr = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"], cwd=REPO_ROOT,
+                            capture_output=True, text=True, check=True).stderr
+    rows = []
+    for line in stderr.splitlines():
+        # Lines look like: "import time:       123 |       4567 |   module.name"
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line[len("import time:"):].split("|")
+        rows.append({"module": module.strip(), "cumulative_ms": int(cumulative) / 1e3})
+    rows.sort(key=lambda row: row["cumulative_ms"], reverse=True)
+    return rows[:top]
+
+
+def run(runs: int, top: int) -> dict:
+    """
+    Measures the import and compile times over 'runs' fresh processes.
+
+    Returns:
+        dict: Median and max timings, the heavy modules loaded by the import and the slowest imports.
+    """
+    imports = [probe(compile_graph=False) for _ in range(runs)]
+    compiles = [probe(compile_graph=True) for _ in range(runs)]
+    import_times = [p["import_s"] for p in imports]
+    compile_times = [p["compile_s"] for p in compiles]
+    heavy = sorted({name for p in imports for name in p["heavy_modules"]})
+    return {
+        "runs": runs,
+        "import_median_s": statistics.median(import_times),
+        "import_max_s": max(import_times),
+        "compile_median_s": statistics.median(compile_times),
+        "compile_max_s": max(compile_times),
+        "heavy_modules_on_import": heavy,
+        # Importing 'main' must leave the heavy dependencies for later.
+        "lazy_imports": not heavy,
+        "slowest_imports": slowest_imports(top),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=10, help="Fresh processes per measurement.")
+    parser.add_argument("--top", type=int, default=15, help="Number of slowest imports to list.")
+    parser.add_argument("--json", help="Optional path for machine-readable results.")
+    args = parser.parse_args(argv)
+
+    # Keep the probes offline and quiet: no persistent caches or sessions are opened.
+    for name in ("LLM_CACHE_DB_PATH", "NEWS_CACHE_DB_PATH", "SESSION_DB_PATH", "TRACE_JSONL_PATH"):
+        os.environ.pop(name, None)
+
+    results = run(args.runs, args.top)
+    print(f"import main:   median {results['import_median_s'] * 1e3:8.1f} ms   max {results['import_max_s'] * 1e3:8.1f} ms")
+    print(f"first compile: median {results['compile_median_s'] * 1e3:8.1f} ms   max {results['compile_max_s'] * 1e3:8.1f} ms")
+    print(f"Heavy modules loaded by 'import main': {', '.join(results['heavy_modules_on_import']) or 'none'}")
+    print("\nSlowest imports (cumulative):")
+    for row in results["slowest_imports"]:
+        print(f"{row['cumulative_ms']:>10.1f} ms  {row['module']}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+    return 0 if results["lazy_imports"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+"""
+Regression benchmark for the size of the shared conversation state.
+
+Runs a scripted supervisor <-> worker ping-pong through a StateGraph built on the real
+'AgentState' (and therefore the real 'messages' reducer) for a 50-step run under the same
+recursion_limit used by 'run_agent'. Every worker hop contributes exactly one new message,
+so the history must grow by a constant amount per step and the per-step time must stay flat.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_state_growth [--steps 50] [--json results.json]
+"""
+import argparse
+import json
+import pickle
+import statistics
+import sys
+import time
+
+from langchain_core.messages import HumanMessage, AIMessage
+from langgraph.graph import StateGraph, END
+
+from state import AgentState
+
+RECURSION_LIMIT = 50 # Mirrors the limit used by run_agent in main.py
+
+
+def build_ping_pong_graph(worker_hops: int):
+    """
+    Builds a two-node graph that alternates between a scripted supervisor and a worker.
+
+    Args:
+        worker_hops (int): How many times the supervisor routes to the worker before ending.
+
+    Returns:
+        The compiled graph.
+    """
+    def supervisor(state: AgentState) -> dict:
+        # Count worker replies instead of calling an LLM, so the run is deterministic.
+        worker_replies = sum(1 for m in state['messages'] if isinstance(m, AIMessage))
+        return {"next": "worker" if worker_replies < worker_hops else "END"}
+
+    def worker(state: AgentState) -> dict:
+        # Return only the new message, exactly like the real agents do.
+        return {"messages": [AIMessage(content=f"Worker reply #{len(state['messages'])}")]}
+
+    workflow = StateGraph(AgentState)
+    workflow.add_node("supervisor", supervisor)
+    workflow.add_node("worker", worker)
+    workflow.set_entry_point("supervisor")
+    workflow.add_conditional_edges("supervisor", lambda state: state['next'], {"worker": "worker", "END": END})
+    workflow.add_edge("worker", "supervisor")
+    return workflow.compile()
+
+
+def run(steps: int) -> dict:
+    """
+    Executes the ping-pong run and records the state size and latency of every step.
+
+    Args:
+        steps (int): Total number of graph steps (supervisor and worker hops combined).
+
+    Returns:
+        dict: Per-step measurements and the derived regression verdict.
+    """
+    # A run of N steps is (N - 1) / 2 worker hops plus the supervisor hops around them.
+    worker_hops = (steps - 1) // 2
+    app = build_ping_pong_graph(worker_hops)
+    initial_state = {"messages": [HumanMessage(content="benchmark")]}
+
+    per_step = []
+    last = time.perf_counter()
+    for values in app.stream(initial_state, {"recursion_limit": RECURSION_LIMIT}, stream_mode="values"):
+        now = time.perf_counter()
+        messages = values.get('messages', [])
+        per_step.append({
+            "step": len(per_step),
+            "message_count": len(messages),
+            "state_bytes": len(pickle.dumps(messages)),
+            "step_seconds": now - last,
+        })
+        last = now
+
+    # The first entry is the input state; it has no step latency worth comparing.
+    timed = per_step[1:]
+    window = max(1, len(timed) // 5)
+    early = statistics.median(s["step_seconds"] for s in timed[:window])
+    late = statistics.median(s["step_seconds"] for s in timed[-window:])
+    final_count = per_step[-1]["message_count"]
+
+    return {
+        "steps": len(timed),
+        "worker_hops": worker_hops,
+        "final_message_count": final_count,
+        "final_state_bytes": per_step[-1]["state_bytes"],
+        "early_step_median_s": early,
+        "late_step_median_s": late,
+        # One input message plus one message per worker hop means linear growth.
+        "linear_state": final_count == worker_hops + 1,
+        # Allow generous jitter; quadratic growth would show up as a large multiple.
+        "flat_step_time": late <= max(early * 3, early + 0.002),
+        "per_step": per_step,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--steps", type=int, default=RECURSION_LIMIT - 1)
+    parser.add_argument("--json", help="Optional path for machine-readable results.")
+    args = parser.parse_args(argv)
+
+    results = run(args.steps)
+    print(f"Steps: {results['steps']}  worker hops: {results['worker_hops']}")
+    print(f"Final message count: {results['final_message_count']}  state bytes: {results['final_state_bytes']}")
+    print(f"Median step time early/late: {results['early_step_median_s'] * 1e3:.3f} ms / {results['late_step_median_s'] * 1e3:.3f} ms")
+    print(f"Linear state growth: {results['linear_state']}  flat step time: {results['flat_step_time']}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+    return 0 if results["linear_state"] and results["flat_step_time"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
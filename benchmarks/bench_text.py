@@ -0,0 +1,136 @@
+"""
+Text processing benchmark: local operations and parallel map-reduce over long documents.
+
+Runs the text processing agent on a generated document of '--chars' characters:
+  - the local operations (statistics, extraction, de-duplication, keywords, extractive summary),
+    which must not call the LLM at all;
+  - a summary request, answered by map-reduce with a fake LLM of fixed latency, once per
+    concurrency level. The wall time should follow ceil(chunks / concurrency) LLM latencies plus
+    the reduce calls, not the document length; the benchmark fails if the highest level takes
+    more than twice that ideal.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_text [--chars 300000] [--concurrency 1 4 8] [--latency 0.05] [--json results.json]
+"""
+import argparse
+import json
+import math
+import random
+import sys
+import time
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from benchmarks.fake_llm import FakeChatModel, patch_llms
+from tools.text import chunk_text
+
+LOCAL_REQUESTS = {
+    "statistics": "Count the words in this text",
+    "extraction": "List the emails, links and dates in this text",
+    "deduplicate": "Remove duplicate lines from this text",
+    "keywords": "What are the keywords of this text?",
+    "extractive": "Give me the key sentences of this text",
+}
+_VOCABULARY = ("market revenue growth supply chain forecast model customer product team quarter report "
+               "analysis risk strategy pricing demand inventory logistics platform cloud data").split()
+
+
+def generate_document(chars: int, seed: int = 0) -> str:
+    """Builds a document of about 'chars' characters with paragraphs, contacts, links, dates and repeated lines."""
+    rng = random.Random(seed)
+    paragraphs = []
+    size = 0
+    while size < chars:
+        sentences = [" ".join(rng.choice(_VOCABULARY) for _ in range(rng.randint(8, 20))).capitalize() + "."
+                     for _ in range(rng.randint(3, 6))]
+        if rng.random() < 0.2:
+            sentences.append(f"Contact team{rng.randint(1, 50)}@example.com or see https://example.com/r/{rng.randint(1, 999)} "
+                             f"before 2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}.")
+        # Every tenth paragraph repeats the previous one, for the de-duplication request.
+        paragraph = paragraphs[-1] if paragraphs and rng.random() < 0.1 else " ".join(sentences)
+        paragraphs.append(paragraph)
+        size += len(paragraph) + 1
+    return "\n".join(paragraphs)[:chars]
+
+
+def _state(instruction: str, document: str) -> dict:
+    return {"messages": [HumanMessage(content=f"{instruction}:\n{document}")], "steps": 0}
+
+
+def run(chars: int, levels: list, latency: float) -> dict:
+    """
+    Times the local operations and the map-reduce summary at each concurrency level.
+
+    Returns:
+        dict: Per-operation timings, per-level map-reduce timings and the pass/fail checks.
+    """
+    # Imported lazily so the fake LLM is patched into an already-loaded module.
+    from agents import text_processing_agent as agent_module
+
+    document = generate_document(chars)
+    prompt_sizes = []
+
+    def summarize(messages):
+        prompt_sizes.append(len(str(messages[-1].content)))
+        return AIMessage(content="Growth, pricing risks and supply chain changes dominate this part.")
+
+    results = {"chars": len(document), "latency_s": latency, "local": {}, "map_reduce": []}
+    processor = agent_module.map_reduce
+    default_concurrency = processor.max_concurrency
+    with patch_llms(agent=FakeChatModel(responder=summarize, latency=latency)):
+        for name, instruction in LOCAL_REQUESTS.items():
+            prompt_sizes.clear()
+            started = time.perf_counter()
+            agent_module.text_processing_agent(_state(instruction, document))
+            results["local"][name] = {"elapsed_s": time.perf_counter() - started, "llm_calls": len(prompt_sizes)}
+
+        try:
+            for concurrency in levels:
+                processor.max_concurrency = concurrency
+                prompt_sizes.clear()
+                started = time.perf_counter()
+                agent_module.text_processing_agent(_state("Summarize this document", document))
+                results["map_reduce"].append({"concurrency": concurrency, "elapsed_s": time.perf_counter() - started,
+                                              "llm_calls": len(prompt_sizes), "max_prompt_chars": max(prompt_sizes)})
+        finally:
+            processor.max_concurrency = default_concurrency
+
+    chunks = sum(1 for _ in chunk_text(document, processor.chunk_chars, processor.overlap))
+    best = results["map_reduce"][-1]
+    # Ideal: the map calls in waves of 'concurrency', then one wave per reduce level (usually one).
+    reduce_waves = max(1, math.ceil((best["llm_calls"] - chunks) / best["concurrency"]))
+    results["chunks"] = chunks
+    results["ideal_s"] = (math.ceil(chunks / best["concurrency"]) + reduce_waves) * latency
+    results["local_without_llm"] = all(op["llm_calls"] == 0 for op in results["local"].values())
+    results["parallel"] = best["elapsed_s"] <= 2 * results["ideal_s"]
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--chars", type=int, default=300_000, help="Length of the generated document.")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8], help="Map-reduce concurrency levels.")
+    parser.add_argument("--latency", type=float, default=0.05, help="Simulated latency per LLM call (seconds).")
+    parser.add_argument("--json", help="Optional path for machine-readable results.")
+    args = parser.parse_args(argv)
+
+    results = run(args.chars, args.concurrency, args.latency)
+    print(f"Document: {results['chars']} characters, {results['chunks']} chunks")
+    print("\nLocal operations:")
+    for name, op in results["local"].items():
+        print(f"  {name:<14}{op['elapsed_s'] * 1e3:>10.1f} ms   LLM calls: {op['llm_calls']}")
+    print("\nMap-reduce summary:")
+    for level in results["map_reduce"]:
+        print(f"  concurrency {level['concurrency']:>3}{level['elapsed_s']:>10.2f} s   LLM calls: {level['llm_calls']:>4}"
+              f"   largest prompt: {level['max_prompt_chars']} chars")
+    print(f"\nIdeal at the highest level: {results['ideal_s']:.2f} s")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+    return 0 if results["local_without_llm"] and results["parallel"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
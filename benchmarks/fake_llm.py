@@ -0,0 +1,208 @@
+"""
+Offline stand-ins for the Ollama-backed chat models, used by the benchmarks.
+
+'FakeChatModel' is a LangChain chat model whose replies come from a Python callable and whose
+latency is simulated with 'time.sleep' / 'asyncio.sleep', so both the synchronous and the async
+graph paths can be exercised without a model server. 'patch_llms' swaps the fakes in for
+'llm_supervisor' and the agent LLMs, and 'fake_news_fetcher' replaces the yfinance network call
+behind the news cache.
+"""
+import asyncio
+import contextlib
+import json
+import os
+import re
+import sys
+import time
+import uuid
+from typing import Any, AsyncIterator, Callable, Iterator, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+from supervisor.prompts import ROUTE_LABELS
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+Responder = Callable[[List[BaseMessage]], AIMessage]
+
+# Marks a patched attribute that did not exist before patching.
+_UNSET = object()
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    A chat model that answers through 'responder' after a simulated 'latency' (in seconds).
+    When streamed, the reply is emitted word by word with 'token_latency' seconds between tokens.
+    """
+
+    responder: Responder
+    latency: float = 0.0
+    token_latency: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> "FakeChatModel":
+        # Tool schemas are irrelevant for scripted replies; the model answers the same either way.
+        return self
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        if self.latency:
+            time.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self.responder(messages))])
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                         run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self.responder(messages))])
+
+    @staticmethod
+    def _chunks(message: AIMessage) -> List[ChatGenerationChunk]:
+        # Words (with their trailing whitespace) become tokens; tool calls travel on the last chunk.
+        words = re.findall(r"\S+\s*", str(message.content)) or [""]
+        chunks = [ChatGenerationChunk(message=AIMessageChunk(content=word)) for word in words]
+        if message.tool_calls:
+            chunks[-1] = ChatGenerationChunk(message=AIMessageChunk(content=words[-1], tool_call_chunks=[
+                {"name": call["name"], "args": json.dumps(call["args"]), "id": call["id"], "index": i}
+                for i, call in enumerate(message.tool_calls)]))
+        return chunks
+
+    def _stream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                run_manager: Any = None, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        if self.latency:
+            time.sleep(self.latency)
+        for i, chunk in enumerate(self._chunks(self.responder(messages))):
+            if i and self.token_latency:
+                time.sleep(self.token_latency)
+            if run_manager:
+                run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+    async def _astream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                       run_manager: Any = None, **kwargs: Any) -> AsyncIterator[ChatGenerationChunk]:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        for i, chunk in enumerate(self._chunks(self.responder(messages))):
+            if i and self.token_latency:
+                await asyncio.sleep(self.token_latency)
+            if run_manager:
+                await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+
+# --- Scripted Responders ---
+
+_NUMBERS = re.compile(r"-?\d+(?:\.\d+)?")
+# Route -> label the supervisor LLM answers with.
+_LABELS = {route: label for label, route in ROUTE_LABELS.items()}
+
+
+def route_by_keyword(messages: List[BaseMessage]) -> AIMessage:
+    """
+    Supervisor responder: routes on keywords in the prompt's latest message, ending once an AI
+    answer is present. Answers with the route's label, like the real supervisor LLM.
+    """
+    prompt = str(messages[-1].content)
+    latest = prompt.rsplit("Latest message:", 1)[-1].lower()
+    if latest.strip().startswith(("ai:", "here is", "the answer")) or "agent handled" in latest:
+        return AIMessage(content=_LABELS["END"])
+    if "news" in latest:
+        return AIMessage(content=_LABELS["stock_news_agent"])
+    if _NUMBERS.search(latest):
+        return AIMessage(content=_LABELS["calculator_agent"])
+    return AIMessage(content=_LABELS["text_processing_agent"])
+
+
+def calculator_or_news_tool_calls(messages: List[BaseMessage]) -> AIMessage:
+    """
+    Agent responder: turns a request containing two numbers into a 'perform_calculation' tool
+    call, a request mentioning uppercase tickers into 'get_stock_news' calls, and anything else
+    (including sentiment prompts) into a short plain answer.
+    """
+    last = messages[-1]
+    text = str(last.content)
+    if isinstance(last, HumanMessage) and "Analyze the following news summaries" not in text:
+        numbers = _NUMBERS.findall(text)
+        if len(numbers) >= 2:
+            return AIMessage(content="", tool_calls=[{
+                "name": "perform_calculation", "id": f"call_{uuid.uuid4().hex[:8]}",
+                "args": {"a": float(numbers[0]), "b": float(numbers[1]), "operation": "add"},
+            }])
+        tickers = re.findall(r"\b[A-Z]{2,5}\b", text)
+        if tickers:
+            return AIMessage(content="", tool_calls=[{
+                "name": "get_stock_news", "id": f"call_{uuid.uuid4().hex[:8]}", "args": {"ticker": ticker},
+            } for ticker in dict.fromkeys(tickers)])
+    if isinstance(last, ToolMessage):
+        return AIMessage(content=f"The answer is {last.content}.")
+    return AIMessage(content="Generally positive sentiment with steady growth themes.")
+
+
+def fake_supervisor(latency: float = 0.0, responder: Responder = route_by_keyword,
+                    token_latency: float = 0.0) -> FakeChatModel:
+    """Creates a fake supervisor LLM."""
+    return FakeChatModel(responder=responder, latency=latency, token_latency=token_latency)
+
+
+def fake_agent(latency: float = 0.0, responder: Responder = calculator_or_news_tool_calls,
+               token_latency: float = 0.0) -> FakeChatModel:
+    """Creates a fake (tool-calling) agent LLM."""
+    return FakeChatModel(responder=responder, latency=latency, token_latency=token_latency)
+
+
+def fake_news_fetcher(latency: float = 0.0, articles_per_ticker: int = 5) -> Callable[[str], List[dict]]:
+    """
+    Creates an offline replacement for the yfinance news fetcher (see 'tools.tools.news_cache').
+
+    Args:
+        latency (float): Simulated seconds per fetch.
+        articles_per_ticker (int): Number of synthetic articles returned per ticker.
+    """
+    def fetch(ticker: str) -> List[dict]:
+        if latency:
+            time.sleep(latency)
+        return [{"title": f"{ticker} headline {i}",
+                 "summary": f"{ticker} reports strong growth and record revenue in segment {i}."}
+                for i in range(articles_per_ticker)]
+    return fetch
+
+
+@contextlib.contextmanager
+def patch_llms(supervisor: Optional[BaseChatModel] = None, agent: Optional[BaseChatModel] = None):
+    """
+    Temporarily replaces 'llm_supervisor' and/or the agent LLMs ('llm_agent', the unbound
+    'llm_agent_model' and the per-agent LLMs in 'ollama_llms.AGENT_TOOLSETS'; the fake answers the
+    same whatever tools are bound).
+
+    The project's modules look the LLMs up on 'llms.ollama_llms' at call time, so they are
+    swapped there (without building the real clients). Any other loaded module that bound these
+    names itself ('from llms.ollama_llms import llm_agent') has its global swapped as well.
+    Everything is restored on exit.
+    """
+    from llms import ollama_llms
+
+    replacements = {"llm_supervisor": supervisor, "llm_agent": agent, "llm_agent_model": agent,
+                    **{name: agent for name in ollama_llms.AGENT_TOOLSETS}}
+    originals = []
+    for module in list(sys.modules.values()):
+        module_file = getattr(module, "__file__", None) or ""
+        if module is not ollama_llms and not os.path.abspath(module_file).startswith(REPO_ROOT):
+            continue
+        for name, replacement in replacements.items():
+            # vars() rather than hasattr(), which would build the lazily created real clients.
+            if replacement is not None and (module is ollama_llms or name in vars(module)):
+                originals.append((module, name, vars(module).get(name, _UNSET)))
+                setattr(module, name, replacement)
+    try:
+        yield
+    finally:
+        for module, name, original in reversed(originals):
+            if original is _UNSET:
+                delattr(module, name) # Not built before patching; built lazily again on next use
+            else:
+                setattr(module, name, original)
@@ -0,0 +1,231 @@
+"""
+Local stand-in for the Ollama OpenAI-compatible endpoint.
+
+Serves '/v1/chat/completions' (plain and streamed) from the scripted responders in
+'benchmarks.fake_llm': requests that carry tool schemas are answered by the agent responder
+(tool calls, sentiment summaries), all others by the supervisor responder (routing decisions).
+Every response waits 'latency' seconds before its first token and streams the remaining tokens
+at 'token_rate' tokens per second, so the real ChatOpenAI clients, HTTP stack and streaming path
+can be exercised without a model server.
+
+Usage (from the repository root):
+    python -m benchmarks.fake_openai_server [--port 11435] [--latency 0.05] [--token-rate 50]
+    OLLAMA_BASE_URL=http://localhost:11435/v1 python main.py
+"""
+import argparse
+import json
+import re
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage, ToolMessage
+
+from benchmarks.fake_llm import Responder, calculator_or_news_tool_calls, route_by_keyword
+
+
+def to_langchain_messages(messages: List[dict]) -> List[BaseMessage]:
+    """Converts OpenAI chat messages into LangChain messages for the scripted responders."""
+    converted: List[BaseMessage] = []
+    for message in messages:
+        role, content = message.get("role"), message.get("content") or ""
+        if role == "assistant":
+            tool_calls = [{"name": call["function"]["name"], "id": call.get("id"),
+                           "args": json.loads(call["function"].get("arguments") or "{}")}
+                          for call in message.get("tool_calls") or []]
+            converted.append(AIMessage(content=content, tool_calls=tool_calls))
+        elif role == "tool":
+            converted.append(ToolMessage(content=content, tool_call_id=message.get("tool_call_id", "")))
+        elif role == "system":
+            converted.append(SystemMessage(content=content))
+        else:
+            converted.append(HumanMessage(content=content))
+    return converted
+
+
+def _openai_tool_calls(message: AIMessage) -> Optional[List[dict]]:
+    if not message.tool_calls:
+        return None
+    return [{"id": call["id"], "type": "function",
+             "function": {"name": call["name"], "arguments": json.dumps(call["args"])}}
+            for call in message.tool_calls]
+
+
+def _words(text: str) -> List[str]:
+    # Words (with their trailing whitespace) are the simulated tokens, as in 'FakeChatModel'.
+    return re.findall(r"\S+\s*", text)
+
+
+def _count_tokens(text: str) -> int:
+    # Same rough estimate as the supervisor prompt budget (about 4 characters per token).
+    return len(text) // 4 + 1
+
+
+class FakeOpenAIServer:
+    """A threaded HTTP server answering OpenAI chat completion requests from scripted responders."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0, token_rate: float = 0.0,
+                 supervisor: Responder = route_by_keyword, agent: Responder = calculator_or_news_tool_calls):
+        """
+        Args:
+            host (str): Interface to bind.
+            port (int): Port to bind (0 picks a free port).
+            latency (float): Simulated seconds before the first token of every response.
+            token_rate (float): Simulated tokens per second after the first token (0 = instant).
+            supervisor (Responder): Responder for requests without tools.
+            agent (Responder): Responder for requests with tools.
+        """
+        self.latency = latency
+        self.token_rate = token_rate
+        self.supervisor = supervisor
+        self.agent = agent
+        self.requests = 0
+        self._thread: Optional[threading.Thread] = None
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "FakeOpenAIServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="fake-openai-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        """Serves requests on the calling thread until interrupted."""
+        try:
+            self._httpd.serve_forever()
+        finally:
+            self._httpd.server_close()
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "FakeOpenAIServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def reply(self, body: dict) -> AIMessage:
+        self.requests += 1
+        responder = self.agent if body.get("tools") else self.supervisor
+        return responder(to_langchain_messages(body.get("messages", [])))
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass # Keep benchmark output clean
+
+            def _send_json(self, status: int, payload: dict) -> None:
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                if self.path.rstrip("/").endswith("/models"):
+                    self._send_json(200, {"object": "list", "data": [{"id": "fake", "object": "model"}]})
+                else:
+                    self._send_json(404, {"error": {"message": "not found"}})
+
+            def do_POST(self):
+                if not self.path.rstrip("/").endswith("/chat/completions"):
+                    self._send_json(404, {"error": {"message": "not found"}})
+                    return
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                message = server.reply(body)
+                if server.latency:
+                    time.sleep(server.latency)
+                if body.get("stream"):
+                    self._stream(body, message)
+                else:
+                    self._complete(body, message)
+
+            def _usage(self, body: dict, message: AIMessage) -> dict:
+                prompt_tokens = sum(_count_tokens(str(m.get("content") or "")) for m in body.get("messages", []))
+                completion_tokens = _count_tokens(str(message.content))
+                return {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                        "total_tokens": prompt_tokens + completion_tokens}
+
+            def _complete(self, body: dict, message: AIMessage) -> None:
+                content = str(message.content)
+                if server.token_rate:
+                    # The whole reply is returned at once, after the time streaming it would take.
+                    time.sleep(max(len(_words(content)) - 1, 0) / server.token_rate)
+                tool_calls = _openai_tool_calls(message)
+                reply = {"role": "assistant", "content": content}
+                if tool_calls:
+                    reply["tool_calls"] = tool_calls
+                self._send_json(200, {
+                    "id": f"chatcmpl-{uuid.uuid4().hex[:12]}", "object": "chat.completion",
+                    "created": int(time.time()), "model": body.get("model", "fake"),
+                    "choices": [{"index": 0, "message": reply, "finish_reason": "tool_calls" if tool_calls else "stop"}],
+                    "usage": self._usage(body, message),
+                })
+
+            def _stream(self, body: dict, message: AIMessage) -> None:
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                self.close_connection = True
+                base = {"id": f"chatcmpl-{uuid.uuid4().hex[:12]}", "object": "chat.completion.chunk",
+                        "created": int(time.time()), "model": body.get("model", "fake")}
+
+                def send(delta: dict, finish_reason: Optional[str] = None, usage: Optional[dict] = None):
+                    chunk = {**base, "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]}
+                    if usage is not None:
+                        chunk["usage"] = usage
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                    self.wfile.flush()
+
+                words = _words(str(message.content))
+                send({"role": "assistant", "content": ""})
+                for i, word in enumerate(words):
+                    if i and server.token_rate:
+                        time.sleep(1.0 / server.token_rate)
+                    send({"content": word})
+                tool_calls = _openai_tool_calls(message)
+                if tool_calls:
+                    send({"tool_calls": [{**call, "index": i} for i, call in enumerate(tool_calls)]})
+                include_usage = (body.get("stream_options") or {}).get("include_usage")
+                send({}, "tool_calls" if tool_calls else "stop", self._usage(body, message) if include_usage else None)
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.wfile.flush()
+
+        return Handler
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--latency", type=float, default=0.05, help="Simulated seconds before the first token.")
+    parser.add_argument("--token-rate", type=float, default=0.0, help="Simulated tokens per second (0 = instant).")
+    args = parser.parse_args(argv)
+
+    server = FakeOpenAIServer(args.host, args.port, args.latency, args.token_rate)
+    print(f"Fake OpenAI-compatible server listening on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
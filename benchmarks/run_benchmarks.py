@@ -0,0 +1,305 @@
+"""
+Benchmark harness for the multi-agent graph, runnable without Ollama or network access.
+
+Times full graph runs, 'supervisor_node' (fast path and LLM path), every agent node, and the
+supervisor's history formatting at several history sizes. LLM calls are answered by scripted
+fakes with configurable latency and token rate, either in-process ('--backend fake', a fake
+LangChain chat model) or over HTTP ('--backend server', the real ChatOpenAI clients talking to
+the local OpenAI-compatible stand-in), and yfinance is replaced by a stub fetcher.
+
+Results are saved as JSON (with the commit they were measured on) so regressions can be compared
+across commits:
+    python -m benchmarks.run_benchmarks --output before.json
+    git checkout <other commit>
+    python -m benchmarks.run_benchmarks --output after.json --compare before.json
+
+Usage (from the repository root):
+    python -m benchmarks.run_benchmarks [--backend fake|server] [--latency 0.02] [--token-rate 0]
+                                        [--iterations 20] [--sizes 10 100 1000] [--only graph]
+                                        [--output results.json] [--compare baseline.json]
+"""
+import argparse
+import contextlib
+import importlib
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+
+from benchmarks.fake_llm import REPO_ROOT, fake_agent, fake_news_fetcher, fake_supervisor, patch_llms
+from observability.exporters import percentile
+
+# A result is reported as a regression when its median grows by more than this factor.
+DEFAULT_REGRESSION_THRESHOLD = 1.2
+
+
+@dataclass
+class BenchmarkCase:
+    """A named, repeatable measurement."""
+    name: str
+    run: Callable[[], object]
+    """The timed call."""
+    setup: Optional[Callable[[], None]] = None
+    """Untimed preparation before every iteration (e.g., clearing a cache)."""
+    tags: Dict[str, object] = field(default_factory=dict)
+
+
+def measure(case: BenchmarkCase, iterations: int, warmup: int = 1) -> dict:
+    """
+    Runs a case 'warmup' times untimed and 'iterations' times timed.
+
+    Returns:
+        dict: Timing summary in milliseconds (mean, median, p95, min, max) plus the case's tags.
+    """
+    for _ in range(warmup):
+        if case.setup:
+            case.setup()
+        case.run()
+    timings = []
+    for _ in range(iterations):
+        if case.setup:
+            case.setup()
+        started = time.perf_counter()
+        case.run()
+        timings.append((time.perf_counter() - started) * 1e3)
+    timings.sort()
+    return {
+        "iterations": iterations,
+        "mean_ms": statistics.fmean(timings),
+        "median_ms": statistics.median(timings),
+        "p95_ms": percentile(timings, 95),
+        "min_ms": timings[0],
+        "max_ms": timings[-1],
+        **case.tags,
+    }
+
+
+# --- Fixtures ---
+
+def synthetic_history(size: int) -> List[BaseMessage]:
+    """
+    Builds a conversation of 'size' messages cycling through a user request, a tool-calling AI
+    message, a (large) tool result and an AI answer, with stable IDs like the graph assigns.
+    """
+    messages: List[BaseMessage] = []
+    for i in range(size):
+        kind = i % 4
+        if kind == 0:
+            messages.append(HumanMessage(content=f"Get the latest news for NVDA, request {i}", id=f"h{i}"))
+        elif kind == 1:
+            messages.append(AIMessage(content="", id=f"a{i}", tool_calls=[
+                {"name": "get_stock_news", "args": {"ticker": "NVDA"}, "id": f"call_{i}"}]))
+        elif kind == 2:
+            articles = [{"title": f"NVDA headline {j}", "summary": "NVDA reports record data center revenue. " * 4}
+                        for j in range(5)]
+            messages.append(ToolMessage(content=json.dumps(articles), tool_call_id=f"call_{i - 1}", id=f"t{i}"))
+        else:
+            messages.append(AIMessage(content=f"Here is the latest news for NVDA (answer {i}).", id=f"a{i}"))
+    return messages
+
+
+def _state(text: str) -> dict:
+    return {"messages": [HumanMessage(content=text, id="bench-request")], "steps": 0}
+
+
+GRAPH_REQUESTS = {
+    "calculator": "What is 15 plus 27?",
+    "stock_news": "Get the latest news for NVDA",
+    "stock_news_multi": "Compare the news for NVDA AMD INTC",
+    "text": "Tell me something interesting about the ocean",
+}
+
+
+def build_cases(sizes: List[int]) -> List[BenchmarkCase]:
+    """Builds all benchmark cases (the project modules must already be loaded, see 'main')."""
+    from main import get_final_answer
+    from supervisor.supervisor_node import supervisor_node
+    from supervisor.prompts import format_chat_history, IncrementalHistoryFormatter
+    from agents.calculator_agent import calculator_agent
+    from agents.stock_news_agent import stock_news_agent
+    from agents.text_processing_agent import text_processing_agent
+    from agents.data_analysis_agent import data_analysis_agent
+    from tools.tools import news_cache
+    from tools.sentiment import sentiment_scorer
+
+    cases: List[BenchmarkCase] = []
+
+    # Full graph runs. The news cache is cleared first so every run pays for the (stub) fetch.
+    for name, text in GRAPH_REQUESTS.items():
+        cases.append(BenchmarkCase(f"graph.{name}", lambda text=text: get_final_answer(text),
+                                   setup=news_cache.invalidate))
+
+    # Supervisor decisions, with and without the deterministic fast path.
+    calculation_state = _state(GRAPH_REQUESTS["calculator"])
+    text_state = _state(GRAPH_REQUESTS["text"])
+    cases.append(BenchmarkCase("supervisor_node.fast_path", lambda: supervisor_node(calculation_state)))
+    cases.append(BenchmarkCase("supervisor_node.llm", lambda: supervisor_node(
+        text_state, {"configurable": {"fast_path": False}})))
+
+    # Each agent node on its typical request.
+    cases.append(BenchmarkCase("agent.calculator_agent", lambda: calculator_agent(calculation_state)))
+    news_state = _state(GRAPH_REQUESTS["stock_news"])
+    cases.append(BenchmarkCase("agent.stock_news_agent", lambda: stock_news_agent(news_state), setup=news_cache.invalidate))
+    multi_news_state = _state(GRAPH_REQUESTS["stock_news_multi"])
+    cases.append(BenchmarkCase("agent.stock_news_agent.multi", lambda: stock_news_agent(multi_news_state),
+                               setup=news_cache.invalidate))
+    cases.append(BenchmarkCase("agent.text_processing_agent", lambda: text_processing_agent(text_state)))
+    cases.append(BenchmarkCase("agent.data_analysis_agent", lambda: data_analysis_agent(text_state)))
+
+    # Local news sentiment over 200 articles: a cold batch (every article scored) and a warm one
+    # (every score served from the fingerprint cache).
+    articles = [{"title": f"Company {i} shares rise after strong results", "summary": f"Revenue grew {i}% but risks remain."}
+                for i in range(200)]
+    cases.append(BenchmarkCase("sentiment.score_articles.cold", lambda: sentiment_scorer.score_articles(articles),
+                               setup=sentiment_scorer.clear))
+    cases.append(BenchmarkCase("sentiment.score_articles.cached", lambda: sentiment_scorer.score_articles(articles),
+                               setup=lambda: sentiment_scorer.score_articles(articles)))
+
+    # History formatting: a full render, and the incremental formatter's cost for one new message.
+    for size in sizes:
+        history = synthetic_history(size)
+        cases.append(BenchmarkCase(f"format_chat_history.{size}", lambda history=history: format_chat_history(history),
+                                   tags={"history_size": size}))
+        formatter = IncrementalHistoryFormatter()
+        formatter.format("bench", history, stop=size - 1) # Everything but the newest message is cached
+        cases.append(BenchmarkCase(f"history_formatter.incremental.{size}",
+                                   lambda formatter=formatter, history=history: formatter.format("bench", history),
+                                   setup=lambda formatter=formatter, history=history, size=size: formatter.format(
+                                       "bench", history, stop=size - 1),
+                                   tags={"history_size": size}))
+    return cases
+
+
+# --- Backends ---
+
+@contextlib.contextmanager
+def fake_backend(latency: float, token_rate: float):
+    """In-process fake chat models."""
+    token_latency = 1.0 / token_rate if token_rate else 0.0
+    with patch_llms(supervisor=fake_supervisor(latency, token_latency=token_latency),
+                    agent=fake_agent(latency, token_latency=token_latency)):
+        yield
+
+
+@contextlib.contextmanager
+def server_backend(latency: float, token_rate: float):
+    """The real ChatOpenAI clients talking to the local OpenAI-compatible stand-in over HTTP."""
+    from benchmarks.fake_openai_server import FakeOpenAIServer
+    from llms.backend import ChatBackend
+    from tools.tools import tools
+
+    with FakeOpenAIServer(latency=latency, token_rate=token_rate) as server:
+        # Both roles share one pooled client, as with the real Ollama backend.
+        backend = ChatBackend(base_url=server.base_url, model="fake", api_key="fake")
+        supervisor = backend.chat_model(temperature=0, cache=False)
+        agent = backend.chat_model(temperature=0, cache=False).bind_tools(tools)
+        try:
+            with patch_llms(supervisor=supervisor, agent=agent):
+                yield
+        finally:
+            backend.close()
+
+
+BACKENDS = {"fake": fake_backend, "server": server_backend}
+
+
+# --- Results ---
+
+def current_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], threshold: float) -> List[str]:
+    """
+    Prints the median change of every case present in both runs.
+
+    Returns:
+        List[str]: The names of the cases whose median grew by more than 'threshold'.
+    """
+    regressions = []
+    print(f"\n{'case':<42} {'baseline':>11} {'current':>11} {'change':>8}")
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        before, after = baseline[name]["median_ms"], result["median_ms"]
+        ratio = after / before if before else float("inf")
+        flag = "  REGRESSION" if ratio > threshold else ""
+        if flag:
+            regressions.append(name)
+        print(f"{name:<42} {before:>8.3f} ms {after:>8.3f} ms {ratio:>7.2f}x{flag}")
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default="fake")
+    parser.add_argument("--latency", type=float, default=0.02, help="Simulated seconds per LLM call.")
+    parser.add_argument("--token-rate", type=float, default=0.0, help="Simulated tokens per second (0 = instant).")
+    parser.add_argument("--fetch-latency", type=float, default=0.01, help="Simulated seconds per news fetch.")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000], help="History sizes for formatting.")
+    parser.add_argument("--only", help="Run only cases whose name contains this string.")
+    parser.add_argument("--output", help="Path for machine-readable results (JSON).")
+    parser.add_argument("--compare", help="Results file of a previous run to compare against.")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_REGRESSION_THRESHOLD,
+                        help="Median growth factor reported as a regression.")
+    args = parser.parse_args(argv)
+
+    # Compile the graph up front, so the first timed case does not pay for it.
+    importlib.import_module("main").get_app()
+    from tools.tools import news_cache
+    news_cache.fetcher = fake_news_fetcher(args.fetch_latency)
+
+    results: Dict[str, dict] = {}
+    with BACKENDS[args.backend](args.latency, args.token_rate):
+        cases = [case for case in build_cases(args.sizes) if not args.only or args.only in case.name]
+        for case in cases:
+            # The per-node progress output is not what is being measured.
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                results[case.name] = measure(case, args.iterations)
+            r = results[case.name]
+            print(f"{case.name:<42} median {r['median_ms']:>9.3f} ms   p95 {r['p95_ms']:>9.3f} ms")
+
+    report = {
+        "meta": {
+            "commit": current_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "backend": args.backend,
+            "latency_s": args.latency,
+            "token_rate": args.token_rate,
+            "fetch_latency_s": args.fetch_latency,
+            "iterations": args.iterations,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline.get("meta", {}).get("backend") != args.backend:
+            print(f"Note: baseline was measured with the '{baseline.get('meta', {}).get('backend')}' backend.")
+        regressions = compare(results, baseline.get("results", {}), args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) above {args.threshold:g}x")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+from dataclasses import dataclass
+from typing import Any, Optional
+import logging
+import time
+
+import httpx
+from langchain_core.messages import HumanMessage
+from langchain_openai import ChatOpenAI
+
+logger = logging.getLogger(__name__)
+
+# --- Shared Model Backend ---
+# Every role (supervisor, agents) talks to the same OpenAI-compatible endpoint and model, so they
+# share one pooled keep-alive HTTP client (and one async client for 'ainvoke'/'astream') instead of
+# each ChatOpenAI instance opening its own connections. Connections stay open between requests, so
+# only the very first request of a process pays for connection setup.
+
+
+@dataclass
+class WarmupReport:
+    """Latencies of the warm-up requests sent at startup."""
+    cold_ms: float
+    """The first request: connection setup, model load and the prompt prefix prefill."""
+    warm_ms: float
+    """The same request repeated: a reused connection, a loaded model and a cached prefix."""
+
+    @property
+    def speedup(self) -> float:
+        return self.cold_ms / self.warm_ms if self.warm_ms else 0.0
+
+    def as_dict(self) -> dict:
+        return {"cold_ms": self.cold_ms, "warm_ms": self.warm_ms, "speedup": self.speedup}
+
+
+class ChatBackend:
+    """
+    Creates the chat models of all roles for one OpenAI-compatible endpoint (Ollama by default),
+    all sharing a single pooled HTTP client with configurable connection limits.
+    """
+
+    def __init__(self, base_url: str, model: str, api_key: str = "ollama", max_connections: int = 32,
+                 max_keepalive_connections: int = 16, keepalive_expiry: float = 300.0,
+                 connect_timeout: float = 5.0):
+        """
+        Args:
+            base_url (str): Base URL of the OpenAI-compatible API (e.g., 'http://localhost:11434/v1').
+            model (str): Name of the model served by the endpoint.
+            api_key (str): API key sent with every request (a placeholder for local Ollama instances).
+            max_connections (int): Upper bound on concurrently open connections per client.
+            max_keepalive_connections (int): Number of idle connections kept open for reuse.
+            keepalive_expiry (float): Seconds an idle connection is kept open.
+            connect_timeout (float): Seconds allowed to establish a connection.
+        """
+        self.base_url = base_url
+        self.model = model
+        self.api_key = api_key
+        limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive_connections,
+                              keepalive_expiry=keepalive_expiry)
+        # The read timeout is left open: a model load or a long generation can take minutes, and
+        # the OpenAI client applies its own per-request timeout on top.
+        timeout = httpx.Timeout(None, connect=connect_timeout)
+        self.http_client = httpx.Client(limits=limits, timeout=timeout)
+        self.http_async_client = httpx.AsyncClient(limits=limits, timeout=timeout)
+
+    def chat_model(self, **kwargs: Any) -> ChatOpenAI:
+        """
+        Creates a chat model for this endpoint that uses the shared HTTP clients.
+
+        Args:
+            **kwargs: Extra ChatOpenAI parameters (e.g., 'temperature', 'cache', 'max_tokens').
+
+        Returns:
+            ChatOpenAI: The chat model.
+        """
+        return ChatOpenAI(
+            openai_api_base=self.base_url,
+            openai_api_key=self.api_key,
+            model_name=self.model,
+            http_client=self.http_client,
+            http_async_client=self.http_async_client,
+            **kwargs,
+        )
+
+    def warm_up(self, prompt_prefix: str) -> Optional[WarmupReport]:
+        """
+        Preloads the model and primes the server's prompt cache with a static prompt prefix.
+
+        The prefix is sent twice as a single-token request with the response cache bypassed:
+        the first request opens the pooled connection, loads the model and prefills the prefix,
+        and the second shows the latency once all of that is warm.
+
+        Args:
+            prompt_prefix (str): The static start of a prompt that is sent on every request
+                                 (e.g., the supervisor instructions before the conversation history).
+
+        Returns:
+            Optional[WarmupReport]: The cold and warm latencies, or None if the endpoint could not be reached.
+        """
+        llm = self.chat_model(temperature=0, max_tokens=1, cache=False)
+        messages = [HumanMessage(content=prompt_prefix)]
+        timings = []
+        try:
+            for _ in range(2):
+                started = time.perf_counter()
+                llm.invoke(messages)
+                timings.append((time.perf_counter() - started) * 1e3)
+        except Exception as e:
+            logger.warning("---Model warm-up failed: %s---", e)
+            return None
+        report = WarmupReport(cold_ms=timings[0], warm_ms=timings[1])
+        logger.info("---Model warm-up: cold request %.0f ms, warm request %.0f ms (%.1fx)---",
+                    report.cold_ms, report.warm_ms, report.speedup)
+        return report
+
+    def close(self) -> None:
+        """Closes the pooled synchronous connections (the async client is closed with 'aclose')."""
+        self.http_client.close()
+
+    async def aclose(self) -> None:
+        """Closes all pooled connections."""
+        self.http_client.close()
+        await self.http_async_client.aclose()
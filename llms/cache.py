@@ -0,0 +1,285 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Sequence
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import uuid
+
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.messages import AIMessage, message_to_dict, messages_from_dict
+from langchain_core.outputs import ChatGeneration, Generation
+
+# --- Exact-Match LLM Response Cache ---
+# The supervisor and agent LLMs run at temperature 0, so an identical prompt sent to the same
+# model with the same parameters yields the same response. This cache is plugged into the chat
+# models through LangChain's 'cache=' hook and answers such repeats without a model call:
+#   - memory: an LRU of the most recently used responses
+#   - disk:   an optional sqlite file behind the LRU, bounded by total payload size
+# Keys combine the model/parameter string LangChain passes in (model name, temperature, bound
+# tools, stop words, ...) with a hash of the normalized prompt messages.
+
+# Message fields that differ between otherwise identical conversations, or that are never sent to
+# the model (tool artifacts), and must not affect the key.
+_VOLATILE_MESSAGE_FIELDS = ("id", "response_metadata", "usage_metadata", "artifact")
+
+
+def _normalize_prompt(prompt: str) -> str:
+    """
+    Normalizes the serialized prompt messages LangChain passes to the cache.
+
+    Message ids, provider metadata and tool artifacts are dropped, and tool-call ids (random per
+    run) are replaced by their order of appearance, so replaying a conversation maps onto the same
+    keys while calls and their ToolMessages stay linked.
+    """
+    try:
+        messages = json.loads(prompt)
+    except ValueError:
+        return prompt
+    if not isinstance(messages, list):
+        return prompt
+
+    tool_call_ids: Dict[str, str] = {}
+
+    def placeholder(tool_call_id: Any) -> Any:
+        if not isinstance(tool_call_id, str):
+            return tool_call_id
+        return tool_call_ids.setdefault(tool_call_id, f"tool_call_{len(tool_call_ids)}")
+
+    for message in messages:
+        fields = message.get("kwargs") if isinstance(message, dict) else None
+        if not isinstance(fields, dict):
+            continue
+        for field in _VOLATILE_MESSAGE_FIELDS:
+            fields.pop(field, None)
+        for tool_call in fields.get("tool_calls") or []:
+            tool_call["id"] = placeholder(tool_call.get("id"))
+        for tool_call in (fields.get("additional_kwargs") or {}).get("tool_calls") or []:
+            tool_call["id"] = placeholder(tool_call.get("id"))
+        if "tool_call_id" in fields:
+            fields["tool_call_id"] = placeholder(fields["tool_call_id"])
+
+    return json.dumps(messages, sort_keys=True, ensure_ascii=False)
+
+
+def cache_key(prompt: str, llm_string: str) -> str:
+    """
+    Computes the cache key for a prompt sent to a model.
+
+    Args:
+        prompt (str): The serialized prompt messages.
+        llm_string (str): LangChain's string representation of the model and its call parameters.
+
+    Returns:
+        str: A hex digest identifying the request.
+    """
+    digest = hashlib.sha256()
+    digest.update(llm_string.encode("utf-8"))
+    digest.update(b"\x00")
+    digest.update(_normalize_prompt(prompt).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _serialize(generations: Sequence[Generation]) -> str:
+    payload = []
+    for generation in generations:
+        if isinstance(generation, ChatGeneration):
+            payload.append({"message": message_to_dict(generation.message),
+                            "generation_info": generation.generation_info})
+        else:
+            payload.append({"text": generation.text, "generation_info": generation.generation_info})
+    return json.dumps(payload)
+
+
+def _deserialize(data: str) -> RETURN_VAL_TYPE:
+    generations = []
+    for item in json.loads(data):
+        if "message" in item:
+            message = messages_from_dict([item["message"]])[0]
+            generations.append(ChatGeneration(message=message, generation_info=item.get("generation_info")))
+        else:
+            generations.append(Generation(text=item["text"], generation_info=item.get("generation_info")))
+    return generations
+
+
+def _replayed(generations: RETURN_VAL_TYPE) -> RETURN_VAL_TYPE:
+    """
+    Copies cached generations for replay: messages are marked with response_metadata['cache_hit']
+    (used by tracing), their message id is cleared and every tool call gets a new id.
+
+    A replayed response would otherwise reuse the ids of the original run, and the same id could
+    then appear twice in one conversation (e.g., when a request is repeated in a thread). The
+    message reducer merges messages by id, so the replay would overwrite the earlier response
+    instead of being appended; without an id, the reducer assigns the replay a fresh one.
+    """
+    replayed = []
+    for generation in generations:
+        message = getattr(generation, "message", None)
+        if not isinstance(message, AIMessage):
+            replayed.append(generation)
+            continue
+        update = {"id": None, "response_metadata": {**message.response_metadata, "cache_hit": True}}
+        if message.tool_calls:
+            new_ids = {tool_call["id"]: f"call_{uuid.uuid4().hex[:24]}" for tool_call in message.tool_calls}
+            update["tool_calls"] = [{**tool_call, "id": new_ids[tool_call["id"]]} for tool_call in message.tool_calls]
+            additional_kwargs = dict(message.additional_kwargs)
+            if additional_kwargs.get("tool_calls"):
+                additional_kwargs["tool_calls"] = [{**tool_call, "id": new_ids.get(tool_call.get("id"), tool_call.get("id"))}
+                                                   for tool_call in additional_kwargs["tool_calls"]]
+            update["additional_kwargs"] = additional_kwargs
+        replayed.append(generation.model_copy(update={"message": message.model_copy(update=update)}))
+    return replayed
+
+
+@dataclass
+class LLMCacheStats:
+    """Counters describing how lookups were served."""
+    hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    writes: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.disk_hits + self.misses
+        return (self.hits + self.disk_hits) / lookups if lookups else 0.0
+
+    def as_dict(self) -> dict:
+        return {**self.__dict__, "hit_rate": self.hit_rate}
+
+
+class TieredLLMCache(BaseCache):
+    """
+    Exact-match response cache: an in-memory LRU in front of an optional, size-bounded sqlite store.
+
+    Only attach it to deterministic (temperature 0) models; sampled responses would be frozen at
+    their first value.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, max_memory_entries: int = 1024,
+                 max_disk_bytes: int = 64 * 1024 * 1024):
+        """
+        Args:
+            db_path (Optional[str]): Path of an optional sqlite file that persists responses across restarts.
+            max_memory_entries (int): Maximum number of responses kept in memory.
+            max_disk_bytes (int): Maximum total size of the stored responses on disk; the least
+                                  recently used responses are evicted beyond it.
+        """
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_bytes = max_disk_bytes
+        self.stats = LLMCacheStats()
+        self._memory: "OrderedDict[str, RETURN_VAL_TYPE]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        self._disk_bytes = 0
+        if db_path:
+            self.enable_persistence(db_path)
+
+    # --- Persistence ---
+
+    def enable_persistence(self, db_path: str) -> None:
+        """
+        Writes responses through to a sqlite file and reads them back on a memory miss.
+
+        Args:
+            db_path (str): Path of the sqlite file (created if missing).
+        """
+        connection = sqlite3.connect(db_path, check_same_thread=False)
+        connection.execute("CREATE TABLE IF NOT EXISTS llm_cache "
+                           "(key TEXT PRIMARY KEY, generations TEXT, size INTEGER, last_access REAL)")
+        connection.execute("CREATE INDEX IF NOT EXISTS llm_cache_last_access ON llm_cache (last_access)")
+        connection.commit()
+        total = connection.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+        with self._db_lock:
+            self._db = connection
+            self._disk_bytes = total
+
+    def _load(self, key: str) -> Optional[RETURN_VAL_TYPE]:
+        if self._db is None:
+            return None
+        with self._db_lock:
+            row = self._db.execute("SELECT generations FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._db.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (time.time(), key))
+            self._db.commit()
+        return _deserialize(row[0])
+
+    def _store(self, key: str, generations: RETURN_VAL_TYPE) -> None:
+        if self._db is None:
+            return
+        data = _serialize(generations)
+        size = len(data.encode("utf-8"))
+        if size > self.max_disk_bytes:
+            return # Would evict everything else and still not fit
+        with self._db_lock:
+            previous = self._db.execute("SELECT size FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            self._db.execute("INSERT OR REPLACE INTO llm_cache (key, generations, size, last_access) VALUES (?, ?, ?, ?)",
+                             (key, data, size, time.time()))
+            self._disk_bytes += size - (previous[0] if previous else 0)
+            self._evict_disk()
+            self._db.commit()
+
+    def _evict_disk(self) -> None:
+        # Called with '_db_lock' held: drop the least recently used responses until the store fits.
+        while self._disk_bytes > self.max_disk_bytes:
+            rows = self._db.execute("SELECT key, size FROM llm_cache ORDER BY last_access LIMIT 64").fetchall()
+            if not rows:
+                self._disk_bytes = 0
+                return
+            for key, size in rows:
+                self._db.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._disk_bytes -= size
+                self.stats.evictions += 1
+                if self._disk_bytes <= self.max_disk_bytes:
+                    return
+
+    # --- BaseCache interface ---
+
+    def _remember(self, key: str, generations: RETURN_VAL_TYPE) -> None:
+        # Called with '_lock' held.
+        self._memory[key] = generations
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        """Returns the cached generations for a prompt and model, or None on a miss."""
+        key = cache_key(prompt, llm_string)
+        with self._lock:
+            generations = self._memory.get(key)
+            if generations is not None:
+                self._memory.move_to_end(key)
+                self.stats.hits += 1
+                return _replayed(generations)
+
+        generations = self._load(key)
+        with self._lock:
+            if generations is None:
+                self.stats.misses += 1
+                return None
+            self.stats.disk_hits += 1
+            self._remember(key, generations)
+        return _replayed(generations)
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        """Stores the generations produced for a prompt and model."""
+        key = cache_key(prompt, llm_string)
+        with self._lock:
+            self._remember(key, list(return_val))
+            self.stats.writes += 1
+        self._store(key, return_val)
+
+    def clear(self, **kwargs: Any) -> None:
+        """Drops all cached responses (memory and disk)."""
+        with self._lock:
+            self._memory.clear()
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute("DELETE FROM llm_cache")
+                self._db.commit()
+                self._disk_bytes = 0
@@ -1,22 +1,114 @@
-from langchain_openai import ChatOpenAI
-from tools.tools import tools # Import the tools to bind to agents
-
-# Configuration for the Supervisor LLM
-# This LLM is used by the supervisor agent for routing decisions.
-# It does not need tool binding as its primary role is to select the next agent.
-llm_supervisor = ChatOpenAI(
-    openai_api_base="http://localhost:11434/v1",  # Base URL for the Ollama API
-    openai_api_key="ollama",  # Placeholder key for local Ollama instances
-    model_name="qwen2.5-coder:14b",  # Specify the Ollama model for supervisor tasks
-    temperature=0  # Lower temperature for more deterministic routing decisions
-)
-
-# Configuration for a generic Agent LLM
-# This LLM is used by various worker agents (e.g., Calculator, Stock News)
-# and is bound to the defined tools, allowing it to perform tool calls.
-llm_agent = ChatOpenAI(
-    openai_api_base="http://localhost:11434/v1",  # Base URL for the Ollama API
-    openai_api_key="ollama",  # Placeholder key for local Ollama instances
-    model_name="qwen2.5-coder:14b",  # Specify the Ollama model for agent tasks (tool-calling capable)
-    temperature=0  # Lower temperature for reliable tool calling and responses
-).bind_tools(tools) # Bind the imported tools to this LLM instance
\ No newline at end of file
+from llms.cache import TieredLLMCache
+import os
+import threading
+
+# Endpoint and model of the OpenAI-compatible server (Ollama by default). Point OLLAMA_BASE_URL at
+# another server (e.g., the local stand-in in 'benchmarks/fake_openai_server.py') to run without Ollama.
+OLLAMA_BASE_URL = os.environ.get("OLLAMA_BASE_URL", "http://localhost:11434/v1")
+OLLAMA_MODEL = os.environ.get("OLLAMA_MODEL", "qwen2.5-coder:14b")
+
+# --- Response Cache ---
+# Both LLMs run at temperature 0, so repeated prompts (routing decisions, sentiment prompts for
+# the same news, replayed regression requests) are answered from an exact-match cache instead of
+# the model. Caching can be switched off per role, and responses are persisted across restarts
+# when LLM_CACHE_DB_PATH points to a sqlite file.
+LLM_CACHE_ROLES = {
+    "supervisor": os.environ.get("LLM_CACHE_SUPERVISOR", "1") != "0",
+    "agent": os.environ.get("LLM_CACHE_AGENT", "1") != "0",
+}
+llm_cache = TieredLLMCache(db_path=os.environ.get("LLM_CACHE_DB_PATH"))
+
+def _cache_for(role: str):
+    # 'False' explicitly disables caching for a model (None would fall back to a global cache).
+    return llm_cache if LLM_CACHE_ROLES.get(role) else False
+
+# --- Lazily Built Clients ---
+# 'llm_backend', 'llm_supervisor', 'llm_agent' and the per-agent LLMs below are created on first
+# access (e.g., 'ollama_llms.llm_agent.invoke(...)'), not when this module is imported, so processes
+# that never call a model do not pay for importing langchain_openai/httpx or for building the clients.
+# Callers must access them as attributes of this module at call time instead of binding them with
+# 'from llms.ollama_llms import llm_agent', which would build them during the caller's import.
+
+def _build_backend():
+    # Shared Backend: both LLMs below are created by one backend and share its pooled keep-alive
+    # HTTP clients, so the supervisor and the agents reuse the same open connections. The pool size
+    # can be tuned for concurrent sessions (e.g., the async batch runner) through the environment.
+    from llms.backend import ChatBackend
+    return ChatBackend(
+        base_url=OLLAMA_BASE_URL,
+        model=OLLAMA_MODEL,
+        max_connections=int(os.environ.get("OLLAMA_MAX_CONNECTIONS", "32")),
+        max_keepalive_connections=int(os.environ.get("OLLAMA_MAX_KEEPALIVE_CONNECTIONS", "16")),
+        keepalive_expiry=float(os.environ.get("OLLAMA_KEEPALIVE_EXPIRY", "300")),
+    )
+
+def _build_supervisor():
+    # Configuration for the Supervisor LLM
+    # This LLM is used by the supervisor agent for routing decisions.
+    # It does not need tool binding as its primary role is to select the next agent.
+    from supervisor.prompts import SUPERVISOR_MAX_TOKENS
+    return _get_or_build("llm_backend").chat_model(
+        temperature=0,  # Lower temperature for more deterministic routing decisions
+        max_tokens=SUPERVISOR_MAX_TOKENS,  # The answer is a single-digit label, so generation stops right after it
+        cache=_cache_for("supervisor")  # Identical routing prompts are answered from the cache
+    )
+
+def _build_agent():
+    # Configuration for a generic Agent LLM
+    # This LLM is used by various worker agents (e.g., Calculator, Stock News)
+    # and is bound to the defined tools, allowing it to perform tool calls.
+    # Binding only wraps the model with the tool schemas; requests still go through the shared client.
+    from tools.tools import tools # Import the tools to bind to agents
+    return _get_or_build("llm_backend").chat_model(
+        temperature=0,  # Lower temperature for reliable tool calling and responses
+        cache=_cache_for("agent")  # Bound tools are part of the cache key, so tool calls are cached per tool set
+    ).bind_tools(tools) # Bind the imported tools to this LLM instance
+
+# --- Per-Agent LLMs ---
+# Every tool schema bound to a model is sent with each request, so a worker agent bound to all tools
+# pays for the others' schemas on every call. Each worker therefore gets its own LLM, bound only to
+# the tools it executes (an empty set leaves the model unbound). All of them share one chat model,
+# and thus the backend's connections and the response cache. 'llm_agent' stays bound to every tool.
+AGENT_TOOLSETS = {
+    "llm_calculator": ("perform_calculation", "evaluate_expression"),
+    "llm_stock_news": ("get_stock_news", "get_stock_news_batch"),
+    "llm_data_analysis": ("describe_dataset", "aggregate_dataset"),
+    "llm_text_processing": (),
+}
+
+def _build_agent_model():
+    # The unbound chat model behind the per-agent LLMs.
+    return _get_or_build("llm_backend").chat_model(temperature=0, cache=_cache_for("agent"))
+
+def _agent_builder(name: str):
+    def build():
+        from tools.tools import tools
+        model = _get_or_build("llm_agent_model")
+        tool_names = AGENT_TOOLSETS[name]
+        return model.bind_tools([t for t in tools if t.name in tool_names]) if tool_names else model
+    return build
+
+_LAZY_ATTRIBUTES = {
+    "llm_backend": _build_backend,
+    "llm_supervisor": _build_supervisor,
+    "llm_agent": _build_agent,
+    "llm_agent_model": _build_agent_model,
+    **{name: _agent_builder(name) for name in AGENT_TOOLSETS},
+}
+# Reentrant, since building an LLM first builds the backend through the same hook.
+_build_lock = threading.RLock()
+
+def _get_or_build(name: str):
+    # Builds the client once and stores it as a global, so later accesses are plain attribute
+    # lookups. Code in this module must call this instead of using the bare global name.
+    builder = _LAZY_ATTRIBUTES.get(name)
+    if builder is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    with _build_lock:
+        if name not in globals():
+            globals()[name] = builder()
+    return globals()[name]
+
+def __getattr__(name: str):
+    # Called only for attributes that are not yet module globals.
+    return _get_or_build(name)
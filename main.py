@@ -1,144 +1,563 @@
-from langgraph.graph import StateGraph, END
-from langchain_core.messages import HumanMessage, AIMessage, ToolMessage
-import ast # Used for safely evaluating string representations of lists (e.g., tool outputs)
+from langchain_core.messages import BaseMessage, HumanMessage, AIMessage, AIMessageChunk, ToolMessage
+from langchain_core.runnables import RunnableConfig, RunnableLambda
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, Optional, Tuple
+import importlib
+import logging
+import os
+import threading
+import time
+import uuid
 
-# Import components from their respective modules
+# Import components from their respective modules. Only lightweight modules are imported here:
+# langgraph, the agents, their tools and the LLM clients are loaded when the graph is first
+# compiled or a node first runs, so importing this module (e.g., in a batch worker) stays fast.
 from state import AgentState
-from supervisor.supervisor_node import supervisor_node
-from agents.text_processing_agent import text_processing_agent
-from agents.data_analysis_agent import data_analysis_agent
-from agents.calculator_agent import calculator_agent
-from agents.stock_news_agent import stock_news_agent # New agent for stock news
+from supervisor.router import fast_path_router
+from llms.ollama_llms import llm_cache
+from observability.tracing import tracer, traced_node, atraced_node, configure_tracing
+from observability.logs import configure_logging
+
+# Named explicitly so the logger is the same whether this file is imported or run as a script.
+logger = logging.getLogger("main")
+
+# --- Routing Functions ---
+
+# Per-request step budget: the maximum number of node executions (supervisor and agents combined)
+# before the run is ended. This stops supervisor <-> agent ping-pong loops long before the
+# recursion_limit is reached. Can be overridden per run via config={"configurable": {"max_steps": ...}}.
+MAX_STEPS = 10
+
+# Every graph node: name -> (module, synchronous function, async function). A node's module is
+# imported the first time the node runs, so a request that never reaches the stock news agent
+# never loads it (or the yfinance-backed tools behind it).
+NODES: Dict[str, Tuple[str, str, str]] = {
+    "supervisor": ("supervisor.supervisor_node", "supervisor_node", "asupervisor_node"),
+    "text_processing_agent": ("agents.text_processing_agent", "text_processing_agent", "atext_processing_agent"),
+    "data_analysis_agent": ("agents.data_analysis_agent", "data_analysis_agent", "adata_analysis_agent"),
+    "calculator_agent": ("agents.calculator_agent", "calculator_agent", "acalculator_agent"),
+    "stock_news_agent": ("agents.stock_news_agent", "stock_news_agent", "astock_news_agent"), # New agent for stock news
+}
+
+# All worker agent nodes; used to validate direct handoffs between agents.
+AGENT_NODES = [name for name in NODES if name != "supervisor"]
+
+def step_budget_exhausted(state: AgentState, config: RunnableConfig = None) -> bool:
+    """
+    Checks whether the current request has used up its step budget.
+
+    Args:
+        state (AgentState): The current state of the multi-agent system.
+        config (RunnableConfig): The run configuration; 'configurable.max_steps' overrides MAX_STEPS.
+
+    Returns:
+        bool: True if no further steps should be taken.
+    """
+    max_steps = (config or {}).get("configurable", {}).get("max_steps", MAX_STEPS)
+    if state.get('steps', 0) >= max_steps:
+        logger.info("---Step budget of %s exhausted, ending the run---", max_steps)
+        return True
+    return False
+
+def route_from_supervisor(state: AgentState, config: RunnableConfig = None) -> str:
+    """
+    Maps the supervisor's decision (the 'next' field) to the next node, unless the step budget is spent.
+    """
+    if step_budget_exhausted(state, config):
+        return "END"
+    return state['next']
+
+def route_from_agent(state: AgentState, config: RunnableConfig = None) -> str:
+    """
+    Decides where control goes after a worker agent: the agent's own handoff ('END' for a final
+    answer, or another agent's name), otherwise back to the supervisor.
+    """
+    if step_budget_exhausted(state, config):
+        return "END"
+    handoff = state.get('handoff')
+    if handoff == "END" or handoff in AGENT_NODES:
+        return handoff
+    return "supervisor"
 
 # --- Build the LangGraph Application ---
 
-# 1. Initialize the StateGraph with the defined AgentState.
-# The StateGraph manages how the AgentState is passed and modified between nodes.
-workflow = StateGraph(AgentState)
-
-# 2. Add all worker agent nodes and the supervisor node to the workflow.
-# Each node corresponds to a Python function that takes and returns the AgentState.
-workflow.add_node("supervisor", supervisor_node)
-workflow.add_node("text_processing_agent", text_processing_agent)
-workflow.add_node("data_analysis_agent", data_analysis_agent)
-workflow.add_node("calculator_agent", calculator_agent)
-workflow.add_node("stock_news_agent", stock_news_agent) # Add the new stock news agent
-
-# 3. Set the entry point of the graph.
-# The execution of the graph always begins at the supervisor node.
-workflow.set_entry_point("supervisor")
-
-# 4. Define the conditional edges for routing from the supervisor.
-# The supervisor's output (stored in the 'next' field of the state) determines the next node.
-workflow.add_conditional_edges(
-    "supervisor",
-    # The condition function reads the 'next' field from the state and maps it to a node name.
-    lambda state: state['next'],
-    {
-        "text_processing_agent": "text_processing_agent",
-        "data_analysis_agent": "data_analysis_agent",
-        "calculator_agent": "calculator_agent",
-        "stock_news_agent": "stock_news_agent",
-        "END": END, # If the supervisor returns 'END', the graph terminates.
-    }
-)
-
-# 5. Add edges from worker nodes back to the supervisor.
-# After a worker agent completes its task (or a step within its task), it typically
-# returns control to the supervisor to decide the next overall step in the workflow,
-# based on the updated conversation history.
-workflow.add_edge("text_processing_agent", "supervisor")
-workflow.add_edge("data_analysis_agent", "supervisor")
-workflow.add_edge("calculator_agent", "supervisor")
-workflow.add_edge("stock_news_agent", "supervisor")
-
-# 6. Compile the graph.
-# Compiling finalizes the graph structure and prepares it for execution.
-app = workflow.compile()
+@lru_cache(maxsize=None)
+def _resolve(module_name: str, func_name: str) -> Tuple[Callable, bool]:
+    # Imports a node's module on first use; returns the node function and whether it takes 'config'.
+    import inspect
+    func = getattr(importlib.import_module(module_name), func_name)
+    return func, "config" in inspect.signature(func).parameters
+
+def _lazy_node(module_name: str, func_name: str) -> Callable:
+    def node(state, config: RunnableConfig = None):
+        func, passes_config = _resolve(module_name, func_name)
+        return func(state, config) if passes_config else func(state)
+    node.__name__ = func_name
+    return node
+
+def _alazy_node(module_name: str, func_name: str) -> Callable:
+    async def node(state, config: RunnableConfig = None):
+        func, passes_config = _resolve(module_name, func_name)
+        return await (func(state, config) if passes_config else func(state))
+    node.__name__ = func_name
+    return node
+
+def _node(name: str) -> RunnableLambda:
+    # Each node pairs a synchronous function with its async variant: 'invoke'/'stream' run the
+    # synchronous one, while 'ainvoke'/'astream' await the async one, so many concurrent sessions
+    # can share a single event loop. Both are wrapped so every execution is recorded as a span
+    # while tracing is enabled.
+    module_name, func_name, afunc_name = NODES[name]
+    return RunnableLambda(traced_node(name, _lazy_node(module_name, func_name)),
+                          afunc=atraced_node(name, _alazy_node(module_name, afunc_name)), name=func_name)
+
+def build_workflow():
+    """
+    Defines the multi-agent graph (not yet compiled).
+
+    Returns:
+        StateGraph: The graph of the supervisor and all worker agents.
+    """
+    from langgraph.graph import StateGraph, END
+
+    # 1. Initialize the StateGraph with the defined AgentState.
+    # The StateGraph manages how the AgentState is passed and modified between nodes.
+    workflow = StateGraph(AgentState)
+
+    # 2. Add all worker agent nodes and the supervisor node to the workflow.
+    for name in NODES:
+        workflow.add_node(name, _node(name))
+
+    # 3. Set the entry point of the graph.
+    # The execution of the graph always begins at the supervisor node.
+    workflow.set_entry_point("supervisor")
+
+    # 4. Define the conditional edges for routing from the supervisor.
+    # The supervisor's output (stored in the 'next' field of the state) determines the next node.
+    workflow.add_conditional_edges(
+        "supervisor",
+        # The condition function reads the 'next' field from the state and maps it to a node name.
+        route_from_supervisor,
+        {
+            **{name: name for name in AGENT_NODES},
+            "END": END, # If the supervisor returns 'END', the graph terminates.
+        }
+    )
+
+    # 5. Add conditional edges from worker nodes.
+    # An agent that produced a final answer marks it terminal ('handoff' = 'END') and the graph
+    # finishes without another supervisor round trip; an agent can also hand off directly to another
+    # agent. Otherwise control returns to the supervisor to decide the next overall step in the
+    # workflow, based on the updated conversation history.
+    for agent_node in AGENT_NODES:
+        workflow.add_conditional_edges(
+            agent_node,
+            route_from_agent,
+            {"supervisor": "supervisor", "END": END, **{name: name for name in AGENT_NODES}},
+        )
+    return workflow
+
+# Compiled graphs by kind ('stateless', 'session'), plus the sessions' checkpointer.
+_compiled: Dict[str, Any] = {}
+_compile_lock = threading.Lock()
+
+def _get_or_create(key: str, factory: Callable[[], Any]) -> Any:
+    value = _compiled.get(key)
+    if value is None:
+        with _compile_lock:
+            value = _compiled.get(key)
+            if value is None:
+                value = _compiled[key] = factory()
+    return value
+
+def get_session_checkpointer():
+    """
+    Returns the sqlite checkpointer that stores the multi-turn sessions, creating it on first use.
+    """
+    def create():
+        from sessions.checkpointer import SessionCheckpointer, SESSION_DB_PATH
+        return SessionCheckpointer(SESSION_DB_PATH)
+    return _get_or_create("checkpointer", create)
+
+def get_app(sessions: bool = False):
+    """
+    Returns the compiled graph, compiling it on first use (later calls return the same instance).
+
+    Args:
+        sessions (bool): Whether to return the graph compiled with the sqlite checkpointer, for
+                         multi-turn sessions: runs with a 'configurable.thread_id' resume that
+                         thread's stored state, so each turn only sends the new user message.
+                         Runs without a thread ID use the stateless graph.
+
+    Returns:
+        CompiledStateGraph: The compiled graph.
+    """
+    if sessions:
+        return _get_or_create("session", lambda: build_workflow().compile(checkpointer=get_session_checkpointer()))
+    return _get_or_create("stateless", lambda: build_workflow().compile())
+
+# The former module-level objects, kept available as 'main.app', 'main.session_app' and
+# 'main.session_checkpointer' (built on first access).
+_LAZY_ATTRIBUTES = {
+    "app": get_app,
+    "session_app": lambda: get_app(sessions=True),
+    "session_checkpointer": get_session_checkpointer,
+}
+
+def __getattr__(name: str):
+    factory = _LAZY_ATTRIBUTES.get(name)
+    if factory is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return factory()
 
 # --- Helper Function to Run the Agent System ---
 
-def run_agent(input_message: str):
+def final_message_in(update: Any) -> Optional[BaseMessage]:
+    """
+    Finds the last AI or Tool message with content in a single streamed state update.
+
+    Args:
+        update (Any): A node's state update (e.g., {'messages': [...], ...}).
+
+    Returns:
+        Optional[BaseMessage]: The message, or None if the update contains no such message.
+    """
+    if not isinstance(update, dict):
+        return None
+    # Iterate through messages in reverse to find the last AI or Tool message with content.
+    for msg in reversed(update.get('messages') or []):
+        if isinstance(msg, (AIMessage, ToolMessage)) and msg.content and str(msg.content).strip():
+            return msg
+    return None
+
+def print_final_output(final_message: Optional[BaseMessage]):
+    """
+    Prints the final answer of a run.
+
+    Args:
+        final_message (Optional[BaseMessage]): The last AI or Tool message with content, as tracked
+                                               with 'final_message_in' while streaming.
+    """
+    # --- Print Final Output ---
+    print("\n--- Agent's Final Output ---")
+
+    if final_message is None:
+        print("No final AI or Tool message with content found during execution.")
+    elif isinstance(final_message, AIMessage):
+        print(f"AI Response: {final_message.content}")
+    else:
+        print(f"Tool Result: {final_message.content}")
+        # Tools attach their structured result as the message's artifact (e.g., a list of news
+        # articles), so it can be formatted without parsing the text content back.
+        tool_output_list = final_message.artifact
+        if isinstance(tool_output_list, list):
+            print("Formatted Tool Output:")
+            for item in tool_output_list:
+                if isinstance(item, dict):
+                    # Assuming news articles have 'title' and 'summary'
+                    title = item.get('title', 'No Title Found')
+                    summary = item.get('summary', 'No Summary Found')
+                    print(f"- Title: {title}")
+                    print(f"  Summary: {summary}")
+                else:
+                    print(f"- {item}") # For other list items
+    print("----------------------------")
+
+# --- Streaming ---
+
+# Nodes whose LLM tokens are forwarded to the caller. The supervisor's output is a routing
+# decision rather than user-facing text, so its tokens are not streamed.
+STREAMED_NODES = set(AGENT_NODES)
+
+@dataclass
+class StreamEvent:
+    """A single event of a streamed run."""
+    kind: str
+    """'node_start', 'token', 'node_end' or 'done'."""
+    node: Optional[str] = None
+    """The node the event belongs to (None for 'done')."""
+    data: Any = None
+    """The token text ('token'), the node's state update ('node_end') or the run timings ('done')."""
+    elapsed: float = 0.0
+    """Seconds since the run started."""
+
+def _stream_event(mode: str, payload: Any, started: float) -> Optional[StreamEvent]:
+    """
+    Converts one item of a multi-mode LangGraph stream into a StreamEvent.
+
+    Returns:
+        Optional[StreamEvent]: The event, or None if the item is not forwarded to the caller.
+    """
+    elapsed = time.perf_counter() - started
+    if mode == "tasks":
+        # Task results are reported through 'updates'; only task starts mark a node boundary here.
+        if "input" in payload:
+            return StreamEvent("node_start", payload["name"], elapsed=elapsed)
+        return None
+    if mode == "messages":
+        chunk, metadata = payload
+        node = metadata.get("langgraph_node")
+        # Only incremental LLM output carries tokens; complete messages written to the state
+        # (tool results, assembled answers) arrive with the node's update instead.
+        if node in STREAMED_NODES and isinstance(chunk, AIMessageChunk) and isinstance(chunk.content, str) and chunk.content:
+            return StreamEvent("token", node, chunk.content, elapsed)
+        return None
+    # mode == "updates": {node_name: state_update}
+    node, update = next(iter(payload.items()))
+    return StreamEvent("node_end", node, update, elapsed)
+
+def _done_event(started: float, first_token: Optional[float], token_count: int) -> StreamEvent:
+    total = time.perf_counter() - started
+    return StreamEvent("done", data={"ttft": first_token, "total": total, "tokens": token_count}, elapsed=total)
+
+def _run_config(config: Optional[dict]) -> dict:
+    run_config = {"recursion_limit": 50, **(config or {})}
+    callbacks = run_config.get("callbacks")
+    if tracer.enabled and (callbacks is None or isinstance(callbacks, list)):
+        # LLM calls are recorded by a per-run callback handler, attached only while tracing is on.
+        from observability.callbacks import TracingCallbackHandler
+        run_config["callbacks"] = (callbacks or []) + [TracingCallbackHandler()]
+    return run_config
+
+def _thread_id(run_config: dict) -> Optional[str]:
+    return (run_config.get("configurable") or {}).get("thread_id")
+
+def _turn_input(input_message: str, run_config: dict, history: Optional[list] = None) -> dict:
+    """
+    Builds the input of one run: the new user message with a reset step counter. For a session
+    whose stored 'history' has grown past the compaction thresholds, the message updates that
+    replace its older turns with a summary are sent along (see 'sessions/compaction.py').
+    """
+    messages = [HumanMessage(content=input_message)]
+    if history:
+        from sessions.compaction import compact_history, SESSION_MAX_MESSAGES, SESSION_MAX_TOKENS, SESSION_KEEP_TURNS
+        configurable = run_config.get("configurable") or {}
+        compaction = compact_history(
+            history,
+            max_messages=configurable.get("session_max_messages", SESSION_MAX_MESSAGES),
+            max_tokens=configurable.get("session_max_tokens", SESSION_MAX_TOKENS),
+            keep_turns=configurable.get("session_keep_turns", SESSION_KEEP_TURNS),
+        )
+        if compaction:
+            logger.info("---Compacting session history: %s messages -> %s---", len(history), len(compaction))
+            messages = compaction + messages
+    return {"messages": messages, "steps": 0}
+
+def _stream_input(input_message: str, config: Optional[dict]) -> tuple:
+    """
+    Prepares a run: the graph to run (the checkpointed session graph when a thread ID is given,
+    otherwise the stateless graph), its input and its configuration.
+    """
+    run_config = _run_config(config)
+    thread_id = _thread_id(run_config)
+    if thread_id is None:
+        return get_app(), _turn_input(input_message, run_config), run_config
+    # Only the latest checkpoint is needed to resume a thread; the previous turn's intermediate
+    # checkpoints are dropped so storage stays bounded.
+    session_checkpointer = get_session_checkpointer()
+    session_checkpointer.prune([thread_id])
+    history = session_checkpointer.thread_messages(run_config)
+    return get_app(sessions=True), _turn_input(input_message, run_config, history), run_config
+
+async def _astream_input(input_message: str, config: Optional[dict]) -> tuple:
+    """
+    Async variant of '_stream_input'.
+    """
+    run_config = _run_config(config)
+    thread_id = _thread_id(run_config)
+    if thread_id is None:
+        return get_app(), _turn_input(input_message, run_config), run_config
+    session_checkpointer = get_session_checkpointer()
+    await session_checkpointer.aprune([thread_id])
+    history = await session_checkpointer.athread_messages(run_config)
+    return get_app(sessions=True), _turn_input(input_message, run_config, history), run_config
+
+def stream_agent(input_message: str, config: dict = None, tokens: bool = True) -> Iterator[StreamEvent]:
+    """
+    Runs the multi-agent system and yields its progress as it happens: a 'node_start' and a
+    'node_end' event around every node execution, the LLM tokens of the worker agents in between
+    (as they are generated), and a final 'done' event carrying the run's timings.
+
+    Args:
+        input_message (str): The user's input message to the agent system.
+        config (dict): Optional extra run configuration merged over the defaults. With a
+                       'configurable.thread_id', the run continues that session's conversation.
+        tokens (bool): Whether to stream LLM tokens. Without tokens only node events are produced.
+
+    Yields:
+        StreamEvent: The events of the run, in order. The 'done' event's data holds 'ttft' (seconds
+        until the first token, or None if no token was streamed), 'total' (seconds for the whole
+        run) and 'tokens' (the number of streamed tokens).
+    """
+    graph, initial_state, run_config = _stream_input(input_message, config)
+    stream_mode = ["tasks", "messages", "updates"] if tokens else ["tasks", "updates"]
+    started = time.perf_counter()
+    first_token, token_count = None, 0
+    with tracer.span("graph", "run", input_chars=len(input_message)):
+        for mode, payload in graph.stream(initial_state, run_config, stream_mode=stream_mode):
+            event = _stream_event(mode, payload, started)
+            if event is None:
+                continue
+            if event.kind == "token":
+                token_count += 1
+                if first_token is None:
+                    first_token = event.elapsed
+                    tracer.annotate(ttft_ms=first_token * 1e3)
+            yield event
+    yield _done_event(started, first_token, token_count)
+
+async def astream_agent(input_message: str, config: dict = None, tokens: bool = True) -> AsyncIterator[StreamEvent]:
+    """
+    Async variant of 'stream_agent'.
+
+    Note: tokens of LLM calls made inside the async nodes are captured through the run context,
+    which requires Python 3.11+; on older versions only node events are produced for async nodes.
+    """
+    graph, initial_state, run_config = await _astream_input(input_message, config)
+    stream_mode = ["tasks", "messages", "updates"] if tokens else ["tasks", "updates"]
+    started = time.perf_counter()
+    first_token, token_count = None, 0
+    with tracer.span("graph", "run", input_chars=len(input_message)):
+        async for mode, payload in graph.astream(initial_state, run_config, stream_mode=stream_mode):
+            event = _stream_event(mode, payload, started)
+            if event is None:
+                continue
+            if event.kind == "token":
+                token_count += 1
+                if first_token is None:
+                    first_token = event.elapsed
+                    tracer.annotate(ttft_ms=first_token * 1e3)
+            yield event
+    yield _done_event(started, first_token, token_count)
+
+def run_agent(input_message: str, stream_tokens: bool = False, thread_id: Optional[str] = None):
     """
     Helper function to run the multi-agent system with a given user input.
     It initializes the state, streams the execution, and prints the final output.
 
     Args:
         input_message (str): The user's input message to the agent system.
+        stream_tokens (bool): Whether to print the worker agents' LLM output token by token
+                              as it is generated.
+        thread_id (Optional[str]): The session to continue. Earlier turns of the session are
+                                   loaded from the checkpointer, so follow-up questions keep
+                                   their context; without it every request starts fresh.
     """
-    print(f"\n---Running agent with input: '{input_message}'---")
-    # Initialize the agent state with the user's message as the starting point.
-    initial_state = {"messages": [HumanMessage(content=input_message)]}
-
-    all_states = [] # To collect all intermediate states for debugging and final output extraction
+    logger.info("\n---Running agent with input: '%s'---", input_message)
+    # Only the latest final answer is kept while streaming, so memory does not grow with the
+    # number of steps (intermediate updates are logged and then released).
+    final_message = None
 
     try:
-        # Invoke the graph and stream the results.
-        # Streaming allows observing the state changes at each step of the graph's execution.
-        # A recursion_limit is set to prevent infinite loops in complex graphs.
-        for s in app.stream(initial_state, {"recursion_limit": 50}):
-            print(s) # Print each state as it updates
-            all_states.append(s) # Collect each state for post-execution analysis
-
-        print("---Agent execution finished---")
-
-        # --- Extract and Print Final Output ---
-        print("\n--- Agent's Final Output ---")
-
-        # Find the last state that contains the 'messages' key, as this holds the conversation history.
-        state_with_messages = None
-        for s in all_states:
-            # Check if the state dict itself contains 'messages'
-            if isinstance(s, dict) and 'messages' in s:
-                state_with_messages = s
-            # Also check for 'messages' nested under a node's output (e.g., {'agent_name': {'messages': [...]}})
-            for key, value in (s.items() if isinstance(s, dict) else []):
-                if isinstance(value, dict) and 'messages' in value:
-                    state_with_messages = value # Prioritize messages from the latest agent's direct output
-
-        if state_with_messages and 'messages' in state_with_messages:
-            # Iterate through messages in reverse to find the last AI or Tool message with content.
-            last_content_message = None
-            for msg in reversed(state_with_messages.get('messages', [])):
-                if isinstance(msg, (AIMessage, ToolMessage)) and msg.content and msg.content.strip():
-                    last_content_message = msg
-                    break
-
-            if last_content_message:
-                if isinstance(last_content_message, AIMessage):
-                    print(f"AI Response: {last_content_message.content}")
-                elif isinstance(last_content_message, ToolMessage):
-                    # For ToolMessages, try to format the output if it's a list (e.g., news articles)
-                    print(f"Tool Result: {last_content_message.content}")
-                    try:
-                        # Safely evaluate the string content as a Python literal (like a list of dicts)
-                        tool_output_list = ast.literal_eval(last_content_message.content)
-                        if isinstance(tool_output_list, list):
-                            print("Formatted Tool Output:")
-                            for item in tool_output_list:
-                                if isinstance(item, dict):
-                                    # Assuming news articles have 'title' and 'summary'
-                                    title = item.get('title', 'No Title Found')
-                                    summary = item.get('summary', 'No Summary Found')
-                                    print(f"- Title: {title}")
-                                    print(f"  Summary: {summary}")
-                                else:
-                                    print(f"- {item}") # For other list items
-                    except (ValueError, SyntaxError):
-                        # If not a valid Python literal, just print the raw content (already done above)
-                        pass
-            else:
-                print("No final AI or Tool message with content found in the last state.")
-        else:
-            print("No state containing messages was found during execution.")
-        print("----------------------------")
+        # Stream the execution. Each node's state update is logged (at DEBUG level) when the node
+        # finishes and, with 'stream_tokens', LLM tokens are printed as soon as they are generated.
+        # The step counter is reset so every request gets the full step budget.
+        in_tokens = False
+        config = {"configurable": {"thread_id": thread_id}} if thread_id else None
+        for event in stream_agent(input_message, config, tokens=stream_tokens):
+            if event.kind == "token":
+                print(event.data, end="", flush=True)
+                in_tokens = True
+                continue
+            if in_tokens:
+                print() # Finish the line of streamed tokens
+                in_tokens = False
+            if event.kind == "node_end":
+                logger.debug("%s", {event.node: event.data}) # Formatted only when DEBUG output is enabled
+                final_message = final_message_in(event.data) or final_message
+            elif event.kind == "done":
+                timings = event.data
+                if timings["ttft"] is not None:
+                    logger.info("---Time to first token: %.2fs (%s tokens streamed)---", timings['ttft'], timings['tokens'])
+                logger.info("---Total latency: %.2fs---", timings['total'])
+
+        logger.info("---Agent execution finished---")
+        stats = fast_path_router.stats
+        logger.info("---Supervisor fast-path hit rate: %.0f%% (%s/%s decisions without the LLM)---",
+                    stats.hit_rate * 100, stats.fast_path_hits, stats.decisions)
+        cache_stats = llm_cache.stats
+        logger.info("---LLM cache hit rate: %.0f%% (%s cached responses, %s model calls)---",
+                    cache_stats.hit_rate * 100, cache_stats.hits + cache_stats.disk_hits, cache_stats.misses)
+
+        print_final_output(final_message)
 
     except Exception as e:
-        print(f"\n---An error occurred during agent execution: {e}---")
+        logger.error("\n---An error occurred during agent execution: %s---", e)
+
+async def arun_agent(input_message: str, config: dict = None) -> list:
+    """
+    Async variant of 'run_agent'. Streams the graph with 'astream', so hundreds of concurrent
+    sessions can be served from one event loop while they wait on the LLM and tool I/O.
+
+    Args:
+        input_message (str): The user's input message to the agent system.
+        config (dict): Optional extra run configuration merged over the defaults. With a
+                       'configurable.thread_id', the run continues that session's conversation.
+
+    Returns:
+        list: The state updates streamed from the graph, in order.
+    """
+    graph, initial_state, run_config = await _astream_input(input_message, config)
+    all_states = []
+    with tracer.span("graph", "run", input_chars=len(input_message)):
+        async for s in graph.astream(initial_state, run_config):
+            all_states.append(s)
+    return all_states
+
+def get_final_answer(input_message: str, config: dict = None) -> Optional[BaseMessage]:
+    """
+    Runs the multi-agent system and returns only its final answer.
+
+    Only node updates are streamed and just the latest final message is kept, so memory stays
+    constant regardless of how many steps the run takes.
+
+    Args:
+        input_message (str): The user's input message to the agent system.
+        config (dict): Optional extra run configuration merged over the defaults. With a
+                       'configurable.thread_id', the run continues that session's conversation.
+
+    Returns:
+        Optional[BaseMessage]: The last AI or Tool message with content (a ToolMessage carries its
+        structured result as 'artifact'), or None if the run produced none.
+    """
+    graph, initial_state, run_config = _stream_input(input_message, config)
+    final_message = None
+    with tracer.span("graph", "run", input_chars=len(input_message)):
+        for s in graph.stream(initial_state, run_config, stream_mode="updates"):
+            for update in s.values():
+                final_message = final_message_in(update) or final_message
+    return final_message
+
+async def aget_final_answer(input_message: str, config: dict = None) -> Optional[BaseMessage]:
+    """
+    Async variant of 'get_final_answer'.
+    """
+    graph, initial_state, run_config = await _astream_input(input_message, config)
+    final_message = None
+    with tracer.span("graph", "run", input_chars=len(input_message)):
+        async for s in graph.astream(initial_state, run_config, stream_mode="updates"):
+            for update in s.values():
+                final_message = final_message_in(update) or final_message
+    return final_message
 
 # --- Interactive Loop for Agent Interaction ---
 if __name__ == "__main__":
+    # LOG_LEVEL=DEBUG shows tool payloads and state updates, LOG_LEVEL=WARNING only the answers.
+    # TRACE_JSONL_PATH=<file> records spans, TRACE_HISTOGRAMS=1 prints per-node latency percentiles.
+    configure_logging()
+    histograms = configure_tracing()
+    # OLLAMA_WARMUP=1 loads the model and primes the supervisor prompt prefix before the first request.
+    if os.environ.get("OLLAMA_WARMUP") == "1":
+        from llms import ollama_llms
+        from supervisor.prompts import SUPERVISOR_PROMPT_PREFIX
+        ollama_llms.llm_backend.warm_up(SUPERVISOR_PROMPT_PREFIX)
+    # All requests of the interactive loop belong to one session, so follow-up questions keep their
+    # context. With SESSION_DB_PATH set, SESSION_ID=<id> resumes an earlier session.
+    session_id = os.environ.get("SESSION_ID") or uuid.uuid4().hex[:12]
+
     print("Welcome to the Multi-Agent System!")
+    print(f"Session: {session_id}")
     print("Type your request below, or type 'quit' to exit.")
 
     while True:
@@ -147,6 +566,8 @@ if __name__ == "__main__":
             print("Exiting Multi-Agent System. Goodbye!")
             break
         if user_input.strip(): # Only process non-empty input
-            run_agent(user_input)
+            run_agent(user_input, stream_tokens=True, thread_id=session_id) # Show the answer as it is being generated
+            if histograms is not None:
+                print(histograms.format_table())
         else:
             print("Please enter a request.")
\ No newline at end of file
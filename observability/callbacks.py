@@ -0,0 +1,61 @@
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import LLMResult
+
+from observability.tracing import Span, tracer
+
+# --- LLM Call Instrumentation ---
+# A LangChain callback handler that records every chat model call as an 'llm' span nested under
+# the node that made it, with prompt size, token usage, tool calls and whether the response came
+# from the LLM response cache. It is only added to a run's callbacks while tracing is enabled.
+
+
+class TracingCallbackHandler(BaseCallbackHandler):
+    """Records chat model calls as 'llm' spans."""
+
+    # Only model events are of interest; skipping chain events keeps per-node overhead low.
+    ignore_chain = True
+    ignore_agent = True
+    ignore_retriever = True
+
+    def __init__(self):
+        super().__init__()
+        self._spans: Dict[UUID, Span] = {}
+
+    def on_chat_model_start(self, serialized: Dict[str, Any], messages: List[List[BaseMessage]], *,
+                            run_id: UUID, metadata: Optional[Dict[str, Any]] = None, **kwargs: Any) -> None:
+        parent = tracer.current_span()
+        # Name the span after the calling node, so 'llm:supervisor' and 'llm:stock_news_agent'
+        # are aggregated separately even though both roles use the same model.
+        node = (metadata or {}).get("langgraph_node") or (parent.name if parent else None)
+        prompt_chars = sum(len(str(message.content)) for batch in messages for message in batch)
+        params = kwargs.get("invocation_params") or {}
+        self._spans[run_id] = tracer.start_span(
+            node or "llm", "llm", parent=parent,
+            model=params.get("model_name") or params.get("model") or (serialized or {}).get("name"),
+            prompt_messages=sum(len(batch) for batch in messages),
+            prompt_chars=prompt_chars,
+            prompt_tokens=prompt_chars // 4 + 1, # Same estimate as the supervisor's token budget
+        )
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        span = self._spans.pop(run_id, None)
+        if span is None:
+            return
+        generation = response.generations[0][0] if response.generations and response.generations[0] else None
+        message = getattr(generation, "message", None)
+        if message is not None:
+            usage = getattr(message, "usage_metadata", None) or {}
+            span.attributes["input_tokens"] = usage.get("input_tokens", 0)
+            span.attributes["output_tokens"] = usage.get("output_tokens", 0)
+            span.attributes["tool_calls"] = len(getattr(message, "tool_calls", None) or [])
+            span.attributes["cache_hit"] = bool(message.response_metadata.get("cache_hit"))
+        tracer.end_span(span)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        span = self._spans.pop(run_id, None)
+        if span is not None:
+            tracer.end_span(span, error)
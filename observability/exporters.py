@@ -0,0 +1,118 @@
+from collections import defaultdict
+from typing import Dict, List, Optional
+import json
+import math
+import threading
+
+from observability.tracing import Span, SpanExporter
+
+# --- Span Exporters ---
+# JsonlExporter appends every span to a file for offline analysis; HistogramExporter aggregates
+# per-node/model/tool latency distributions and LLM counters in process.
+
+# Percentiles reported by HistogramExporter.
+HISTOGRAM_PERCENTILES = (50, 95, 99)
+
+
+class JsonlExporter(SpanExporter):
+    """Appends every finished span to a file as one JSON line."""
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path (str): The JSONL file (appended to, created if missing).
+        """
+        self.path = path
+        self._file = open(path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(span.as_dict(), ensure_ascii=False, default=str)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """
+    Nearest-rank percentile of an already sorted list (0.0 if it is empty).
+
+    Shared by the latency reports of the histograms, the batch runner and the benchmarks, so that
+    p95 is never below the median, however few values there are.
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(pct / 100 * len(sorted_values)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+class HistogramExporter(SpanExporter):
+    """
+    Aggregates span durations per key ('node:supervisor', 'llm:stock_news_agent', 'tool:get_stock_news', ...)
+    and sums LLM token counts and cache hits, for p50/p95/p99 latency reports.
+    """
+
+    def __init__(self, max_samples: int = 10000):
+        """
+        Args:
+            max_samples (int): Maximum durations kept per key; older samples are dropped beyond it.
+        """
+        self.max_samples = max_samples
+        self._durations: Dict[str, List[float]] = defaultdict(list)
+        self._counters: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        with self._lock:
+            durations = self._durations[span.key]
+            durations.append(span.duration_ms)
+            if len(durations) > self.max_samples:
+                del durations[:len(durations) - self.max_samples]
+            counters = self._counters[span.key]
+            counters["errors"] += span.error is not None
+            for name in ("input_tokens", "output_tokens", "prompt_tokens"):
+                counters[name] += span.attributes.get(name) or 0
+            counters["cache_hits"] += bool(span.attributes.get("cache_hit"))
+
+    def reset(self) -> None:
+        with self._lock:
+            self._durations.clear()
+            self._counters.clear()
+
+    def summary(self, prefix: Optional[str] = None) -> Dict[str, dict]:
+        """
+        Returns the latency distribution and counters per key.
+
+        Args:
+            prefix (Optional[str]): Only include keys starting with this prefix (e.g., 'node:').
+
+        Returns:
+            Dict[str, dict]: Per key: 'count', 'mean_ms', 'p50_ms', 'p95_ms', 'p99_ms' and the
+            non-zero counters ('errors', 'input_tokens', 'output_tokens', 'prompt_tokens', 'cache_hits').
+        """
+        with self._lock:
+            items = [(key, sorted(values), dict(self._counters[key])) for key, values in self._durations.items()
+                     if prefix is None or key.startswith(prefix)]
+        summary = {}
+        for key, values, counters in sorted(items):
+            summary[key] = {
+                "count": len(values),
+                "mean_ms": sum(values) / len(values),
+                **{f"p{p}_ms": percentile(values, p) for p in HISTOGRAM_PERCENTILES},
+                **{name: value for name, value in counters.items() if value},
+            }
+        return summary
+
+    def format_table(self, prefix: Optional[str] = None) -> str:
+        """Renders 'summary' as a fixed-width text table."""
+        lines = [f"{'span':<36} {'count':>6} {'p50':>10} {'p95':>10} {'p99':>10}  extra"]
+        for key, stats in self.summary(prefix).items():
+            extra = " ".join(f"{name}={stats[name]}" for name in
+                             ("input_tokens", "output_tokens", "cache_hits", "errors") if name in stats)
+            lines.append(f"{key:<36} {stats['count']:>6} {stats['p50_ms']:>7.1f} ms {stats['p95_ms']:>7.1f} ms "
+                         f"{stats['p99_ms']:>7.1f} ms  {extra}")
+        return "\n".join(lines)
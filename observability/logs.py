@@ -0,0 +1,33 @@
+from typing import Optional, Union
+import logging
+import os
+import sys
+
+# --- Logging ---
+# Progress messages ('---Executing Supervisor Node---', ...) go through the standard logging
+# module instead of print(): INFO shows the familiar step-by-step progress, DEBUG adds payloads
+# (tool calls, tool results, state updates), and WARNING or above silences the hot path.
+# Payloads are passed as lazy %-style arguments, so they are never formatted when filtered out.
+
+# Logger namespace shared by the project's modules ('agents.*', 'supervisor.*', 'tools.*', ...).
+PROJECT_LOGGERS = ("main", "agents", "supervisor", "tools", "llms", "observability")
+
+
+def configure_logging(level: Optional[Union[str, int]] = None) -> None:
+    """
+    Configures the verbosity of the project's progress output.
+
+    Args:
+        level (Optional[Union[str, int]]): A logging level such as 'DEBUG', 'INFO' or 'WARNING'
+                                           (defaults to the LOG_LEVEL environment variable, else INFO).
+    """
+    level = level if level is not None else os.environ.get("LOG_LEVEL", "INFO")
+    if isinstance(level, str):
+        level = logging.getLevelName(level.upper())
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    for name in PROJECT_LOGGERS:
+        logger = logging.getLogger(name)
+        logger.handlers = [handler]
+        logger.setLevel(level)
+        logger.propagate = False
@@ -0,0 +1,259 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional
+import inspect
+import os
+import threading
+import time
+import uuid
+
+from langchain_core.runnables import RunnableConfig
+
+# --- Tracing ---
+# Spans record where a run spends its time: the whole run, every graph node, every LLM call and
+# every tool call, each with its duration and attributes (token counts, prompt sizes, cache hits,
+# route decisions, ...). Finished spans are handed to pluggable exporters (see 'exporters.py').
+# Without exporters the tracer is disabled and every instrumentation point reduces to a single
+# attribute check, so tracing costs next to nothing when it is turned off.
+
+
+@dataclass
+class Span:
+    """A timed operation within a traced run."""
+    name: str
+    """What was executed (a node, model or tool name)."""
+    kind: str
+    """'run', 'node', 'llm' or 'tool'."""
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str] = None
+    start: float = field(default_factory=time.time)
+    """Wall-clock start (seconds since the epoch)."""
+    duration_ms: float = 0.0
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+    perf_start: float = field(default=0.0, repr=False)
+    """Monotonic start used to measure the duration (not exported)."""
+
+    @property
+    def key(self) -> str:
+        """The name metrics are aggregated under, e.g. 'node:supervisor'."""
+        return f"{self.kind}:{self.name}"
+
+    def as_dict(self) -> dict:
+        return {"trace_id": self.trace_id, "span_id": self.span_id, "parent_id": self.parent_id,
+                "kind": self.kind, "name": self.name, "start": self.start, "duration_ms": self.duration_ms,
+                "attributes": self.attributes, "error": self.error}
+
+
+class SpanExporter:
+    """Receives every finished span. Subclasses must be thread-safe."""
+
+    def export(self, span: Span) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+# The innermost open span of the current thread/task; nested spans use it as their parent.
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def _new_id() -> str:
+    return uuid.uuid4().hex[:16]
+
+
+class Tracer:
+    """Creates spans and forwards finished spans to the registered exporters."""
+
+    def __init__(self):
+        self._exporters: List[SpanExporter] = []
+        self._lock = threading.Lock()
+        self.enabled = False
+
+    def add_exporter(self, exporter: SpanExporter) -> SpanExporter:
+        """Registers an exporter (enabling the tracer) and returns it."""
+        with self._lock:
+            self._exporters = self._exporters + [exporter]
+            self.enabled = True
+        return exporter
+
+    def remove_exporter(self, exporter: SpanExporter) -> None:
+        """Unregisters and closes an exporter; the tracer is disabled once none is left."""
+        with self._lock:
+            self._exporters = [e for e in self._exporters if e is not exporter]
+            self.enabled = bool(self._exporters)
+        exporter.close()
+
+    def start_span(self, name: str, kind: str, parent: Optional[Span] = None, **attributes: Any) -> Span:
+        """
+        Opens a span without making it current (e.g., for callback-based instrumentation).
+
+        Args:
+            name (str): What is being executed.
+            kind (str): 'run', 'node', 'llm' or 'tool'.
+            parent (Optional[Span]): The parent span (defaults to the current span).
+            **attributes: Initial span attributes.
+
+        Returns:
+            Span: The open span; finish it with 'end_span'.
+        """
+        parent = parent if parent is not None else _current_span.get()
+        span = Span(name=name, kind=kind, trace_id=parent.trace_id if parent else _new_id(),
+                    span_id=_new_id(), parent_id=parent.span_id if parent else None, attributes=attributes,
+                    perf_start=time.perf_counter())
+        return span
+
+    def end_span(self, span: Span, error: Optional[BaseException] = None) -> None:
+        """Finishes a span and exports it."""
+        span.duration_ms = (time.perf_counter() - span.perf_start) * 1e3
+        if error is not None:
+            span.error = f"{type(error).__name__}: {error}"
+        self._export(span)
+
+    def emit(self, name: str, kind: str, duration: float, error: Optional[str] = None, **attributes: Any) -> None:
+        """
+        Records an operation that was timed elsewhere as a child of the current span.
+
+        Args:
+            name (str): What was executed.
+            kind (str): The span kind.
+            duration (float): The measured duration in seconds.
+            error (Optional[str]): A description of the failure, if any.
+            **attributes: Span attributes.
+        """
+        if not self.enabled:
+            return
+        parent = _current_span.get()
+        span = Span(name=name, kind=kind, trace_id=parent.trace_id if parent else _new_id(), span_id=_new_id(),
+                    parent_id=parent.span_id if parent else None, start=time.time() - duration,
+                    duration_ms=duration * 1e3, attributes=attributes, error=error)
+        self._export(span)
+
+    @contextmanager
+    def span(self, name: str, kind: str, **attributes: Any) -> Iterator[Optional[Span]]:
+        """
+        Times the enclosed block as a span nested under the current span.
+
+        Yields:
+            Optional[Span]: The span (to add attributes to), or None while tracing is disabled.
+        """
+        if not self.enabled:
+            yield None
+            return
+        span = self.start_span(name, kind, **attributes)
+        token = _current_span.set(span)
+        error = None
+        try:
+            yield span
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            try:
+                _current_span.reset(token)
+            except ValueError:
+                pass # Closed from another context (e.g., an abandoned streaming generator)
+            self.end_span(span, error)
+
+    def annotate(self, **attributes: Any) -> None:
+        """Adds attributes to the current span (no-op while tracing is disabled)."""
+        if not self.enabled:
+            return
+        span = _current_span.get()
+        if span is not None:
+            span.attributes.update(attributes)
+
+    def current_span(self) -> Optional[Span]:
+        return _current_span.get()
+
+    def _export(self, span: Span) -> None:
+        for exporter in self._exporters:
+            try:
+                exporter.export(span)
+            except Exception:
+                pass # A broken exporter must never break the run
+
+
+# Process-wide tracer used by all instrumentation points.
+tracer = Tracer()
+
+
+def _annotate_update(span: Span, update: Any) -> None:
+    # Record what the node decided: the supervisor's route, an agent's handoff and the number of
+    # messages it added to the conversation.
+    if not isinstance(update, dict):
+        return
+    if update.get("next") is not None:
+        span.attributes["route"] = update["next"]
+    if update.get("handoff") is not None:
+        span.attributes["handoff"] = update["handoff"]
+    span.attributes["messages_added"] = len(update.get("messages") or [])
+
+
+def traced_node(name: str, func: Callable) -> Callable:
+    """
+    Wraps a synchronous graph node so every execution is recorded as a 'node' span.
+
+    Args:
+        name (str): The node name.
+        func (Callable): The node function, taking the state and optionally 'config'.
+
+    Returns:
+        Callable: A node function with the signature (state, config).
+    """
+    passes_config = "config" in inspect.signature(func).parameters
+
+    def node(state, config: RunnableConfig = None):
+        args = (state, config) if passes_config else (state,)
+        if not tracer.enabled:
+            return func(*args)
+        with tracer.span(name, "node", step=state.get('steps', 0)) as span:
+            update = func(*args)
+            _annotate_update(span, update)
+            return update
+
+    node.__name__ = getattr(func, "__name__", name)
+    return node
+
+
+def atraced_node(name: str, afunc: Callable) -> Callable:
+    """Async variant of 'traced_node'."""
+    passes_config = "config" in inspect.signature(afunc).parameters
+
+    async def node(state, config: RunnableConfig = None):
+        args = (state, config) if passes_config else (state,)
+        if not tracer.enabled:
+            return await afunc(*args)
+        with tracer.span(name, "node", step=state.get('steps', 0)) as span:
+            update = await afunc(*args)
+            _annotate_update(span, update)
+            return update
+
+    node.__name__ = getattr(afunc, "__name__", name)
+    return node
+
+
+def configure_tracing(jsonl_path: Optional[str] = None, histograms: Optional[bool] = None):
+    """
+    Enables tracing from arguments or the environment.
+
+    Args:
+        jsonl_path (Optional[str]): File every span is appended to as a JSON line
+                                    (defaults to the TRACE_JSONL_PATH environment variable).
+        histograms (Optional[bool]): Whether to aggregate in-process latency histograms
+                                     (defaults to TRACE_HISTOGRAMS=1 in the environment).
+
+    Returns:
+        Optional[HistogramExporter]: The histogram exporter, if histograms were enabled.
+    """
+    from observability.exporters import HistogramExporter, JsonlExporter
+
+    jsonl_path = jsonl_path if jsonl_path is not None else os.environ.get("TRACE_JSONL_PATH")
+    if histograms is None:
+        histograms = os.environ.get("TRACE_HISTOGRAMS", "0") == "1"
+    if jsonl_path:
+        tracer.add_exporter(JsonlExporter(jsonl_path))
+    return tracer.add_exporter(HistogramExporter()) if histograms else None
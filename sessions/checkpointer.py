@@ -0,0 +1,106 @@
+from typing import Any, AsyncIterator, Dict, Optional, Sequence
+import asyncio
+import os
+import sqlite3
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import ChannelVersions, Checkpoint, CheckpointMetadata, CheckpointTuple
+from langgraph.checkpoint.sqlite import SqliteSaver
+
+# --- Session Checkpointer ---
+# Multi-turn sessions keep the graph state of every thread ('configurable.thread_id') in sqlite,
+# so each turn only sends the new user message and follow-up questions see the earlier turns.
+# Set the SESSION_DB_PATH environment variable to a sqlite file to keep sessions across restarts;
+# by default they live in an in-memory database for the lifetime of the process.
+SESSION_DB_PATH = os.environ.get("SESSION_DB_PATH", ":memory:")
+
+
+class SessionCheckpointer(SqliteSaver):
+    """
+    A sqlite checkpointer usable from both the synchronous and the async graph API.
+
+    SqliteSaver only implements the synchronous interface; here the async methods run the same
+    sqlite operations in a worker thread (the connection is shared across threads and guarded
+    by the saver's lock), so 'app.astream' sessions do not need a separate aiosqlite connection
+    bound to one event loop. Superseded checkpoints can be pruned, so a thread's storage does
+    not grow with the number of steps it has taken.
+    """
+
+    def __init__(self, db_path: str = ":memory:"):
+        """
+        Args:
+            db_path (str): The sqlite file (':memory:' keeps sessions in process memory only).
+        """
+        super().__init__(sqlite3.connect(db_path, check_same_thread=False))
+        self.db_path = db_path
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(self, config: Optional[RunnableConfig], *, filter: Optional[Dict[str, Any]] = None,
+                    before: Optional[RunnableConfig] = None, limit: Optional[int] = None) -> AsyncIterator[CheckpointTuple]:
+        items = await asyncio.to_thread(lambda: list(self.list(config, filter=filter, before=before, limit=limit)))
+        for item in items:
+            yield item
+
+    async def aput(self, config: RunnableConfig, checkpoint: Checkpoint, metadata: CheckpointMetadata,
+                   new_versions: ChannelVersions) -> RunnableConfig:
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config: RunnableConfig, writes: Sequence[tuple], task_id: str,
+                          task_path: str = "") -> None:
+        await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await asyncio.to_thread(self.delete_thread, thread_id)
+
+    def prune(self, thread_ids: Sequence[str], *, strategy: str = "keep_latest") -> None:
+        """
+        Drops checkpoints that are no longer needed.
+
+        The graph only uses plain (non-delta) channels, so the latest checkpoint holds the complete
+        state of a thread and everything before it can be deleted without losing the session.
+
+        Args:
+            thread_ids (Sequence[str]): The threads to prune.
+            strategy (str): 'keep_latest' keeps only the most recent checkpoint (and its pending
+                            writes) per thread; 'delete' removes the threads entirely.
+        """
+        if strategy == "delete":
+            for thread_id in thread_ids:
+                self.delete_thread(thread_id)
+            return
+        if strategy != "keep_latest":
+            raise ValueError(f"Unknown prune strategy: {strategy!r}")
+        with self.cursor() as cur:
+            for thread_id in thread_ids:
+                # Checkpoint IDs are time-ordered, so the latest checkpoint has the largest ID
+                # (the same order SqliteSaver uses to find it).
+                cur.execute(
+                    "DELETE FROM checkpoints WHERE thread_id = ? AND checkpoint_id < ("
+                    "SELECT MAX(c.checkpoint_id) FROM checkpoints c "
+                    "WHERE c.thread_id = checkpoints.thread_id AND c.checkpoint_ns = checkpoints.checkpoint_ns)",
+                    (str(thread_id),),
+                )
+                cur.execute(
+                    "DELETE FROM writes WHERE thread_id = ? AND NOT EXISTS ("
+                    "SELECT 1 FROM checkpoints c WHERE c.thread_id = writes.thread_id "
+                    "AND c.checkpoint_ns = writes.checkpoint_ns AND c.checkpoint_id = writes.checkpoint_id)",
+                    (str(thread_id),),
+                )
+
+    async def aprune(self, thread_ids: Sequence[str], *, strategy: str = "keep_latest") -> None:
+        await asyncio.to_thread(self.prune, thread_ids, strategy=strategy)
+
+    def thread_messages(self, config: RunnableConfig) -> list:
+        """Returns the stored conversation of the thread in 'config' (empty for a new thread)."""
+        return _messages_of(self.get_tuple(config))
+
+    async def athread_messages(self, config: RunnableConfig) -> list:
+        return _messages_of(await self.aget_tuple(config))
+
+
+def _messages_of(checkpoint_tuple: Optional[CheckpointTuple]) -> list:
+    if checkpoint_tuple is None:
+        return []
+    return list(checkpoint_tuple.checkpoint.get("channel_values", {}).get("messages") or [])
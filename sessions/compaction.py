@@ -0,0 +1,125 @@
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, RemoveMessage, SystemMessage, ToolMessage
+from langgraph.graph.message import REMOVE_ALL_MESSAGES
+from typing import List
+
+from supervisor.prompts import estimate_tokens
+
+# --- History Compaction ---
+# A long-lived session would otherwise grow without bound: every turn appends the user's request,
+# the agents' tool calls and (often large) tool results, and all of it is stored in every
+# checkpoint and loaded again on the next turn. Once a thread passes a size threshold, its oldest
+# turns are folded into a single summary message and removed, and only the most recent turns are
+# kept verbatim. The summary is extractive (each turn's request and final answer, truncated), so
+# compaction needs no extra LLM call.
+
+# A thread is compacted once it holds more messages than this...
+SESSION_MAX_MESSAGES = 40
+# ...or more than this many estimated tokens.
+SESSION_MAX_TOKENS = 8000
+# Number of most recent turns kept verbatim when compacting.
+SESSION_KEEP_TURNS = 3
+# Maximum number of summarized turns in the summary; older summary lines are dropped.
+SUMMARY_MAX_TURNS = 20
+# Number of characters of a request or answer kept in its summary line.
+SUMMARY_LINE_CHARS = 160
+
+# Name marking the summary message, so a later compaction extends it instead of summarizing it.
+SUMMARY_NAME = "conversation_summary"
+SUMMARY_HEADER = "Summary of the earlier conversation:"
+
+
+def _shorten(text: str) -> str:
+    text = " ".join(str(text).split())
+    return text if len(text) <= SUMMARY_LINE_CHARS else text[:SUMMARY_LINE_CHARS] + "..."
+
+
+def split_turns(messages: List[BaseMessage]) -> List[List[BaseMessage]]:
+    """
+    Splits a conversation into turns, each starting with a user message. Messages before the
+    first user message (e.g., an earlier summary) form a turn of their own.
+
+    Args:
+        messages (List[BaseMessage]): The conversation messages from the AgentState.
+
+    Returns:
+        List[List[BaseMessage]]: The turns, in order.
+    """
+    turns: List[List[BaseMessage]] = []
+    for msg in messages:
+        if isinstance(msg, HumanMessage) or not turns:
+            turns.append([msg])
+        else:
+            turns[-1].append(msg)
+    return turns
+
+
+def summarize_turn(turn: List[BaseMessage]) -> List[str]:
+    """
+    Summarizes a turn as one line holding the user's request and the turn's final answer.
+    A previous summary message contributes its existing lines instead.
+
+    Args:
+        turn (List[BaseMessage]): The messages of one turn.
+
+    Returns:
+        List[str]: The summary lines.
+    """
+    lines = []
+    for msg in turn:
+        if isinstance(msg, SystemMessage) and msg.name == SUMMARY_NAME:
+            lines.extend(line for line in str(msg.content).splitlines()[1:] if line.strip())
+    request = turn[0].content if isinstance(turn[0], HumanMessage) else None
+    if request is None:
+        return lines
+    # The final answer is the last AI or Tool message with content, as in 'final_message_in'.
+    answer = next((msg.content for msg in reversed(turn)
+                   if isinstance(msg, (AIMessage, ToolMessage)) and str(msg.content).strip()), None)
+    line = f"- User: {_shorten(request)}"
+    if answer is not None:
+        line += f" -> Answer: {_shorten(answer)}"
+    lines.append(line)
+    return lines
+
+
+def needs_compaction(messages: List[BaseMessage], max_messages: int = SESSION_MAX_MESSAGES,
+                     max_tokens: int = SESSION_MAX_TOKENS) -> bool:
+    """Checks whether a thread has grown past the compaction thresholds."""
+    if len(messages) > max_messages:
+        return True
+    return sum(estimate_tokens(str(msg.content)) for msg in messages) > max_tokens
+
+
+def compact_history(messages: List[BaseMessage], max_messages: int = SESSION_MAX_MESSAGES,
+                    max_tokens: int = SESSION_MAX_TOKENS, keep_turns: int = SESSION_KEEP_TURNS) -> List[BaseMessage]:
+    """
+    Builds the message updates that compact a thread's history, if it has grown too large.
+
+    The updates are meant to be sent ahead of the next turn's user message: they remove the whole
+    history ('REMOVE_ALL_MESSAGES') and re-add a summary of the older turns followed by the most
+    recent turns unchanged. Turns are cut at user messages, so an AI tool call is never
+    separated from its tool results.
+
+    Args:
+        messages (List[BaseMessage]): The thread's current messages.
+        max_messages (int): Compact once the thread holds more messages than this.
+        max_tokens (int): Compact once the thread holds more estimated tokens than this.
+        keep_turns (int): Number of most recent turns kept verbatim.
+
+    Returns:
+        List[BaseMessage]: The updates for the 'messages' channel, or an empty list if the
+        thread does not need compaction.
+    """
+    if not needs_compaction(messages, max_messages, max_tokens):
+        return []
+    turns = split_turns(messages)
+    keep_turns = max(keep_turns, 0)
+    old, recent = turns[:len(turns) - keep_turns], turns[len(turns) - keep_turns:] if keep_turns else []
+    if not old:
+        return [] # A few very large turns: nothing older to fold away
+
+    lines = []
+    for turn in old:
+        lines.extend(summarize_turn(turn))
+    lines = lines[-SUMMARY_MAX_TURNS:] # The oldest turns are dropped entirely
+    summary = SystemMessage(content="\n".join([SUMMARY_HEADER, *lines]), name=SUMMARY_NAME)
+    return [RemoveMessage(id=REMOVE_ALL_MESSAGES), summary, *(msg for turn in recent for msg in turn)]
@@ -1,20 +1,43 @@
-import operator
-from typing import Annotated, TypedDict, List
+from typing import Annotated, TypedDict, List, Optional
 from langchain_core.messages import BaseMessage
 
+def add_messages(left: list, right: list) -> list:
+    """
+    The 'messages' reducer: LangGraph's 'add_messages', imported when the first update is merged
+    rather than when this module is imported, so modules that only need the AgentState type
+    (e.g., for annotations) do not load langgraph.
+    """
+    from langgraph.graph.message import add_messages as merge_messages
+    return merge_messages(left, right)
+
 class AgentState(TypedDict):
     """
     Represents the state of the multi-agent system.
     This state is passed between nodes (agents) in the LangGraph.
     """
-    messages: Annotated[list[BaseMessage], operator.add]
+    messages: Annotated[list[BaseMessage], add_messages]
     """
     A list of all messages in the conversation history.
-    'Annotated' with 'operator.add' indicates that when multiple nodes
-    modify this field, their changes should be appended (like extending a list).
+    This is an append-only channel: nodes must return ONLY the messages they produced
+    during their step (never the full history). The 'add_messages' reducer stamps every
+    incoming message with a stable ID and merges by ID, so a message that is returned
+    twice is stored once instead of being duplicated.
     """
     next: str
     """
     A string indicating the name of the next agent node to execute.
     This field is typically set by the supervisor agent to route requests.
-    """
\ No newline at end of file
+    """
+    handoff: Optional[str]
+    """
+    Set by a worker agent to decide where control goes after it finishes, without another
+    supervisor round trip: 'END' marks the agent's output as the final answer, the name of another
+    agent hands off to it directly, and None returns control to the supervisor.
+    The supervisor resets this field whenever it routes.
+    """
+    steps: int
+    """
+    The number of node executions in the current request. Every node increments it, and the
+    routing functions end the run once it reaches the per-request step budget. Callers reset it
+    by passing 'steps': 0 with each new request.
+    """
@@ -1,5 +1,8 @@
-from langchain_core.messages import HumanMessage, AIMessage, ToolMessage
-from typing import List # Import List for type hinting
+from langchain_core.messages import BaseMessage, HumanMessage, AIMessage, SystemMessage, ToolMessage
+from typing import List, Optional # Import List for type hinting
+from collections import OrderedDict
+from dataclasses import dataclass, field
+import threading
 
 # Supervisor agent's prompt template.
 # This prompt guides the supervisor LLM in routing user requests to the appropriate agent.
@@ -16,17 +19,17 @@ Consider the following factors when making your routing decision:
 - The results of any tool calls (indicated by 'ToolMessage' in the history).
 - Whether a final, satisfactory response has already been generated for the user.
 
-Available worker agents and their functionalities:
-- 'text_processing_agent': Handles general text-based queries, simple questions, or when no specific tool is required.
-- 'data_analysis_agent': Designed for tasks involving data manipulation, analysis, or interaction with data sources.
-- 'calculator_agent': Specifically for mathematical calculations (e.g., addition, subtraction, multiplication, division).
-- 'stock_news_agent': Fetches the latest news headlines and summaries for a given stock ticker (e.g., "AAPL", "MSFT").
+Available worker agents and their functionalities, each with its label:
+1 = 'text_processing_agent': Handles general text-based queries, simple questions, or when no specific tool is required.
+2 = 'data_analysis_agent': Analyzes local CSV/Parquet data files: schema, column statistics, aggregations and group-bys.
+3 = 'calculator_agent': Specifically for mathematical calculations (e.g., addition, subtraction, multiplication, division).
+4 = 'stock_news_agent': Fetches the latest news headlines and summaries for one or more stock tickers (e.g., "AAPL", "MSFT").
                         This agent can also provide a basic sentiment assessment of the fetched news.
-- 'END': Select 'END' if the conversation history clearly indicates that the user's request has been fulfilled,
-         a comprehensive final answer has been provided, or the user explicitly states they are done.
+0 = 'END': Select 'END' if the conversation history clearly indicates that the user's request has been fulfilled,
+           a comprehensive final answer has been provided, or the user explicitly states they are done.
 
-Your response MUST be ONLY the name of the agent to route to (e.g., 'text_processing_agent', 'calculator_agent', 'stock_news_agent'), or 'END'.
-Do NOT include any additional text, explanations, or punctuation in your response.
+Your response MUST be ONLY the single-digit label of your choice (e.g., 3 for 'calculator_agent', 0 for 'END').
+Do NOT include the agent name, any additional text, explanations, quotes or punctuation in your response.
 
 Conversation history:
 {chat_history}
@@ -34,6 +37,116 @@ Conversation history:
 Latest message: {latest_message}
 """
 
+# Single-digit labels the supervisor LLM answers with (see the prompt above). A digit is a single
+# token, so a routing decision costs about one decode step, and the answer is validated locally
+# (see 'supervisor/route_parser.py') before it reaches the graph's conditional edge.
+ROUTE_LABELS = {
+    "1": "text_processing_agent",
+    "2": "data_analysis_agent",
+    "3": "calculator_agent",
+    "4": "stock_news_agent",
+    "0": "END",
+}
+# Upper bound on the tokens the supervisor LLM may generate: the label, plus some slack for a
+# stray quote or space, which the parser strips.
+SUPERVISOR_MAX_TOKENS = 3
+
+# The static part of the supervisor prompt, identical for every request. The model warm-up sends it
+# once at startup so the server's prompt cache already holds it when the first request arrives.
+SUPERVISOR_PROMPT_PREFIX = SUPERVISOR_PROMPT.split("{chat_history}", 1)[0]
+
+# --- Supervisor Prompt Budget ---
+# Upper bound (in estimated tokens) for the rendered conversation history in the supervisor prompt.
+# Can be overridden per run via config={"configurable": {"supervisor_token_budget": ...}}.
+SUPERVISOR_HISTORY_TOKEN_BUDGET = 2000
+# Upper bound (in estimated tokens) for the 'Latest message' section of the supervisor prompt.
+SUPERVISOR_LATEST_MESSAGE_TOKEN_BUDGET = 500
+# Number of most recent history messages that are always rendered in full (budget permitting).
+# Older ToolMessages outside this window are compressed into short stubs.
+SUPERVISOR_RECENT_WINDOW = 6
+# Number of characters of an old tool result kept in its stub.
+TOOL_RESULT_STUB_CHARS = 80
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Cheaply estimates the number of tokens in a string (roughly four characters per token).
+    This avoids loading a tokenizer on the routing hot path.
+
+    Args:
+        text (str): The text to measure.
+
+    Returns:
+        int: The estimated token count.
+    """
+    return len(text) // 4 + 1
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    Truncates a string so that its estimated token count stays within 'max_tokens'.
+
+    Args:
+        text (str): The text to truncate.
+        max_tokens (int): The maximum number of estimated tokens to keep.
+
+    Returns:
+        str: The original text, or its prefix followed by an omission marker.
+    """
+    max_chars = max(0, max_tokens * 4)
+    if len(text) <= max_chars:
+        return text
+    return f"{text[:max_chars]}... [{len(text) - max_chars} chars omitted]"
+
+
+def format_message(msg: BaseMessage) -> Optional[str]:
+    """
+    Formats a single message into the line used for it in the supervisor's chat history.
+
+    Args:
+        msg (BaseMessage): The message to format.
+
+    Returns:
+        Optional[str]: The formatted line, or None for message types that are not shown.
+    """
+    if isinstance(msg, HumanMessage):
+        return f"Human: {msg.content}"
+    elif isinstance(msg, AIMessage):
+        # Include both the AI's direct content and any tool calls it made
+        tool_calls_str = ""
+        if hasattr(msg, 'tool_calls') and msg.tool_calls:
+            # Summarize tool calls for brevity in history
+            tool_calls_str = f" (Called Tool(s): {', '.join([tc['name'] for tc in msg.tool_calls])})"
+        content = msg.content if msg.content else ""
+        return f"AI: {content}{tool_calls_str}"
+    elif isinstance(msg, ToolMessage):
+        # Link tool results back to their calls using tool_call_id for clarity
+        return f"Tool Result (ID: {msg.tool_call_id}): {msg.content}"
+    elif isinstance(msg, SystemMessage):
+        # The summary that replaces the older turns of a compacted session
+        return f"System: {msg.content}"
+    # Add handling for other message types if they are introduced later
+    return None
+
+
+def format_tool_stub(msg: ToolMessage) -> str:
+    """
+    Formats a compressed stand-in for an old tool result (e.g., a full news dump),
+    keeping only a short prefix of its payload.
+
+    Args:
+        msg (ToolMessage): The tool message to compress.
+
+    Returns:
+        str: The stub line used in place of the full tool result.
+    """
+    content = str(msg.content)
+    if len(content) <= TOOL_RESULT_STUB_CHARS:
+        return f"Tool Result (ID: {msg.tool_call_id}): {content}"
+    return (f"Tool Result (ID: {msg.tool_call_id}): {content[:TOOL_RESULT_STUB_CHARS]}... "
+            f"[{len(content) - TOOL_RESULT_STUB_CHARS} chars omitted]")
+
+
 def format_chat_history(messages: List[AIMessage]) -> str:
     """
     Formats the list of BaseMessage objects into a readable string for the supervisor prompt.
@@ -47,19 +160,126 @@ def format_chat_history(messages: List[AIMessage]) -> str:
     """
     formatted_history = []
     for msg in messages:
-        if isinstance(msg, HumanMessage):
-            formatted_history.append(f"Human: {msg.content}")
-        elif isinstance(msg, AIMessage):
-            # Include both the AI's direct content and any tool calls it made
-            tool_calls_str = ""
-            if hasattr(msg, 'tool_calls') and msg.tool_calls:
-                # Summarize tool calls for brevity in history
-                tool_calls_str = f" (Called Tool(s): {', '.join([tc['name'] for tc in msg.tool_calls])})"
-            content = msg.content if msg.content else ""
-            formatted_history.append(f"AI: {content}{tool_calls_str}")
-        elif isinstance(msg, ToolMessage):
-            # Link tool results back to their calls using tool_call_id for clarity
-            formatted_history.append(f"Tool Result (ID: {msg.tool_call_id}): {msg.content}")
-        # Add handling for other message types if they are introduced later
+        line = format_message(msg)
+        if line is not None:
+            formatted_history.append(line)
     return "\n".join(formatted_history)
 
+
+@dataclass
+class _RenderedHistory:
+    """Per-thread cache of the already rendered history lines."""
+    message_ids: List[str] = field(default_factory=list)
+    lines: List[Optional[str]] = field(default_factory=list)
+    stubs: List[Optional[str]] = field(default_factory=list)
+    tokens: List[int] = field(default_factory=list)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+class IncrementalHistoryFormatter:
+    """
+    Formats the supervisor's chat history incrementally.
+
+    Every message is rendered exactly once per thread and cached, so each supervisor turn only
+    renders the messages appended since the previous turn. The prompt is then assembled from a
+    rolling window that walks backwards from the newest message until the token budget is spent:
+    recent messages are shown in full, older ToolMessages are replaced by short stubs, and anything
+    beyond the budget is dropped. Prompt size and assembly time therefore stay flat as the
+    conversation grows.
+    """
+
+    def __init__(self, max_threads: int = 1024):
+        """
+        Args:
+            max_threads (int): Maximum number of thread caches kept before the least recently
+                               used one is evicted.
+        """
+        self.max_threads = max_threads
+        self._threads: "OrderedDict[str, _RenderedHistory]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _cache_for(self, key: str) -> _RenderedHistory:
+        with self._lock:
+            cache = self._threads.get(key)
+            if cache is None:
+                cache = self._threads[key] = _RenderedHistory()
+                if len(self._threads) > self.max_threads:
+                    self._threads.popitem(last=False)
+            else:
+                self._threads.move_to_end(key)
+            return cache
+
+    def clear(self, key: Optional[str] = None) -> None:
+        """Drops the cached rendering for one thread, or for all threads if no key is given."""
+        with self._lock:
+            if key is None:
+                self._threads.clear()
+            else:
+                self._threads.pop(key, None)
+
+    def format(self, key: str, messages: List[BaseMessage], stop: Optional[int] = None,
+               token_budget: int = SUPERVISOR_HISTORY_TOKEN_BUDGET,
+               recent_window: int = SUPERVISOR_RECENT_WINDOW) -> str:
+        """
+        Renders messages[:stop] as chat history within the given token budget.
+
+        Args:
+            key (str): Cache key identifying the conversation (typically the thread ID).
+            messages (List[BaseMessage]): The conversation messages from the AgentState.
+            stop (Optional[int]): Render only messages before this index (defaults to all).
+            token_budget (int): Maximum estimated tokens of the rendered history.
+            recent_window (int): Number of newest messages that are never compressed into stubs.
+
+        Returns:
+            str: The formatted chat history.
+        """
+        stop = len(messages) if stop is None else stop
+        cache = self._cache_for(key)
+
+        with cache.lock:
+            cached = len(cache.message_ids)
+            # The cache is only valid if it is a prefix of the current history. Checking the first
+            # and last cached IDs detects both a different conversation and a compacted history.
+            # Messages without IDs (e.g., built outside the graph) cannot be matched and are re-rendered.
+            if cached and (cached > stop
+                           or cache.message_ids[-1] is None
+                           or messages[0].id != cache.message_ids[0]
+                           or messages[cached - 1].id != cache.message_ids[-1]):
+                cache.message_ids.clear(); cache.lines.clear(); cache.stubs.clear(); cache.tokens.clear()
+                cached = 0
+
+            # Render only the messages appended since the previous call.
+            for msg in messages[cached:stop]:
+                line = format_message(msg)
+                cache.message_ids.append(msg.id)
+                cache.lines.append(line)
+                cache.stubs.append(format_tool_stub(msg) if isinstance(msg, ToolMessage) else None)
+                cache.tokens.append(estimate_tokens(line) if line is not None else 0)
+
+            # Assemble the rolling window from the newest message backwards.
+            window = []
+            used = 0
+            index = stop - 1
+            while index >= 0:
+                line = cache.lines[index]
+                if line is not None:
+                    tokens = cache.tokens[index]
+                    is_recent = stop - index <= recent_window
+                    if cache.stubs[index] is not None and (not is_recent or used + tokens > token_budget):
+                        # Compress old (or oversized) tool payloads into a short stub.
+                        line = cache.stubs[index]
+                        tokens = estimate_tokens(line)
+                    if used + tokens > token_budget:
+                        break
+                    window.append(line)
+                    used += tokens
+                index -= 1
+
+        if index >= 0:
+            window.append(f"[{index + 1} earlier message(s) omitted]")
+        window.reverse()
+        return "\n".join(window)
+
+
+# Shared formatter instance used by the supervisor node.
+history_formatter = IncrementalHistoryFormatter()
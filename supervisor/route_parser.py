@@ -0,0 +1,96 @@
+from langchain_core.messages import BaseMessage
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+import re
+
+from supervisor.prompts import ROUTE_LABELS
+from supervisor.router import KeywordClassifier, arithmetic_rule, final_answer_rule, stock_news_rule
+
+# --- Route Output Parsing ---
+# The supervisor LLM answers with a single-digit label (see ROUTE_LABELS). Its raw output is never
+# used as a node name directly: it is validated here and, if it is not a clean label, repaired
+# locally (no second LLM call), so the graph's conditional edge always receives a valid route.
+# Repairs, in order:
+#   1. a label or node name surrounded by quotes, punctuation or whitespace;
+#   2. the first label or node name (or a short form such as 'calculator') mentioned in the text;
+#   3. the deterministic routing rules and the keyword classifier, at any confidence;
+#   4. DEFAULT_ROUTE.
+
+# Route used when nothing else applies; the text processing agent is the general-purpose agent.
+DEFAULT_ROUTE = "text_processing_agent"
+
+_VALID_ROUTES = set(ROUTE_LABELS.values())
+# Characters stripped around an otherwise valid answer, e.g. "'3'", "3.", "`calculator_agent`".
+_WRAPPING = " \t\r\n'\"`.,;:!?*()[]{}<>"
+
+
+def _aliases() -> Dict[str, str]:
+    # Lowercase spellings of every route: its label, its node name and the name without '_agent'
+    # (with underscores or spaces).
+    aliases = {}
+    for label, route in ROUTE_LABELS.items():
+        aliases[label] = route
+        aliases[route.lower()] = route
+        short = route.lower().replace("_agent", "")
+        aliases[short] = route
+        aliases[short.replace("_", " ")] = route
+    return aliases
+
+
+_ALIASES = _aliases()
+# Longest spellings first, so 'stock_news_agent' wins over 'stock news'. Labels only match as
+# stand-alone digits, so the '1' in '15' is not read as a label.
+_MENTION_PATTERN = re.compile("|".join(
+    rf"(?<![\w]){re.escape(alias)}(?![\w])" for alias in sorted(_ALIASES, key=len, reverse=True)))
+
+
+@dataclass
+class RouteParse:
+    """A validated routing decision parsed from the supervisor LLM's output."""
+    route: str
+    """Name of the next node, or 'END'. Always a valid route."""
+    repaired: bool
+    """Whether the raw output was not a clean label or node name and had to be repaired."""
+    source: str
+    """How the route was obtained: 'label', 'name', 'mention', 'rules' or 'default'."""
+
+
+def _fallback_route(messages: List[BaseMessage]) -> Optional[str]:
+    # The fast-path stages, without their confidence threshold: a best guess beats a failed run.
+    for stage in (final_answer_rule, arithmetic_rule, stock_news_rule, KeywordClassifier()):
+        decision = stage(messages)
+        if decision is not None:
+            return decision.route
+    return None
+
+
+def parse_route(output: str, messages: Optional[List[BaseMessage]] = None) -> RouteParse:
+    """
+    Turns the supervisor LLM's raw output into a valid route.
+
+    Args:
+        output (str): The raw text generated by the supervisor LLM.
+        messages (Optional[List[BaseMessage]]): The conversation, used to pick a route locally
+                                                when the output names none.
+
+    Returns:
+        RouteParse: The route and how it was obtained.
+    """
+    text = str(output).strip()
+    if text in ROUTE_LABELS:
+        return RouteParse(ROUTE_LABELS[text], False, "label")
+    if text in _VALID_ROUTES:
+        return RouteParse(text, False, "name")
+
+    cleaned = text.strip(_WRAPPING).lower()
+    if cleaned in _ALIASES:
+        return RouteParse(_ALIASES[cleaned], True, "label" if cleaned in ROUTE_LABELS else "name")
+
+    match = _MENTION_PATTERN.search(text.lower())
+    if match:
+        return RouteParse(_ALIASES[match.group(0)], True, "mention")
+
+    route = _fallback_route(messages or [])
+    if route is not None:
+        return RouteParse(route, True, "rules")
+    return RouteParse(DEFAULT_ROUTE, True, "default")
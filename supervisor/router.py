@@ -0,0 +1,252 @@
+from langchain_core.messages import BaseMessage, HumanMessage, AIMessage
+from typing import Callable, Dict, List, Optional
+from dataclasses import dataclass, field
+import re
+import threading
+
+# --- Deterministic Fast-Path Router ---
+# Obvious routing decisions (plain arithmetic, "news for TICKER", a finished answer) do not need
+# a supervisor LLM round trip. The fast-path router runs a chain of cheap rules, and optionally a
+# lightweight local classifier, in front of the supervisor LLM. Only when no stage is confident
+# enough does the supervisor fall back to the LLM.
+
+@dataclass
+class RouteDecision:
+    """A routing decision produced without the supervisor LLM."""
+    route: str
+    """Name of the next node, or 'END'."""
+    confidence: float
+    """Confidence in the decision, between 0 and 1."""
+    source: str
+    """Name of the rule or classifier that produced the decision."""
+
+
+# A rule inspects the conversation and returns a decision, or None if it does not apply.
+RoutingRule = Callable[[List[BaseMessage]], Optional[RouteDecision]]
+
+
+def final_answer_rule(messages: List[BaseMessage]) -> Optional[RouteDecision]:
+    """
+    Routes to 'END' when the last message is a final AI answer: an AIMessage with content
+    and no pending tool calls.
+    """
+    last = messages[-1] if messages else None
+    if isinstance(last, AIMessage) and not getattr(last, 'tool_calls', None) and str(last.content).strip():
+        return RouteDecision("END", 1.0, "final_answer_rule")
+    return None
+
+
+# An arithmetic request: numbers, operators and parentheses, optionally wrapped in a short question.
+_ARITHMETIC_PATTERN = re.compile(
+    r"^\s*(?:(?:what\s+is|what's|calculate|compute|evaluate)\s+)?"
+    r"(?=[^a-z]*\d[^a-z]*[-+*/^%x×÷][^a-z]*\d)"
+    r"[\d\s.,()+\-*/^%x×÷]+\s*[?=.!]?\s*$",
+    re.IGNORECASE,
+)
+# Verbal arithmetic such as "15 plus 27" or "what is 6 times 7".
+_VERBAL_ARITHMETIC_PATTERN = re.compile(
+    r"^\s*(?:(?:what\s+is|what's|calculate|compute)\s+)?-?\d+(?:\.\d+)?\s+"
+    r"(?:plus|minus|times|multiplied\s+by|divided\s+by|over)\s+-?\d+(?:\.\d+)?\s*\??\s*$",
+    re.IGNORECASE,
+)
+
+
+# Digit groups shaped like dates or phone numbers ("2024-01-15", "12/25/2024", "555-1234",
+# "(555) 123-4567") also match the arithmetic pattern. They are left to the supervisor LLM.
+_DATE_OR_PHONE_PATTERN = re.compile(
+    r"(?<![\d.])(?:\d{4}-\d{1,2}-\d{1,2}|\d{1,2}([/.-])\d{1,2}\1\d{2,4}"
+    r"|\(\d{3}\)\s*\d{3}-\d{4}|\d{3}-\d{3}-\d{4}|\d{3}-\d{4})(?![\d.])"
+)
+
+
+def arithmetic_rule(messages: List[BaseMessage]) -> Optional[RouteDecision]:
+    """
+    Routes a fresh user request that is a plain arithmetic expression to 'calculator_agent'.
+    Requests shaped like a date or phone number are not routed.
+    """
+    last = messages[-1] if messages else None
+    if isinstance(last, HumanMessage):
+        text = str(last.content)
+        if _DATE_OR_PHONE_PATTERN.search(text):
+            return None
+        if _ARITHMETIC_PATTERN.match(text) or _VERBAL_ARITHMETIC_PATTERN.match(text):
+            return RouteDecision("calculator_agent", 0.97, "arithmetic_rule")
+    return None
+
+
+# Uppercase tokens of 1-5 letters (optionally with a class suffix such as BRK.B) are treated as tickers.
+_TICKER_PATTERN = re.compile(r"(?<![\w$])\$?([A-Z]{1,5}(?:\.[A-Z])?)(?![\w])")
+# Uppercase words that commonly appear in requests but are not tickers.
+_NON_TICKERS = {"I", "A", "AN", "THE", "AND", "OR", "FOR", "OF", "ON", "IN", "TO", "ME", "MY",
+                "IS", "IT", "US", "AI", "CEO", "CFO", "IPO", "ETF", "USA", "UK", "EU", "PM", "AM",
+                "NEWS", "OK", "FAQ", "API"}
+_NEWS_PATTERN = re.compile(r"\b(news|headlines?|sentiment)\b", re.IGNORECASE)
+
+
+def extract_tickers(text: str) -> List[str]:
+    """
+    Extracts candidate stock tickers (uppercase tokens) from a piece of text.
+
+    Args:
+        text (str): The text to scan.
+
+    Returns:
+        List[str]: The unique tickers in order of appearance.
+    """
+    tickers = []
+    for match in _TICKER_PATTERN.finditer(text):
+        ticker = match.group(1)
+        if ticker not in _NON_TICKERS and ticker not in tickers:
+            tickers.append(ticker)
+    return tickers
+
+
+def stock_news_rule(messages: List[BaseMessage]) -> Optional[RouteDecision]:
+    """Routes a fresh user request mentioning an uppercase ticker and news to 'stock_news_agent'."""
+    last = messages[-1] if messages else None
+    if isinstance(last, HumanMessage):
+        text = str(last.content)
+        if _NEWS_PATTERN.search(text) and extract_tickers(text):
+            return RouteDecision("stock_news_agent", 0.95, "stock_news_rule")
+    return None
+
+
+class KeywordClassifier:
+    """
+    A lightweight local classifier for fresh user requests.
+
+    Each route has a set of weighted keywords; the request is scored against every route and
+    the confidence is the winning route's share of the total score. This is deliberately simple
+    (no model files, microsecond runtime) and can be replaced by any callable with the same
+    signature as a routing rule.
+    """
+
+    DEFAULT_KEYWORDS: Dict[str, Dict[str, float]] = {
+        "calculator_agent": {"calculate": 2.0, "sum": 1.0, "plus": 1.5, "minus": 1.5, "times": 1.0,
+                             "multiply": 2.0, "divide": 2.0, "divided": 2.0, "average": 1.0,
+                             "percent": 1.0, "square": 1.0, "root": 1.0},
+        "stock_news_agent": {"news": 2.0, "stock": 1.5, "ticker": 2.0, "headlines": 2.0,
+                             "sentiment": 1.5, "shares": 1.0, "market": 1.0, "earnings": 1.0},
+        "data_analysis_agent": {"data": 1.0, "dataset": 2.0, "csv": 2.0, "parquet": 2.0,
+                                "analyze": 1.5, "analysis": 1.5, "column": 1.5, "statistics": 1.5,
+                                "groupby": 2.0, "aggregate": 1.5},
+        "text_processing_agent": {"summarize": 2.0, "summary": 1.5, "rewrite": 2.0, "translate": 2.0,
+                                  "words": 1.0, "text": 1.0, "paragraph": 1.5, "extract": 1.0},
+    }
+
+    _WORD_PATTERN = re.compile(r"[a-z]+")
+
+    def __init__(self, keywords: Optional[Dict[str, Dict[str, float]]] = None, min_score: float = 3.0):
+        """
+        Args:
+            keywords (Optional[Dict[str, Dict[str, float]]]): Keyword weights per route.
+            min_score (float): Score the winning route needs before its share is taken at full confidence,
+                               so a single weak keyword never produces a confident decision.
+        """
+        self.keywords = keywords or self.DEFAULT_KEYWORDS
+        self.min_score = min_score
+
+    def __call__(self, messages: List[BaseMessage]) -> Optional[RouteDecision]:
+        last = messages[-1] if messages else None
+        if not isinstance(last, HumanMessage):
+            return None
+        words = self._WORD_PATTERN.findall(str(last.content).lower())
+        scores = {route: sum(weights.get(word, 0.0) for word in words) for route, weights in self.keywords.items()}
+        total = sum(scores.values())
+        if total <= 0:
+            return None
+        route, best = max(scores.items(), key=lambda item: item[1])
+        return RouteDecision(route, (best / total) * min(1.0, best / self.min_score), "keyword_classifier")
+
+
+@dataclass
+class RouterStats:
+    """Hit-rate counters for the fast-path router."""
+    decisions: int = 0
+    fast_path_hits: int = 0
+    llm_fallbacks: int = 0
+    hits_by_source: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of routing decisions made without the supervisor LLM."""
+        return self.fast_path_hits / self.decisions if self.decisions else 0.0
+
+    def as_dict(self) -> dict:
+        return {"decisions": self.decisions, "fast_path_hits": self.fast_path_hits,
+                "llm_fallbacks": self.llm_fallbacks, "hit_rate": self.hit_rate,
+                "hits_by_source": dict(self.hits_by_source)}
+
+
+class FastPathRouter:
+    """
+    Pluggable deterministic pre-router that runs in front of the supervisor LLM.
+
+    Rules are evaluated in order, followed by the optional classifier. The first decision whose
+    confidence reaches 'min_confidence' is used; otherwise the caller falls back to the LLM.
+    """
+
+    def __init__(self, rules: Optional[List[RoutingRule]] = None,
+                 classifier: Optional[RoutingRule] = None, min_confidence: float = 0.9):
+        """
+        Args:
+            rules (Optional[List[RoutingRule]]): Ordered routing rules. Defaults to the built-in rules.
+            classifier (Optional[RoutingRule]): Optional local classifier consulted after the rules.
+            min_confidence (float): Minimum confidence required to skip the supervisor LLM.
+        """
+        self.rules = list(rules) if rules is not None else [final_answer_rule, arithmetic_rule, stock_news_rule]
+        self.classifier = classifier
+        self.min_confidence = min_confidence
+        self.stats = RouterStats()
+        self._lock = threading.Lock()
+
+    def add_rule(self, rule: RoutingRule, index: Optional[int] = None) -> RoutingRule:
+        """
+        Registers an additional routing rule. Can also be used as a decorator.
+
+        Args:
+            rule (RoutingRule): The rule to add.
+            index (Optional[int]): Position in the rule chain; appended if omitted.
+
+        Returns:
+            RoutingRule: The rule, unchanged.
+        """
+        self.rules.insert(len(self.rules) if index is None else index, rule)
+        return rule
+
+    def route(self, messages: List[BaseMessage]) -> Optional[RouteDecision]:
+        """
+        Tries to decide the next node without the LLM and records the outcome.
+
+        Args:
+            messages (List[BaseMessage]): The conversation messages from the AgentState.
+
+        Returns:
+            Optional[RouteDecision]: A confident decision, or None to fall back to the LLM.
+        """
+        decision = None
+        stages = self.rules + ([self.classifier] if self.classifier is not None else [])
+        for stage in stages:
+            candidate = stage(messages)
+            if candidate is not None and candidate.confidence >= self.min_confidence:
+                decision = candidate
+                break
+
+        with self._lock:
+            self.stats.decisions += 1
+            if decision is None:
+                self.stats.llm_fallbacks += 1
+            else:
+                self.stats.fast_path_hits += 1
+                self.stats.hits_by_source[decision.source] = self.stats.hits_by_source.get(decision.source, 0) + 1
+        return decision
+
+    def reset_stats(self) -> None:
+        """Resets the hit-rate counters."""
+        with self._lock:
+            self.stats = RouterStats()
+
+
+# Shared router instance used by the supervisor node.
+# Enable the local classifier with: fast_path_router.classifier = KeywordClassifier()
+fast_path_router = FastPathRouter()
@@ -0,0 +1,268 @@
+from langchain_core.messages import AIMessage, BaseMessage
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import asyncio
+import contextvars
+import importlib
+import logging
+import os
+import threading
+
+from supervisor.router import KeywordClassifier, RoutingRule
+
+logger = logging.getLogger(__name__)
+
+# --- Speculative Agent Execution ---
+# When the supervisor has to ask its LLM for a route, the worker's first LLM call usually depends
+# on nothing but the route: it is the agent LLM invoked on the same conversation. In speculative
+# mode the likely route is predicted locally (keyword classifier, microseconds) and that agent's
+# first LLM call is started while the supervisor LLM is still deciding:
+#   - prediction confirmed: the speculative call is committed and handed to the agent node, which
+#     uses its result instead of calling the LLM again, so the turn costs about one LLM latency;
+#   - prediction wrong: the call is cancelled (async) or its result discarded (sync). It never
+#     touches the graph state; only the LLM response cache may have learned an extra entry.
+#     Bookkeeping a first step registers with 'defer_until_used' (e.g., the context token counts)
+#     is applied only when an agent node uses the result, so discarded calls are not counted.
+# Only agents whose first step is such a side-effect-free LLM call are registered (see SPECULATIVE_AGENTS).
+# The mode is opt-in: set SUPERVISOR_SPECULATION=1, or pass config={"configurable": {"speculative": True}}.
+
+SPECULATION_ENABLED = os.environ.get("SUPERVISOR_SPECULATION", "0") == "1"
+
+# Agent -> (module, synchronous first step, async first step). A first step takes the agent's state
+# and returns the agent LLM's response; it must not modify the state or call tools.
+SPECULATIVE_AGENTS: Dict[str, Tuple[str, str, str]] = {
+    "calculator_agent": ("agents.calculator_agent", "call_llm", "acall_llm"),
+    "data_analysis_agent": ("agents.data_analysis_agent", "call_llm", "acall_llm"),
+    "stock_news_agent": ("agents.stock_news_agent", "call_llm", "acall_llm"),
+}
+
+
+# Effects deferred by the speculative first step running in the current context (None outside one).
+_deferred: contextvars.ContextVar[Optional[List[Callable[[], None]]]] = contextvars.ContextVar(
+    "speculation_deferred", default=None)
+
+
+def defer_until_used(effect: Callable[[], None]) -> None:
+    """
+    Runs 'effect' now or, inside a speculative first step, once an agent node uses its result.
+    """
+    deferred = _deferred.get()
+    if deferred is None:
+        effect()
+    else:
+        deferred.append(effect)
+
+
+def _speculate(step: Callable, state: dict) -> Tuple[AIMessage, List[Callable[[], None]]]:
+    # Runs a first step, collecting the effects it defers; they are returned with its response.
+    effects: List[Callable[[], None]] = []
+    _deferred.set(effects)
+    return step(state), effects
+
+
+async def _aspeculate(step: Callable, state: dict) -> Tuple[AIMessage, List[Callable[[], None]]]:
+    effects: List[Callable[[], None]] = []
+    _deferred.set(effects)
+    return await step(state), effects
+
+
+@lru_cache(maxsize=None)
+def _resolve(module_name: str, func_name: str) -> Callable:
+    return getattr(importlib.import_module(module_name), func_name)
+
+
+def _conversation_key(agent: str, messages: List[BaseMessage]) -> Tuple[str, int, str]:
+    # The supervisor does not add messages, so the agent node sees the same conversation as the
+    # supervisor did: the same length and the same last message (IDs are set by the reducer).
+    last = messages[-1] if messages else None
+    return agent, len(messages), str(getattr(last, "id", None) or id(last))
+
+
+@dataclass
+class Speculation:
+    """A speculative first step started for a predicted route."""
+    agent: str
+    key: Tuple[str, int, str]
+    handle: Any
+    """The running call: a concurrent.futures.Future (sync) or an asyncio.Task (async)."""
+
+
+@dataclass
+class SpeculationStats:
+    """Counters describing how speculative calls turned out."""
+    started: int = 0
+    hits: int = 0
+    """Predictions confirmed by the supervisor."""
+    misses: int = 0
+    """Predictions the supervisor overruled; their calls were cancelled or discarded."""
+    used: int = 0
+    """Committed results actually consumed by an agent node."""
+    failed: int = 0
+    """Committed calls that raised; the agent then called the LLM itself."""
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / (self.hits + self.misses) if self.hits + self.misses else 0.0
+
+    def as_dict(self) -> dict:
+        return {**self.__dict__, "hit_rate": self.hit_rate}
+
+
+class SpeculativeExecutor:
+    """
+    Starts a predicted agent's first LLM call alongside the supervisor LLM and hands the result
+    to the agent node if the supervisor confirms the route.
+    """
+
+    def __init__(self, predictor: Optional[RoutingRule] = None, min_confidence: float = 0.3,
+                 max_workers: int = 8, max_pending: int = 256):
+        """
+        Args:
+            predictor (Optional[RoutingRule]): Predicts the route; defaults to the keyword classifier.
+            min_confidence (float): Minimum prediction confidence to start a speculative call.
+            max_workers (int): Threads running synchronous speculative calls.
+            max_pending (int): Maximum number of committed results waiting for their agent node
+                               (e.g., when the step budget ends a run first); the oldest are dropped.
+        """
+        self.predictor = predictor or KeywordClassifier()
+        self.min_confidence = min_confidence
+        self.max_pending = max_pending
+        self.stats = SpeculationStats()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="speculation")
+        self._pending: "OrderedDict[Tuple[str, int, str], Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def predict(self, messages: List[BaseMessage]) -> Optional[str]:
+        """Returns the predicted agent if it is speculable and confident enough, else None."""
+        decision = self.predictor(messages)
+        if decision is None or decision.route not in SPECULATIVE_AGENTS or decision.confidence < self.min_confidence:
+            return None
+        return decision.route
+
+    # --- Supervisor side ---
+
+    def start(self, state: dict) -> Optional[Speculation]:
+        """
+        Starts the predicted agent's first step on a worker thread (synchronous graph runs).
+
+        Returns:
+            Optional[Speculation]: The running speculation, or None if nothing is predicted.
+        """
+        agent = self.predict(state['messages'])
+        if agent is None:
+            return None
+        module_name, func_name, _ = SPECULATIVE_AGENTS[agent]
+        # The current context is copied so the call's LLM span is recorded under the supervisor's span.
+        context = contextvars.copy_context()
+        future = self._pool.submit(context.run, _speculate, _resolve(module_name, func_name), state)
+        return self._started(agent, state, future)
+
+    def astart(self, state: dict) -> Optional[Speculation]:
+        """
+        Starts the predicted agent's async first step as a task on the running event loop.
+
+        Returns:
+            Optional[Speculation]: The running speculation, or None if nothing is predicted.
+        """
+        agent = self.predict(state['messages'])
+        if agent is None:
+            return None
+        module_name, _, afunc_name = SPECULATIVE_AGENTS[agent]
+        # The task runs in a copy of the current context, so its deferred effects stay its own.
+        task = asyncio.ensure_future(_aspeculate(_resolve(module_name, afunc_name), state))
+        return self._started(agent, state, task)
+
+    def _started(self, agent: str, state: dict, handle: Any) -> Speculation:
+        logger.info("---Speculatively starting %s---", agent)
+        with self._lock:
+            self.stats.started += 1
+        return Speculation(agent, _conversation_key(agent, state['messages']), handle)
+
+    def resolve(self, speculation: Optional[Speculation], route: Optional[str]) -> None:
+        """
+        Commits the speculation if the supervisor chose its agent, otherwise cancels it.
+
+        Args:
+            speculation (Optional[Speculation]): The speculation returned by 'start'/'astart'.
+            route (Optional[str]): The supervisor's route, or None if the supervisor failed.
+        """
+        if speculation is None:
+            return
+        if route == speculation.agent:
+            with self._lock:
+                self.stats.hits += 1
+                self._pending[speculation.key] = speculation.handle
+                while len(self._pending) > self.max_pending:
+                    _, stale = self._pending.popitem(last=False)
+                    self._cancel(stale)
+            return
+        logger.info("---Speculation for %s discarded (route: %s)---", speculation.agent, route)
+        with self._lock:
+            self.stats.misses += 1
+        self._cancel(speculation.handle)
+
+    @staticmethod
+    def _cancel(handle: Any) -> None:
+        # A running thread cannot be interrupted; its result is simply never read.
+        handle.cancel()
+        if isinstance(handle, asyncio.Future):
+            # Retrieve the outcome once done, so a failure is not reported as never retrieved.
+            handle.add_done_callback(lambda task: task.cancelled() or task.exception())
+
+    # --- Agent side ---
+
+    def _pop(self, agent: str, state: dict) -> Any:
+        with self._lock:
+            return self._pending.pop(_conversation_key(agent, state['messages']), None)
+
+    def _used(self, result: Tuple[AIMessage, List[Callable[[], None]]]) -> AIMessage:
+        response, effects = result
+        for effect in effects:
+            effect()
+        with self._lock:
+            self.stats.used += 1
+        return response
+
+    def _failed(self, agent: str, error: BaseException) -> None:
+        logger.warning("---Speculative call for %s failed (%s); calling the LLM again---", agent, error)
+        with self._lock:
+            self.stats.failed += 1
+
+    def take(self, agent: str, state: dict) -> Optional[AIMessage]:
+        """
+        Returns the committed speculative response for this agent and conversation, waiting for
+        it if it is still running, or None if there is none (or it failed).
+        """
+        handle = self._pop(agent, state)
+        if handle is None:
+            return None
+        try:
+            result = handle.result()
+        except Exception as e:
+            self._failed(agent, e)
+            return None
+        return self._used(result)
+
+    async def atake(self, agent: str, state: dict) -> Optional[AIMessage]:
+        """Async variant of 'take'."""
+        handle = self._pop(agent, state)
+        if handle is None:
+            return None
+        try:
+            result = await (handle if isinstance(handle, asyncio.Future) else asyncio.wrap_future(handle))
+        except Exception as e:
+            self._failed(agent, e)
+            return None
+        return self._used(result)
+
+
+def speculation_enabled(configurable: dict) -> bool:
+    """Whether speculative mode is on for a run ('configurable.speculative', else SUPERVISOR_SPECULATION)."""
+    return bool(configurable.get("speculative", SPECULATION_ENABLED))
+
+
+# Shared executor used by the supervisor node and the speculable agents.
+speculative_executor = SpeculativeExecutor()
@@ -1,45 +1,161 @@
 from langchain_core.messages import HumanMessage, AIMessage, ToolMessage
+from langchain_core.runnables import RunnableConfig
+from typing import Optional
+import logging
 from state import AgentState # Import the shared state definition
-from llms.ollama_llms import llm_supervisor # Import the supervisor-specific LLM
-from supervisor.prompts import SUPERVISOR_PROMPT, format_chat_history # Import prompt and formatter
+from llms import ollama_llms # LLMs are built on first use; access them as 'ollama_llms.llm_supervisor'
+from supervisor.prompts import ( # Import prompt, budgets and the cached incremental formatter
+    SUPERVISOR_PROMPT,
+    SUPERVISOR_HISTORY_TOKEN_BUDGET,
+    SUPERVISOR_LATEST_MESSAGE_TOKEN_BUDGET,
+    history_formatter,
+    truncate_to_tokens,
+)
+from supervisor.router import fast_path_router # Deterministic pre-router tried before the LLM
+from supervisor.route_parser import parse_route # Validates and repairs the LLM's route label
+from supervisor.speculation import speculative_executor, speculation_enabled # Predicted agent runs alongside the LLM
+from observability.tracing import tracer # Records the route decision on the node's span
 
-def supervisor_node(state: AgentState) -> dict:
-    """
-    The supervisor node in the LangGraph.
-    This node is responsible for analyzing the conversation history and the latest user request,
-    then routing the request to the most appropriate worker agent or deciding to end the conversation.
+logger = logging.getLogger(__name__)
 
-    Args:
-        state (AgentState): The current state of the multi-agent system, containing the message history.
+def _fast_path_update(state: AgentState, configurable: dict) -> Optional[dict]:
+    """
+    Tries the deterministic fast-path router; obvious cases need no LLM round trip.
 
     Returns:
-        dict: A dictionary containing the 'next' key, whose value is the name of the next agent node
-              to execute, or 'END' to terminate the graph.
+        Optional[dict]: The supervisor's state update, or None if the LLM has to decide.
+    """
+    if not configurable.get("fast_path", True):
+        return None
+    decision = fast_path_router.route(state['messages'])
+    if decision is None:
+        return None
+    logger.info("---Supervisor fast-path (%s) decided next action: %s---", decision.source, decision.route)
+    tracer.annotate(route_source=f"fast_path:{decision.source}", confidence=decision.confidence)
+    return {"next": decision.route, "handoff": None, "steps": state.get('steps', 0) + 1}
+
+def _build_prompt(state: AgentState, configurable: dict) -> str:
+    """
+    Builds the supervisor prompt from the (cached, token-bounded) conversation history.
     """
-    print("---Executing Supervisor Node---")
     messages = state['messages']
 
-    # Extract the latest message (user's most recent input)
+    # Extract the latest message (user's most recent input), bounded so a large tool dump
+    # arriving as the latest message cannot blow up the prompt.
     latest_message = messages[-1].content if messages else ""
-    # Extract the conversation history (all messages except the latest one)
-    chat_history = messages[:-1]
+    latest_message = truncate_to_tokens(str(latest_message), SUPERVISOR_LATEST_MESSAGE_TOKEN_BUDGET)
 
-    # Format the extracted chat history into a string for inclusion in the prompt
-    formatted_history_str = format_chat_history(chat_history)
+    # Format the conversation history (all messages except the latest one).
+    # The formatter caches rendered lines per thread, so only newly appended messages are rendered,
+    # and it keeps the result within the token budget using a rolling window.
+    # Without a thread ID, the first message's ID identifies the conversation.
+    cache_key = configurable.get("thread_id") or (messages[0].id if messages else None) or ""
+    formatted_history_str = history_formatter.format(
+        str(cache_key),
+        messages,
+        stop=max(len(messages) - 1, 0),
+        token_budget=configurable.get("supervisor_token_budget", SUPERVISOR_HISTORY_TOKEN_BUDGET),
+    )
 
     # Construct the full prompt for the supervisor LLM
     # The prompt includes detailed instructions, available agents, and the conversation context.
-    prompt = SUPERVISOR_PROMPT.format(
+    return SUPERVISOR_PROMPT.format(
         chat_history=formatted_history_str,
         latest_message=latest_message
     )
 
-    # Invoke the supervisor LLM with the formatted prompt.
-    # The LLM's response will be the name of the next agent or 'END'.
-    response = llm_supervisor.invoke([HumanMessage(content=prompt)])
-    next_action = response.content.strip() # Extract and clean the LLM's decision
+def _llm_update(state: AgentState, response: AIMessage) -> dict:
+    """
+    Turns the supervisor LLM's response into the supervisor's state update.
+    """
+    # The LLM answers with a route label; anything else (quotes, reasoning, an unknown name) is
+    # repaired locally, so the conditional edge always receives a valid node name.
+    parsed = parse_route(response.content, state['messages'])
+    next_action = parsed.route
 
-    print(f"---Supervisor decided next action: {next_action}---")
+    if parsed.repaired:
+        logger.warning("---Supervisor output %r repaired to %s (%s)---", response.content, next_action, parsed.source)
+    logger.info("---Supervisor decided next action: %s---", next_action)
+    tracer.annotate(route_source="llm", route_repaired=parsed.repaired)
 
     # Return the chosen next action, which LangGraph's conditional edge will use for routing.
-    return {"next": next_action}
\ No newline at end of file
+    # Any handoff left by a previous agent is cleared, since the supervisor has taken control.
+    return {"next": next_action, "handoff": None, "steps": state.get('steps', 0) + 1}
+
+def _resolve_speculation(speculation, route: Optional[str]) -> None:
+    # Commits the speculative call if the supervisor chose its agent, otherwise discards it.
+    if speculation is not None:
+        speculative_executor.resolve(speculation, route)
+        tracer.annotate(speculation="hit" if route == speculation.agent else "miss")
+
+def supervisor_node(state: AgentState, config: RunnableConfig = None) -> dict:
+    """
+    The supervisor node in the LangGraph.
+    This node is responsible for analyzing the conversation history and the latest user request,
+    then routing the request to the most appropriate worker agent or deciding to end the conversation.
+
+    Args:
+        state (AgentState): The current state of the multi-agent system, containing the message history.
+        config (RunnableConfig): The run configuration. 'configurable.thread_id' selects the cached
+                                 history rendering, 'configurable.supervisor_token_budget'
+                                 overrides the history token budget, 'configurable.fast_path'
+                                 set to False disables the deterministic pre-router and
+                                 'configurable.speculative' set to True starts the predicted
+                                 agent alongside the supervisor LLM (see supervisor/speculation.py).
+
+    Returns:
+        dict: A dictionary containing the 'next' key, whose value is the name of the next agent node
+              to execute, or 'END' to terminate the graph, along with the cleared 'handoff' and
+              the incremented 'steps' counter.
+    """
+    logger.info("---Executing Supervisor Node---")
+    configurable = (config or {}).get("configurable", {})
+
+    update = _fast_path_update(state, configurable)
+    if update is not None:
+        return update
+
+    # In speculative mode, the predicted agent's first LLM call starts before the supervisor LLM
+    # is asked and is committed or discarded once the route is known.
+    speculation = speculative_executor.start(state) if speculation_enabled(configurable) else None
+    route = None
+    try:
+        # Invoke the supervisor LLM with the formatted prompt.
+        # The LLM's response will be the label of the next agent or 'END'.
+        prompt = _build_prompt(state, configurable)
+        response = ollama_llms.llm_supervisor.invoke([HumanMessage(content=prompt)])
+        update = _llm_update(state, response)
+        route = update["next"]
+        return update
+    finally:
+        _resolve_speculation(speculation, route)
+
+async def asupervisor_node(state: AgentState, config: RunnableConfig = None) -> dict:
+    """
+    Async variant of 'supervisor_node'. The routing LLM call is awaited with 'ainvoke', so many
+    concurrent sessions can share one event loop while waiting on the model.
+
+    Args:
+        state (AgentState): The current state of the multi-agent system, containing the message history.
+        config (RunnableConfig): The run configuration (see 'supervisor_node').
+
+    Returns:
+        dict: The same update as 'supervisor_node'.
+    """
+    logger.info("---Executing Supervisor Node---")
+    configurable = (config or {}).get("configurable", {})
+
+    update = _fast_path_update(state, configurable)
+    if update is not None:
+        return update
+
+    speculation = speculative_executor.astart(state) if speculation_enabled(configurable) else None
+    route = None
+    try:
+        prompt = _build_prompt(state, configurable)
+        response = await ollama_llms.llm_supervisor.ainvoke([HumanMessage(content=prompt)])
+        update = _llm_update(state, response)
+        route = update["next"]
+        return update
+    finally:
+        _resolve_speculation(speculation, route)
@@ -0,0 +1,115 @@
+"""
+Tests for the per-agent context projection and its token accounting.
+
+Run from the repository root:
+    python -m pytest -q tests
+"""
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+
+from agents.context import ContextProjector, estimate_message_tokens, tool_schema_tokens
+
+NEWS_TOOLS = ("get_stock_news",)
+ARTICLES = str([{"title": f"AAPL headline {i}", "summary": "AAPL reports record revenue. " * 5} for i in range(5)])
+
+
+def _news_turn(call_id: str, request: str = "Get the latest news for AAPL") -> list:
+    return [HumanMessage(content=request),
+            AIMessage(content="", tool_calls=[{"name": "get_stock_news", "args": {"ticker": "AAPL"}, "id": call_id}]),
+            ToolMessage(content=ARTICLES, tool_call_id=call_id, name="get_stock_news"),
+            AIMessage(content="Here is the latest news for AAPL:\n- AAPL headline 0")]
+
+
+def test_earlier_own_tool_results_are_collapsed_into_notes():
+    messages = _news_turn("call-1") + _news_turn("call-2")[:3]
+
+    projected = ContextProjector().project(messages, NEWS_TOOLS)
+
+    # The earlier turn's exchange is a short note; the current turn's exchange is kept as it is.
+    tool_messages = [msg for msg in projected if isinstance(msg, ToolMessage)]
+    assert [msg.tool_call_id for msg in tool_messages] == ["call-2"]
+    assert tool_messages[0].content == ARTICLES
+    note = projected[1]
+    assert isinstance(note, AIMessage) and not note.tool_calls
+    assert note.content.startswith("Earlier tool results:\n- get_stock_news(ticker='AAPL') -> ")
+    assert len(note.content) < len(ARTICLES)
+
+
+def _calculation_turn(call_id: str, request: str = "What is 12 plus 30?", answer: str = "The answer is 42.") -> list:
+    return [HumanMessage(content=request),
+            AIMessage(content="", tool_calls=[{"name": "perform_calculation", "args": {"a": 12, "b": 30}, "id": call_id}]),
+            ToolMessage(content="42", tool_call_id=call_id, name="perform_calculation"),
+            AIMessage(content=answer)]
+
+
+def test_other_agents_exchanges_are_notes_in_the_current_turn():
+    messages = _news_turn("call-1")
+
+    projected = ContextProjector().project(messages, ("perform_calculation",))
+
+    assert not any(isinstance(msg, ToolMessage) for msg in projected)
+    assert projected[1].content.startswith("Tool results from another agent:\n- get_stock_news(ticker='AAPL') -> ")
+
+
+def test_unrelated_old_turns_are_dropped_and_recent_turns_kept():
+    chat = [[HumanMessage(content=f"Tell me a joke #{i}"), AIMessage(content=f"Joke #{i}")] for i in range(5)]
+    messages = _calculation_turn("call-1") + [msg for turn in chat for msg in turn] + [HumanMessage(content="And that by 2?")]
+
+    projected = ContextProjector(recent_turns=2).project(messages, ("perform_calculation",))
+    contents = [str(msg.content) for msg in projected]
+
+    # The old calculation turn uses this agent's tools and the last two turns are recent.
+    assert "What is 12 plus 30?" in contents
+    assert [content for content in contents if content.startswith("Tell me a joke")] == ["Tell me a joke #3",
+                                                                                         "Tell me a joke #4"]
+    assert contents[-1] == "And that by 2?"
+
+
+def test_earlier_requests_and_answers_are_truncated():
+    long_answer = "word " * 1_000
+    messages = _calculation_turn("call-1", answer=long_answer) + [HumanMessage(content="And that by 2?")]
+
+    projected = ContextProjector(message_tokens=20).project(messages, ("perform_calculation",))
+
+    answer = next(msg for msg in projected if str(msg.content).startswith("word"))
+    assert len(answer.content) < len(long_answer) / 10
+
+
+def test_unfinished_own_calls_are_not_sent_without_their_results():
+    messages = _calculation_turn("call-1")[:2]
+
+    projected = ContextProjector().project(messages, ("perform_calculation",))
+
+    assert not any(getattr(msg, "tool_calls", None) for msg in projected)
+    assert "(no result)" in projected[1].content
+
+
+def test_compaction_summary_is_always_kept():
+    summary = SystemMessage(content="Summary of earlier turns: the user asked about AAPL.")
+    chat = [[HumanMessage(content=f"Tell me a joke #{i}"), AIMessage(content=f"Joke #{i}")] for i in range(5)]
+    messages = [summary] + [msg for turn in chat for msg in turn]
+
+    projected = ContextProjector(recent_turns=1).project(messages, ())
+
+    assert projected[0] is summary
+
+
+def test_for_agent_records_token_counts():
+    projector = ContextProjector()
+    messages = _news_turn("call-1") + _news_turn("call-2")[:3]
+
+    projected = projector.for_agent("stock_news_agent", messages, NEWS_TOOLS)
+    stats = projector.report()["stock_news_agent"]
+
+    assert stats["calls"] == 1
+    assert 0 < stats["projected_tokens"] < stats["full_tokens"]
+    assert stats["projected_tokens"] >= estimate_message_tokens(projected)
+
+
+def test_disabled_projection_sends_the_full_history_with_own_tool_schemas():
+    projector = ContextProjector(enabled=False)
+    messages = _news_turn("call-1") + _news_turn("call-2")[:3]
+
+    assert projector.for_agent("stock_news_agent", messages, NEWS_TOOLS) is messages
+    stats = projector.report()["stock_news_agent"]
+    assert stats["projected_tokens"] == estimate_message_tokens(messages) + tool_schema_tokens(NEWS_TOOLS)
+    assert stats["full_tokens"] == estimate_message_tokens(messages) + tool_schema_tokens()
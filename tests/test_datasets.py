@@ -0,0 +1,101 @@
+"""
+Tests for the chunked dataset engine, on small CSV files written to a temporary directory.
+
+Run from the repository root:
+    python -m pytest -q tests
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from tools.datasets import AGGREGATIONS, DatasetEngine, DatasetError
+
+CSV = "region,channel,value\nEU,web,1\n,web,2\nUS,shop,3\n,shop,4\nEU,web,5\nUS,web,6\n"
+
+
+@pytest.fixture
+def engine(tmp_path):
+    (tmp_path / "sales.csv").write_text(CSV)
+    return DatasetEngine(root=str(tmp_path), chunk_rows=2)
+
+
+def _groups(result):
+    return {tuple(top["group"]) if isinstance(top["group"], list) else top["group"]: (top["value"], top["count"])
+            for top in result["top"]}
+
+
+def test_missing_key_in_single_column_group_by(engine):
+    result = engine.aggregate("sales.csv", "value", "sum", group_by=["region"])
+
+    assert _groups(result) == {"EU": (6.0, 2), "US": (9.0, 2), None: (6.0, 2)}
+
+
+@pytest.mark.parametrize("chunk_rows", [2, 1_000])
+def test_missing_key_in_multi_column_group_by(tmp_path, chunk_rows):
+    (tmp_path / "sales.csv").write_text(CSV)
+    engine = DatasetEngine(root=str(tmp_path), chunk_rows=chunk_rows)
+
+    result = engine.aggregate("sales.csv", "value", "sum", group_by=["region", "channel"])
+
+    assert result["groups"] == 5
+    assert _groups(result) == {("EU", "web"): (6, 2), ("US", "shop"): (3, 1), ("US", "web"): (6, 1),
+                               (None, "web"): (2, 1), (None, "shop"): (4, 1)}
+
+
+@pytest.fixture
+def generated(tmp_path):
+    # 1,000 rows with missing values, read back by an engine that scans them in chunks of 64 rows.
+    rng = np.random.default_rng(7)
+    frame = pd.DataFrame({"region": rng.choice(["EU", "US", "APAC"], 1_000),
+                          "channel": rng.choice(["web", "shop"], 1_000),
+                          "value": rng.normal(1e6, 250.0, 1_000).round(3)})
+    frame.loc[rng.choice(1_000, 50, replace=False), "value"] = np.nan
+    frame.to_csv(tmp_path / "generated.csv", index=False)
+    return DatasetEngine(root=str(tmp_path), chunk_rows=64), frame
+
+
+@pytest.mark.parametrize("aggregation", AGGREGATIONS)
+def test_chunked_aggregation_matches_pandas(generated, aggregation):
+    engine, frame = generated
+
+    value = engine.aggregate("generated.csv", "value", aggregation)["value"]
+
+    assert value == pytest.approx(getattr(frame["value"], aggregation)(), rel=1e-12)
+
+
+@pytest.mark.parametrize("aggregation", AGGREGATIONS)
+def test_chunked_group_by_matches_pandas(generated, aggregation):
+    engine, frame = generated
+
+    result = engine.aggregate("generated.csv", "value", aggregation, group_by=["region", "channel"], limit=100)
+    expected = getattr(frame.groupby(["region", "channel"])["value"], aggregation)()
+    counts = frame.groupby(["region", "channel"])["value"].count()
+
+    assert result["groups"] == len(expected)
+    for top in result["top"]:
+        key = tuple(top["group"])
+        assert top["value"] == pytest.approx(expected[key], rel=1e-12)
+        assert top["count"] == counts[key]
+
+
+def test_profile_is_cached_until_the_file_changes(generated, tmp_path):
+    engine, frame = generated
+    first = engine.profile("generated.csv")
+    assert engine.profile("generated.csv") is first
+    assert first.rows == 1_000
+    assert first.numeric["value"]["nulls"] == 50
+    assert first.categorical["region"]["distinct"] == 3
+
+    frame.head(10).to_csv(tmp_path / "generated.csv", index=False)
+
+    assert engine.profile("generated.csv").rows == 10
+
+
+@pytest.mark.parametrize("path, column, aggregation, message", [("../outside.csv", "value", "sum", "outside"),
+                                                                ("missing.csv", "value", "sum", "not found"),
+                                                                ("sales.csv", "price", "sum", "Unknown column"),
+                                                                ("sales.csv", "region", "sum", "not numeric"),
+                                                                ("sales.csv", "value", "mode", "Unsupported aggregation")])
+def test_invalid_requests_raise_dataset_errors(engine, path, column, aggregation, message):
+    with pytest.raises(DatasetError, match=message):
+        engine.aggregate(path, column, aggregation)
@@ -0,0 +1,22 @@
+"""
+Tests for the nearest-rank percentile shared by the latency reports.
+
+Run from the repository root:
+    python -m pytest -q tests
+"""
+import pytest
+
+from observability.exporters import percentile
+
+
+@pytest.mark.parametrize("values, pct, expected", [([], 95, 0.0), ([7.0], 95, 7.0), ([1.0, 2.0], 50, 1.0),
+                                                   ([1.0, 2.0], 95, 2.0), (list(range(1, 101)), 95, 95),
+                                                   (list(range(1, 101)), 99, 99), (list(range(1, 101)), 100, 100)])
+def test_nearest_rank(values, pct, expected):
+    assert percentile(values, pct) == expected
+
+
+@pytest.mark.parametrize("size", range(1, 12))
+def test_p95_is_never_below_the_median(size):
+    values = [float(i) for i in range(size)]
+    assert percentile(values, 95) >= percentile(values, 50)
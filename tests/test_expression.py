@@ -0,0 +1,106 @@
+"""
+Tests for the safe expression evaluator: results, evaluation limits and rejected syntax.
+
+Run from the repository root:
+    python -m pytest -q tests
+"""
+import tracemalloc
+
+import pytest
+
+from tools.expression import ExpressionError, ExpressionLimits, SafeExpressionEvaluator
+
+
+@pytest.fixture
+def evaluator():
+    return SafeExpressionEvaluator(ExpressionLimits(max_elements=1_000))
+
+
+@pytest.mark.parametrize("expression, expected", [("(3+4)*5 - 2/7", 35 - 2 / 7), ("2^10", 1024),
+                                                  ("mean([1, 2, 3]) * 2", 4.0), ("max(3, 7)", 7.0),
+                                                  ("dot([1, 2], [3, 4])", 11.0)])
+def test_evaluates_arithmetic(evaluator, expression, expected):
+    assert evaluator.evaluate(expression) == pytest.approx(expected)
+
+
+def test_evaluates_variables(evaluator):
+    assert list(evaluator.evaluate("values * 2 + offset", {"values": [1, 2], "offset": 1})) == [3.0, 5.0]
+
+
+@pytest.mark.parametrize("expression", ["column * row", "row * column", "column ** row", "dot(column, row)",
+                                        "[row, row, row]"])
+def test_array_size_is_checked_before_allocation(evaluator, expression):
+    # Each operand is within the limit; the broadcast (or stacked) result is not.
+    variables = {"column": [[1.0]] * 100, "row": [[float(i) for i in range(400)]]}
+    with pytest.raises(ExpressionError, match="exceeds the limit"):
+        evaluator.evaluate(expression, variables)
+
+
+def test_oversized_broadcast_is_not_allocated(evaluator):
+    variables = {"column": [[1.0]] * 1_000, "row": [[float(i) for i in range(1_000)]]}
+    tracemalloc.start()
+    try:
+        with pytest.raises(ExpressionError):
+            evaluator.evaluate("column * row", variables)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    # The 1,000 x 1,000 product would take 8 MB.
+    assert peak < 1_000_000
+
+
+def test_array_variables_are_size_checked(evaluator):
+    with pytest.raises(ExpressionError, match="exceeds the limit"):
+        evaluator.evaluate("sum(values)", {"values": list(range(1_001))})
+
+
+@pytest.mark.parametrize("expression", ["9 ** 9 ** 9", "2 ** 5000", "(2 ** 4000) * (2 ** 4000)"])
+def test_integer_size_is_limited(evaluator, expression):
+    with pytest.raises(ExpressionError, match="bits"):
+        evaluator.evaluate(expression)
+
+
+def test_float_powers_are_not_bit_limited(evaluator):
+    assert evaluator.evaluate("2.0 ** 1000") == 2.0 ** 1000
+
+
+def test_node_count_is_limited():
+    evaluator = SafeExpressionEvaluator(ExpressionLimits(max_nodes=20))
+    with pytest.raises(ExpressionError, match="nodes"):
+        evaluator.evaluate(" + ".join(["1"] * 20))
+
+
+def test_expression_length_is_limited():
+    evaluator = SafeExpressionEvaluator(ExpressionLimits(max_chars=10))
+    with pytest.raises(ExpressionError, match="longer than"):
+        evaluator.evaluate("1 + 2 + 3 + 4")
+
+
+def test_evaluation_time_is_limited():
+    evaluator = SafeExpressionEvaluator(ExpressionLimits(max_seconds=-1))
+    with pytest.raises(ExpressionError, match="exceeded"):
+        evaluator.evaluate("1 + 1")
+
+
+@pytest.mark.parametrize("expression, message", [
+    ("x + 1", "Unknown name"),
+    ("__import__('os')", "Unsupported function"),
+    ("open('/etc/passwd')", "Unsupported function"),
+    ("(1).__class__", "Unsupported syntax"),
+    ("sqrt.__globals__", "Unsupported syntax"),
+    ("[1, 2][0]", "Unsupported syntax"),
+    ("[x for x in [1, 2]]", "Unsupported syntax"),
+    ("lambda: 1", "Unsupported syntax"),
+    ("round(1.5, decimals=1)", "Keyword arguments"),
+    ("'a' * 3", "Unsupported constant"),
+    ("True + 1", "Unsupported constant"),
+])
+def test_unsupported_syntax_is_rejected(evaluator, expression, message):
+    with pytest.raises(ExpressionError, match=message):
+        evaluator.evaluate(expression)
+
+
+@pytest.mark.parametrize("expression", ["(-8) ** 0.5", "(-8) ** (1/3) + 1"])
+def test_complex_results_are_rejected(evaluator, expression):
+    with pytest.raises(ExpressionError, match="complex"):
+        evaluator.evaluate(expression)
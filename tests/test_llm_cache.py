@@ -0,0 +1,110 @@
+"""
+Tests for the exact-match LLM response cache: key normalization, replay and persistence.
+
+Run from the repository root:
+    python -m pytest -q tests
+"""
+from langchain_core.load import dumps
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration
+
+from llms.cache import TieredLLMCache, cache_key
+
+LLM = "model=qwen2.5-coder:14b temperature=0"
+
+
+def _conversation(call_id: str, message_id: str) -> str:
+    return dumps([HumanMessage(content="What is 12 plus 30?", id=message_id),
+                  AIMessage(content="", id=f"ai-{message_id}",
+                            tool_calls=[{"name": "perform_calculation", "args": {"a": 12, "b": 30}, "id": call_id}],
+                            response_metadata={"total_duration": 123}),
+                  ToolMessage(content="42", tool_call_id=call_id, artifact={"raw": 42})])
+
+
+def _response(**fields) -> list:
+    message = AIMessage(content="", id="run-original",
+                        tool_calls=[{"name": "perform_calculation", "args": {"a": 1, "b": 2}, "id": "call_original"}],
+                        **fields)
+    return [ChatGeneration(message=message)]
+
+
+def test_key_ignores_ids_metadata_and_artifacts():
+    assert cache_key(_conversation("call_a", "1"), LLM) == cache_key(_conversation("call_b", "2"), LLM)
+
+
+def test_key_depends_on_content_and_model():
+    prompt = _conversation("call_a", "1")
+    other = dumps([HumanMessage(content="What is 12 plus 31?")])
+    assert cache_key(prompt, LLM) != cache_key(other, LLM)
+    assert cache_key(prompt, LLM) != cache_key(prompt, LLM + " tools=[get_stock_news]")
+
+
+def test_key_keeps_tool_calls_linked_to_their_results():
+    # Swapping which call a result answers changes the conversation, so it must change the key.
+    calls = [{"name": "perform_calculation", "args": {"a": i, "b": i}, "id": f"call_{i}"} for i in (1, 2)]
+    linked = dumps([AIMessage(content="", tool_calls=calls), ToolMessage(content="2", tool_call_id="call_1"),
+                    ToolMessage(content="4", tool_call_id="call_2")])
+    swapped = dumps([AIMessage(content="", tool_calls=calls), ToolMessage(content="2", tool_call_id="call_2"),
+                     ToolMessage(content="4", tool_call_id="call_1")])
+    assert cache_key(linked, LLM) != cache_key(swapped, LLM)
+
+
+def test_replay_clears_the_message_id_and_renames_tool_calls():
+    cache = TieredLLMCache()
+    prompt = _conversation("call_a", "1")
+    cache.update(prompt, LLM, _response())
+
+    first = cache.lookup(prompt, LLM)[0].message
+    second = cache.lookup(prompt, LLM)[0].message
+
+    assert first.id is None
+    assert first.response_metadata["cache_hit"] is True
+    assert first.tool_calls[0]["id"] != "call_original"
+    assert first.tool_calls[0]["id"] != second.tool_calls[0]["id"]
+    assert first.tool_calls[0]["args"] == {"a": 1, "b": 2}
+
+
+def test_replay_renames_provider_tool_calls_consistently():
+    cache = TieredLLMCache()
+    prompt = _conversation("call_a", "1")
+    raw_call = {"id": "call_original", "type": "function", "function": {"name": "perform_calculation", "arguments": "{}"}}
+    cache.update(prompt, LLM, _response(additional_kwargs={"tool_calls": [raw_call]}))
+
+    message = cache.lookup(prompt, LLM)[0].message
+
+    assert message.additional_kwargs["tool_calls"][0]["id"] == message.tool_calls[0]["id"]
+
+
+def test_memory_is_bounded_and_misses_are_counted():
+    cache = TieredLLMCache(max_memory_entries=2)
+    prompts = [dumps([HumanMessage(content=f"request {i}")]) for i in range(3)]
+    for prompt in prompts:
+        cache.update(prompt, LLM, _response())
+
+    assert cache.lookup(prompts[0], LLM) is None
+    assert cache.lookup(prompts[2], LLM) is not None
+    assert (cache.stats.hits, cache.stats.misses, cache.stats.writes) == (1, 1, 3)
+
+
+def test_responses_persist_across_instances(tmp_path):
+    db_path = str(tmp_path / "llm.sqlite")
+    prompt = _conversation("call_a", "1")
+    TieredLLMCache(db_path=db_path).update(prompt, LLM, _response())
+
+    cache = TieredLLMCache(db_path=db_path)
+    replayed = cache.lookup(_conversation("call_b", "2"), LLM)
+
+    assert replayed[0].message.tool_calls[0]["args"] == {"a": 1, "b": 2}
+    assert replayed[0].message.id is None
+    assert cache.stats.disk_hits == 1
+
+
+def test_disk_store_is_size_bounded(tmp_path):
+    cache = TieredLLMCache(db_path=str(tmp_path / "llm.sqlite"), max_memory_entries=1, max_disk_bytes=1_000)
+    prompts = [dumps([HumanMessage(content=f"request {i}")]) for i in range(10)]
+    for prompt in prompts:
+        cache.update(prompt, LLM, _response())
+
+    assert cache.stats.evictions > 0
+    assert cache._disk_bytes <= 1_000
+    assert cache.lookup(prompts[-1], LLM) is not None
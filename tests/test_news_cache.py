@@ -0,0 +1,217 @@
+"""
+Offline tests for the per-ticker news cache, using an injected fake fetcher and a manual clock.
+
+Run from the repository root:
+    python -m pytest -q tests
+"""
+import threading
+import time
+
+import pytest
+
+from tools.news_cache import NewsCache
+
+
+class Clock:
+    """A manually advanced time source."""
+
+    def __init__(self, now: float = 1_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeFetcher:
+    """Returns one article per call, tagged with the call number; can block or fail on demand."""
+
+    def __init__(self):
+        self.calls = 0
+        self.release = threading.Event()
+        self.release.set()
+        self.started = threading.Event()
+        self.error = None
+        self._lock = threading.Lock()
+
+    def __call__(self, ticker: str):
+        with self._lock:
+            self.calls += 1
+            call = self.calls
+        self.started.set()
+        self.release.wait(timeout=5)
+        if self.error is not None:
+            raise self.error
+        return [{"title": f"{ticker} headline {call}", "summary": f"{ticker} summary {call}"}]
+
+
+def _wait_for(condition, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not reached in time")
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture
+def fetcher():
+    return FakeFetcher()
+
+
+def test_fresh_entry_is_served_from_memory(fetcher, clock):
+    cache = NewsCache(fetcher=fetcher, ttl=60, stale_ttl=600, clock=clock)
+
+    first = cache.get("aapl")
+    clock.now += 30
+    second = cache.get("AAPL ")
+
+    assert second == first
+    assert fetcher.calls == 1
+    assert cache.stats.misses == 1
+    assert cache.stats.hits == 1
+
+
+def test_stale_entry_is_served_while_refreshing(fetcher, clock):
+    cache = NewsCache(fetcher=fetcher, ttl=60, stale_ttl=600, clock=clock)
+    original = cache.get("AAPL")
+
+    clock.now += 120
+    fetcher.release.clear()
+    fetcher.started.clear()
+    stale = cache.get("AAPL")
+
+    # The stale articles come back at once, while the refresh is still blocked in the fetcher.
+    assert stale == original
+    assert fetcher.started.wait(timeout=5)
+    assert cache.stats.stale_hits == 1
+    assert cache.stats.refreshes == 1
+
+    fetcher.release.set()
+    _wait_for(lambda: cache.get("AAPL") != original)
+    assert cache.get("AAPL")[0]["title"] == "AAPL headline 2"
+    assert fetcher.calls == 2
+
+
+def test_expired_entry_is_fetched_synchronously(fetcher, clock):
+    cache = NewsCache(fetcher=fetcher, ttl=60, stale_ttl=600, clock=clock)
+    cache.get("AAPL")
+
+    clock.now += 1_000
+    refreshed = cache.get("AAPL")
+
+    assert refreshed[0]["title"] == "AAPL headline 2"
+    assert cache.stats.misses == 2
+    assert cache.stats.stale_hits == 0
+
+
+def test_concurrent_misses_share_one_fetch(fetcher, clock):
+    cache = NewsCache(fetcher=fetcher, clock=clock)
+    fetcher.release.clear()
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get("MSFT"))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    assert fetcher.started.wait(timeout=5)
+    # Give the other callers time to join the in-flight fetch before it completes.
+    time.sleep(0.1)
+    fetcher.release.set()
+    for thread in threads:
+        thread.join(timeout=5)
+
+    assert fetcher.calls == 1
+    assert len(results) == 8
+    assert all(result == results[0] for result in results)
+
+
+def test_errors_are_never_cached(fetcher, clock):
+    cache = NewsCache(fetcher=fetcher, clock=clock)
+    fetcher.error = RuntimeError("rate limited")
+
+    with pytest.raises(RuntimeError):
+        cache.get("TSLA")
+    assert cache.stats.errors == 1
+
+    fetcher.error = None
+    articles = cache.get("TSLA")
+
+    assert articles[0]["title"] == "TSLA headline 2"
+    assert fetcher.calls == 2
+    assert cache.stats.misses == 2
+
+
+def test_entries_persist_across_instances(fetcher, clock, tmp_path):
+    db_path = str(tmp_path / "news.sqlite")
+    first = NewsCache(fetcher=fetcher, ttl=60, db_path=db_path, clock=clock)
+    articles = first.get("NVDA")
+
+    second = NewsCache(fetcher=fetcher, ttl=60, db_path=db_path, clock=clock)
+    clock.now += 10
+
+    assert second.get("NVDA") == articles
+    assert fetcher.calls == 1
+    assert second.stats.disk_hits == 1
+    assert second.stats.hits == 1
+
+
+def test_stats_counters(fetcher, clock):
+    cache = NewsCache(fetcher=fetcher, ttl=60, stale_ttl=600, clock=clock)
+    cache.get("AAPL")             # miss
+    cache.get("AAPL")             # hit
+    clock.now += 120
+    cache.get("AAPL")             # stale hit + background refresh
+    _wait_for(lambda: fetcher.calls == 2 and "AAPL" not in cache._in_flight)
+    fetcher.error = ValueError("no news")
+    clock.now += 10_000
+    with pytest.raises(ValueError):
+        cache.get("AAPL")         # miss + error
+
+    stats = cache.stats.as_dict()
+    assert stats == {"hits": 1, "stale_hits": 1, "misses": 2, "disk_hits": 0, "refreshes": 1, "errors": 1}
+
+
+def test_ttl_boundaries(fetcher, clock):
+    cache = NewsCache(fetcher=fetcher, ttl=60, stale_ttl=600, clock=clock)
+    cache.get("AAPL")
+
+    clock.now += 59.9
+    cache.get("AAPL")
+    assert (cache.stats.hits, cache.stats.stale_hits) == (1, 0)
+
+    fetcher.release.clear()
+    clock.now += 0.1                # exactly 'ttl' old: stale
+    cache.get("AAPL")
+    clock.now += 600 - 0.1          # just before 'ttl + stale_ttl': still stale, refresh already running
+    cache.get("AAPL")
+    assert (cache.stats.stale_hits, cache.stats.refreshes) == (2, 1)
+    fetcher.release.set()
+
+
+def test_failed_refresh_keeps_serving_the_stale_entry(fetcher, clock):
+    cache = NewsCache(fetcher=fetcher, ttl=60, stale_ttl=600, clock=clock)
+    original = cache.get("AAPL")
+
+    fetcher.error = RuntimeError("rate limited")
+    clock.now += 120
+    assert cache.get("AAPL") == original
+    _wait_for(lambda: cache.stats.errors == 1 and "AAPL" not in cache._in_flight)
+
+    assert cache.get("AAPL") == original
+    assert cache.stats.stale_hits == 2
+
+
+def test_get_many_isolates_failures(clock):
+    def fetcher(ticker):
+        if ticker == "FAIL":
+            raise ValueError("no news")
+        return [{"title": f"{ticker} headline", "summary": ""}]
+
+    cache = NewsCache(fetcher=fetcher, clock=clock)
+    results = cache.get_many(["aapl", "FAIL", "AAPL", " msft "])
+
+    assert list(results) == ["AAPL", "FAIL", "MSFT"]
+    assert results["AAPL"][0]["title"] == "AAPL headline"
+    assert isinstance(results["FAIL"], ValueError)
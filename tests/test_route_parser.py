@@ -0,0 +1,55 @@
+"""
+Tests for the validation and local repair of the supervisor LLM's route output.
+
+Run from the repository root:
+    python -m pytest -q tests
+"""
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+from supervisor.route_parser import DEFAULT_ROUTE, parse_route
+
+
+@pytest.mark.parametrize("output, route, source", [("3", "calculator_agent", "label"), (" 4\n", "stock_news_agent", "label"),
+                                                   ("0", "END", "label"), ("data_analysis_agent", "data_analysis_agent", "name")])
+def test_clean_output_is_not_repaired(output, route, source):
+    parsed = parse_route(output)
+    assert (parsed.route, parsed.repaired, parsed.source) == (route, False, source)
+
+
+@pytest.mark.parametrize("output, route, source", [("'3'", "calculator_agent", "label"), ("4.", "stock_news_agent", "label"),
+                                                   ("`Calculator_Agent`", "calculator_agent", "name"),
+                                                   ("calculator", "calculator_agent", "name"),
+                                                   ("Stock News", "stock_news_agent", "name")])
+def test_wrapped_output_is_repaired(output, route, source):
+    parsed = parse_route(output)
+    assert (parsed.route, parsed.repaired, parsed.source) == (route, True, source)
+
+
+@pytest.mark.parametrize("output, route", [("The best agent is stock_news_agent.", "stock_news_agent"),
+                                           ("I would route this to the calculator, then 1", "calculator_agent"),
+                                           ("Route: 2 (data analysis)", "data_analysis_agent")])
+def test_first_mention_is_used(output, route):
+    parsed = parse_route(output)
+    assert (parsed.route, parsed.repaired, parsed.source) == (route, True, "mention")
+
+
+def test_digits_inside_numbers_are_not_labels():
+    parsed = parse_route("15", [HumanMessage(content="What is 12 plus 30?")])
+    assert parsed.source == "rules"
+    assert parsed.route == "calculator_agent"
+
+
+def test_unusable_output_falls_back_to_the_rules():
+    parsed = parse_route("I am not sure.", [HumanMessage(content="Get the latest news for AAPL")])
+    assert (parsed.route, parsed.repaired, parsed.source) == ("stock_news_agent", True, "rules")
+
+
+def test_final_answer_ends_the_run():
+    messages = [HumanMessage(content="Hello"), AIMessage(content="Hi, how can I help?")]
+    assert parse_route("", messages).route == "END"
+
+
+def test_default_route_without_conversation():
+    parsed = parse_route("???")
+    assert (parsed.route, parsed.repaired, parsed.source) == (DEFAULT_ROUTE, True, "default")
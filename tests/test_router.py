@@ -0,0 +1,22 @@
+"""
+Tests for the deterministic arithmetic fast-path rule.
+
+Run from the repository root:
+    python -m pytest -q tests
+"""
+import pytest
+from langchain_core.messages import HumanMessage
+
+from supervisor.router import arithmetic_rule
+
+
+@pytest.mark.parametrize("text", ["12 - 5", "100-58", "(3+4)*2", "2.5-1.25", "What is 12 plus 30?", "10/2/5"])
+def test_arithmetic_is_routed_to_the_calculator(text):
+    decision = arithmetic_rule([HumanMessage(content=text)])
+    assert decision is not None and decision.route == "calculator_agent"
+
+
+@pytest.mark.parametrize("text", ["2024-01-15", "12/25/2024", "15.03.2024", "555-1234", "555-123-4567",
+                                  "(555) 123-4567"])
+def test_dates_and_phone_numbers_are_left_to_the_llm(text):
+    assert arithmetic_rule([HumanMessage(content=text)]) is None
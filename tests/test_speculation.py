@@ -0,0 +1,76 @@
+"""
+Tests for the speculative executor's handling of confirmed and overruled predictions.
+
+Run from the repository root:
+    python -m pytest -q tests
+"""
+import asyncio
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+from supervisor import speculation
+from supervisor.router import RouteDecision
+from supervisor.speculation import SpeculativeExecutor, defer_until_used
+
+recorded = []
+
+
+def first_step(state):
+    defer_until_used(lambda: recorded.append(state['messages'][-1].content))
+    return AIMessage(content="speculated")
+
+
+async def afirst_step(state):
+    return first_step(state)
+
+
+@pytest.fixture
+def executor(monkeypatch):
+    recorded.clear()
+    monkeypatch.setitem(speculation.SPECULATIVE_AGENTS, "calculator_agent", (__name__, "first_step", "afirst_step"))
+    return SpeculativeExecutor(predictor=lambda messages: RouteDecision("calculator_agent", 1.0, "test"))
+
+
+def _state(text: str) -> dict:
+    return {"messages": [HumanMessage(content=text, id="m1")]}
+
+
+def test_confirmed_speculation_applies_deferred_effects(executor):
+    state = _state("What is 12 plus 30?")
+    executor.resolve(executor.start(state), "calculator_agent")
+    assert recorded == []
+
+    assert executor.take("calculator_agent", state).content == "speculated"
+    assert recorded == ["What is 12 plus 30?"]
+    assert executor.stats.used == 1
+
+
+def test_overruled_speculation_drops_deferred_effects(executor):
+    state = _state("What is 12 plus 30?")
+    running = executor.start(state)
+    running.handle.result(timeout=5)
+    executor.resolve(running, "text_processing_agent")
+
+    assert executor.take("calculator_agent", state) is None
+    assert recorded == []
+    assert executor.stats.misses == 1
+
+
+def test_async_speculation_defers_effects_until_taken(executor):
+    state = _state("Multiply 7 by 6")
+
+    async def turn():
+        executor.resolve(executor.astart(state), "calculator_agent")
+        await asyncio.sleep(0)
+        assert recorded == []
+        return await executor.atake("calculator_agent", state)
+
+    assert asyncio.run(turn()).content == "speculated"
+    assert recorded == ["Multiply 7 by 6"]
+
+
+def test_effects_outside_speculation_run_at_once():
+    effects = []
+    defer_until_used(lambda: effects.append(1))
+    assert effects == [1]
@@ -0,0 +1,52 @@
+"""
+Tests for the text agent's request splitting and its local (LLM-free) answers.
+
+Run from the repository root:
+    python -m pytest -q tests
+"""
+import pytest
+
+from agents.text_processing_agent import _is_document, _local_answer, split_request
+
+LONG_DOCUMENT = "The quarterly report shows steady growth across all regions. " * 10
+
+
+@pytest.mark.parametrize("request_text, instruction, document", [
+    ("Summarize this text:\nThe meeting moved to Friday.", "Summarize this text:", "The meeting moved to Friday."),
+    ("Count the words in the following: one two three four five six seven eight nine ten eleven",
+     "Count the words in the following", "one two three four five six seven eight nine ten eleven"),
+    ("Extract the emails below\nann@example.com, bob@example.com", "Extract the emails below",
+     "ann@example.com, bob@example.com"),
+    ('Translate to French:\n"""Good morning"""', "Translate to French:", '"""Good morning"""'),
+])
+def test_marked_documents_are_split(request_text, instruction, document):
+    assert split_request(request_text) == (instruction, document)
+
+
+def test_long_documents_are_split_without_a_marker():
+    assert split_request(f"Summarize\n{LONG_DOCUMENT}") == ("Summarize", LONG_DOCUMENT.strip())
+
+
+@pytest.mark.parametrize("request_text", ["Question: why is the sky blue?", "Note: I prefer short answers, thanks a lot",
+                                          "Tell me a joke\nabout cats", "What is the capital of France?"])
+def test_plain_questions_are_not_split(request_text):
+    assert split_request(request_text) == (request_text, "")
+
+
+@pytest.mark.parametrize("instruction, document, expected", [("Summarize this article", "short", True),
+                                                             ("Summarize", "```\ncode\n```", True),
+                                                             ("Summarize", LONG_DOCUMENT, True),
+                                                             ("Question", "why is the sky blue?", False)])
+def test_is_document(instruction, document, expected):
+    assert _is_document(instruction, document) is expected
+
+
+def test_local_operations_answer_without_the_llm():
+    answer = _local_answer("count the words and list the emails", "Mail ann@example.com or ann@example.com now")
+
+    assert answer.startswith("Statistics:")
+    assert "Emails (" in answer and "ann@example.com" in answer
+
+
+def test_other_instructions_need_the_llm():
+    assert _local_answer("translate to French", "Good morning") is None
@@ -0,0 +1,332 @@
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import math
+import os
+import threading
+
+# --- Dataset Engine ---
+# Answers analysis questions about local CSV and Parquet files that can be far larger than memory.
+# Files are never loaded whole: CSV files are streamed in chunks of 'chunk_rows' rows,
+# Parquet files in record batches through a memory-mapped reader, and only the requested columns
+# are read. Every chunk is reduced with vectorized pandas/NumPy code to mergeable moments
+# (count, sum, mean, M2, min, max) that are combined across chunks, so memory is bounded by the
+# chunk size and the number of groups, not by the file size.
+# The schema and per-column statistics of a file are cached, keyed by its path, size and
+# modification time, so repeated questions about the same file do not rescan it.
+# Results are compact summaries (schema, statistics, top groups); raw rows are never returned.
+#
+# pandas is required; Parquet files additionally need pyarrow. Both are imported on first use.
+
+SUPPORTED_FORMATS = {".csv": "csv", ".tsv": "csv", ".parquet": "parquet", ".pq": "parquet"}
+# Aggregations that can be merged across chunks.
+AGGREGATIONS = ("count", "sum", "mean", "min", "max", "std", "var")
+
+
+class DatasetError(ValueError):
+    """Raised for missing, unsupported or out-of-bounds dataset requests."""
+
+
+@dataclass
+class DatasetProfile:
+    """Schema and column statistics of one file."""
+    path: str
+    format: str
+    rows: int
+    columns: Dict[str, str]
+    """Column name -> dtype, in file order."""
+    numeric: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    """Column name -> count, nulls, mean, std, min and max."""
+    categorical: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    """Column name -> count, nulls and the number of distinct values (capped)."""
+    moments: Dict[str, Dict[str, float]] = field(default_factory=dict)
+    """Numeric column name -> full-precision n, sum, mean, m2, min and max (not part of 'as_dict')."""
+
+    def as_dict(self) -> dict:
+        return {"path": self.path, "format": self.format, "rows": self.rows, "columns": dict(self.columns),
+                "numeric": self.numeric, "categorical": self.categorical}
+
+
+def _plain(value: Any) -> Any:
+    # NumPy scalars become Python numbers and NaN becomes None, so results are JSON serializable.
+    if hasattr(value, "item"):
+        value = value.item()
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+def _compact(value: Any) -> Any:
+    # For the profile summary only: numbers are rounded to 6 significant digits to keep it short.
+    # Aggregation results are returned at full precision.
+    value = _plain(value)
+    return float(f"{value:.6g}") if isinstance(value, float) else value
+
+
+class DatasetEngine:
+    """
+    Chunked, memory-bounded statistics and group-by aggregations over local CSV and Parquet files.
+    """
+
+    def __init__(self, root: str = ".", chunk_rows: int = 250_000, max_groups: int = 100_000,
+                 distinct_cap: int = 1_000, max_profiles: int = 64):
+        """
+        Args:
+            root (str): Directory the analyzed files must be located in (paths are resolved against it).
+            chunk_rows (int): Rows read per chunk; bounds the memory used by one scan.
+            max_groups (int): Maximum number of distinct groups tracked by a group-by aggregation.
+            distinct_cap (int): Distinct values counted per non-numeric column before reporting '>cap'.
+            max_profiles (int): Maximum number of file profiles kept in the cache.
+        """
+        self.root = os.path.realpath(root)
+        self.chunk_rows = chunk_rows
+        self.max_groups = max_groups
+        self.distinct_cap = distinct_cap
+        self.max_profiles = max_profiles
+        self._profiles: "OrderedDict[str, Tuple[Tuple[int, int], DatasetProfile]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    # --- Files ---
+
+    def resolve(self, path: str) -> Tuple[str, str]:
+        """
+        Resolves a path inside the dataset root.
+
+        Returns:
+            Tuple[str, str]: The absolute path and the file format ('csv' or 'parquet').
+
+        Raises:
+            DatasetError: If the file is outside the root, missing or of an unsupported type.
+        """
+        resolved = os.path.realpath(os.path.join(self.root, os.path.expanduser(path)))
+        if os.path.commonpath([resolved, self.root]) != self.root:
+            raise DatasetError(f"'{path}' is outside the data directory {self.root}")
+        if not os.path.isfile(resolved):
+            raise DatasetError(f"File not found: '{path}'")
+        file_format = SUPPORTED_FORMATS.get(os.path.splitext(resolved)[1].lower())
+        if file_format is None:
+            raise DatasetError(f"Unsupported file type '{path}' (supported: {', '.join(sorted(SUPPORTED_FORMATS))})")
+        return resolved, file_format
+
+    def _chunks(self, path: str, file_format: str, columns: Optional[List[str]] = None) -> Iterator[Any]:
+        # Yields the file as pandas DataFrames of at most 'chunk_rows' rows, restricted to 'columns'.
+        import pandas as pd
+        if file_format == "csv":
+            separator = "\t" if path.lower().endswith(".tsv") else ","
+            yield from pd.read_csv(path, sep=separator, usecols=columns, chunksize=self.chunk_rows)
+            return
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise DatasetError("Reading Parquet files requires pyarrow (pip install pyarrow)") from None
+        parquet_file = pq.ParquetFile(path, memory_map=True)
+        for batch in parquet_file.iter_batches(batch_size=self.chunk_rows, columns=columns):
+            yield batch.to_pandas()
+
+    def _schema(self, path: str, file_format: str) -> Dict[str, str]:
+        if file_format == "csv":
+            import pandas as pd
+            sample = pd.read_csv(path, sep="\t" if path.lower().endswith(".tsv") else ",", nrows=1_000)
+            return {str(name): str(dtype) for name, dtype in sample.dtypes.items()}
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise DatasetError("Reading Parquet files requires pyarrow (pip install pyarrow)") from None
+        schema = pq.read_schema(path, memory_map=True)
+        return {name: str(schema.field(name).type) for name in schema.names}
+
+    # --- Moments ---
+
+    @staticmethod
+    def _chunk_moments(values: Any, keys: Any = None) -> Any:
+        """
+        Reduces one chunk to per-group moments: a DataFrame with n, sum, mean, m2, min and max per group
+        (or per column when 'values' is a DataFrame and there are no keys).
+        """
+        import pandas as pd
+        if keys is None:
+            frame = values if isinstance(values, pd.DataFrame) else values.to_frame()
+            means = frame.mean()
+            return pd.DataFrame({"n": frame.count(), "sum": frame.sum(), "mean": means,
+                                 "m2": ((frame - means) ** 2).sum(), "min": frame.min(), "max": frame.max()})
+        grouped = values.groupby(keys, dropna=False, sort=False)
+        means = grouped.transform("mean")
+        return pd.DataFrame({"n": grouped.count(), "sum": grouped.sum(), "mean": grouped.mean(),
+                             "m2": ((values - means) ** 2).groupby(keys, dropna=False, sort=False).sum(),
+                             "min": grouped.min(), "max": grouped.max()})
+
+    @staticmethod
+    def _merge_moments(total: Any, chunk: Any) -> Any:
+        """Combines two sets of moments group by group (Chan et al.'s parallel variance update)."""
+        import numpy as np
+        if total is None:
+            return chunk
+        index = total.index.union(chunk.index, sort=False)
+        a = total.reindex(index)
+        b = chunk.reindex(index)
+        na, nb = a["n"].fillna(0), b["n"].fillna(0)
+        mean_a, mean_b = a["mean"].fillna(0.0), b["mean"].fillna(0.0)
+        n = na + nb
+        safe_n = n.where(n > 0, 1)
+        delta = mean_b - mean_a
+        merged = a.copy()
+        merged["n"] = n
+        merged["sum"] = a["sum"].fillna(0.0) + b["sum"].fillna(0.0)
+        merged["mean"] = (mean_a + delta * nb / safe_n).where(n > 0, np.nan)
+        merged["m2"] = a["m2"].fillna(0.0) + b["m2"].fillna(0.0) + delta ** 2 * na * nb / safe_n
+        merged["min"] = np.fmin(a["min"], b["min"])
+        merged["max"] = np.fmax(a["max"], b["max"])
+        return merged
+
+    @staticmethod
+    def _aggregate(moments: Any, aggregation: str) -> Any:
+        import numpy as np
+        n = moments["n"]
+        if aggregation == "count":
+            return n
+        if aggregation == "sum":
+            return moments["sum"].where(n > 0, 0.0)
+        if aggregation in ("mean", "min", "max"):
+            return moments[aggregation]
+        variance = (moments["m2"] / (n - 1)).where(n > 1, np.nan)
+        return variance if aggregation == "var" else np.sqrt(variance)
+
+    # --- Operations ---
+
+    def profile(self, path: str) -> DatasetProfile:
+        """
+        Computes (or returns the cached) schema and column statistics of a file in a single scan.
+
+        Args:
+            path (str): Path of the CSV or Parquet file, relative to the dataset root.
+
+        Returns:
+            DatasetProfile: The file's profile.
+        """
+        import pandas as pd
+        resolved, file_format = self.resolve(path)
+        stat = os.stat(resolved)
+        signature = (stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            cached = self._profiles.get(resolved)
+            if cached is not None and cached[0] == signature:
+                self._profiles.move_to_end(resolved)
+                return cached[1]
+
+        columns = self._schema(resolved, file_format)
+        rows = 0
+        moments = None
+        nulls: Dict[str, int] = {name: 0 for name in columns}
+        distinct: Dict[str, Optional[set]] = {}
+        numeric_columns: Optional[List[str]] = None
+        for chunk in self._chunks(resolved, file_format):
+            rows += len(chunk)
+            if numeric_columns is None:
+                numeric_columns = [str(name) for name in chunk.select_dtypes("number").columns]
+                distinct = {str(name): set() for name in chunk.columns if str(name) not in numeric_columns}
+            for name, count in chunk.isna().sum().items():
+                nulls[str(name)] = nulls.get(str(name), 0) + int(count)
+            if numeric_columns:
+                numbers = chunk[numeric_columns].apply(pd.to_numeric, errors="coerce")
+                moments = self._merge_moments(moments, self._chunk_moments(numbers))
+            for name, seen in distinct.items():
+                if seen is not None:
+                    seen.update(chunk[name].dropna().unique().tolist())
+                    if len(seen) > self.distinct_cap:
+                        distinct[name] = None # Stop tracking; only the cap is reported
+
+        numeric = {}
+        exact = {}
+        if moments is not None:
+            std = self._aggregate(moments, "std")
+            for (label, row), deviation in zip(moments.iterrows(), std):
+                name = str(label)
+                exact[name] = {key: _plain(row[key]) for key in ("n", "sum", "mean", "m2", "min", "max")}
+                numeric[name] = {"count": int(row["n"]), "nulls": nulls[name],
+                                 "mean": _compact(row["mean"]), "std": _compact(deviation),
+                                 "min": _compact(row["min"]), "max": _compact(row["max"])}
+        categorical = {name: {"count": rows - nulls[name], "nulls": nulls[name],
+                              "distinct": len(seen) if seen is not None else f">{self.distinct_cap}"}
+                       for name, seen in distinct.items()}
+
+        profile = DatasetProfile(path=path, format=file_format, rows=rows, columns=columns,
+                                 numeric=numeric, categorical=categorical, moments=exact)
+        with self._lock:
+            self._profiles[resolved] = (signature, profile)
+            self._profiles.move_to_end(resolved)
+            while len(self._profiles) > self.max_profiles:
+                self._profiles.popitem(last=False)
+        return profile
+
+    def aggregate(self, path: str, column: str, aggregation: str = "mean", group_by: Optional[List[str]] = None,
+                  limit: int = 20, descending: bool = True) -> dict:
+        """
+        Aggregates a numeric column, optionally per group, in a single chunked scan.
+
+        Args:
+            path (str): Path of the CSV or Parquet file, relative to the dataset root.
+            column (str): The numeric column to aggregate.
+            aggregation (str): One of 'count', 'sum', 'mean', 'min', 'max', 'std', 'var'.
+            group_by (Optional[List[str]]): Columns to group by; without them the whole column is aggregated.
+            limit (int): Maximum number of groups returned (ranked by the aggregated value).
+            descending (bool): Whether the largest values are returned first.
+
+        Returns:
+            dict: The aggregated value, or the top groups with the total number of groups.
+        """
+        if aggregation not in AGGREGATIONS:
+            raise DatasetError(f"Unsupported aggregation '{aggregation}' (supported: {', '.join(AGGREGATIONS)})")
+        group_by = list(group_by or [])
+        profile = self.profile(path)
+        missing = [name for name in [column, *group_by] if name not in profile.columns]
+        if missing:
+            raise DatasetError(f"Unknown column(s): {', '.join(missing)} (available: {', '.join(profile.columns)})")
+
+        if not group_by:
+            # Ungrouped aggregations are answered from the cached full-precision column moments.
+            stats = profile.moments.get(column)
+            if stats is None:
+                raise DatasetError(f"Column '{column}' is not numeric")
+            n = stats["n"]
+            variance = stats["m2"] / (n - 1) if n > 1 else None
+            value = {"count": int(n), "sum": stats["sum"] if n else 0.0, "mean": stats["mean"],
+                     "min": stats["min"], "max": stats["max"], "var": variance,
+                     "std": math.sqrt(variance) if variance is not None else None}[aggregation]
+            return {"path": path, "column": column, "aggregation": aggregation, "value": value}
+
+        import pandas as pd
+        resolved, file_format = self.resolve(path)
+        moments = None
+        for chunk in self._chunks(resolved, file_format, columns=[column, *group_by]):
+            values = pd.to_numeric(chunk[column], errors="coerce")
+            keys = [chunk[name] for name in group_by]
+            moments = self._merge_moments(moments, self._chunk_moments(values, keys))
+            if len(moments) > self.max_groups:
+                raise DatasetError(f"More than {self.max_groups} groups; group by fewer or coarser columns")
+
+        if moments is None:
+            return {"path": path, "column": column, "aggregation": aggregation, "group_by": group_by,
+                    "groups": 0, "top": []}
+        result = self._aggregate(moments, aggregation).sort_values(ascending=not descending, na_position="last")
+        limit = max(1, min(int(limit), 100))
+        head = result.head(limit)
+        # Counts are taken by position: a label lookup cannot find a group key that contains NaN.
+        counts = moments["n"].reindex(head.index)
+        top = [{"group": _plain(key) if len(group_by) == 1 else [_plain(part) for part in key],
+                "value": _plain(value), "count": int(count)}
+               for (key, value), count in zip(head.items(), counts)]
+        return {"path": path, "column": column, "aggregation": aggregation, "group_by": group_by,
+                "groups": len(result), "top": top, "truncated": len(result) > limit}
+
+    def invalidate(self, path: Optional[str] = None) -> None:
+        """Drops the cached profile of one file, or of all files."""
+        with self._lock:
+            if path is None:
+                self._profiles.clear()
+            else:
+                self._profiles.pop(os.path.realpath(os.path.join(self.root, path)), None)
+
+
+# Shared engine used by the dataset tools. DATA_ANALYSIS_ROOT restricts which files can be analyzed.
+dataset_engine = DatasetEngine(root=os.environ.get("DATA_ANALYSIS_ROOT", "."),
+                               chunk_rows=int(os.environ.get("DATA_ANALYSIS_CHUNK_ROWS", "250000")))
@@ -0,0 +1,193 @@
+from langchain_core.messages import ToolMessage
+from langchain_core.tools import BaseTool
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+import asyncio
+import logging
+import time
+
+from tools.tools import tools # All available tools
+from observability.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+# --- Shared Tool Executor ---
+# Executes the tool calls of a single AIMessage for any agent. Tools are looked up through a
+# prebuilt name index, independent calls run concurrently on a bounded thread pool (or on the
+# event loop for async execution), every call is bounded by a per-tool timeout, and the resulting
+# ToolMessages are returned in the same order as the tool calls.
+# Tools are invoked with the full tool call, so LangChain builds the ToolMessage itself; tools declared
+# with response_format="content_and_artifact" attach their structured result as the message's artifact.
+
+# Name -> tool index, built once instead of scanning the 'tools' list for every call.
+TOOLS_BY_NAME: Dict[str, BaseTool] = {t.name: t for t in tools}
+
+# Default timeout (in seconds) for a single tool call.
+DEFAULT_TOOL_TIMEOUT = 30.0
+# Per-tool timeout overrides (in seconds).
+TOOL_TIMEOUTS: Dict[str, float] = {
+    "perform_calculation": 5.0,
+    "evaluate_expression": 5.0, # The evaluator enforces its own, tighter time limit
+    "get_stock_news": 20.0,
+    "get_stock_news_batch": 30.0,
+    "describe_dataset": 300.0, # A first scan of a multi-gigabyte file; later calls hit the profile cache
+    "aggregate_dataset": 300.0,
+}
+# Upper bound on concurrently running tool calls across all agents.
+MAX_TOOL_WORKERS = 8
+
+_tool_pool = ThreadPoolExecutor(max_workers=MAX_TOOL_WORKERS, thread_name_prefix="tool-executor")
+
+
+@dataclass
+class ToolExecution:
+    """The outcome of a single tool call."""
+    tool_call: dict
+    """The tool call as produced by the LLM ('name', 'args', 'id')."""
+    message: ToolMessage
+    """The ToolMessage to add to the conversation history."""
+    result: Any = None
+    """The structured tool result (the ToolMessage's artifact, or its content for tools without
+    an artifact), or None if the call failed."""
+    error: Optional[str] = None
+    """A description of the failure, or None if the call succeeded."""
+    elapsed: float = 0.0
+    """Wall time of the call in seconds."""
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def build_tool_index(selected_tools: List[BaseTool]) -> Dict[str, BaseTool]:
+    """
+    Builds a name -> tool index for a subset of tools (e.g., the tools a single agent may use).
+
+    Args:
+        selected_tools (List[BaseTool]): The tools to index.
+
+    Returns:
+        Dict[str, BaseTool]: The tool index.
+    """
+    return {t.name: t for t in selected_tools}
+
+
+def _timeout_for(tool_name: str, timeouts: Optional[Dict[str, float]]) -> float:
+    if timeouts and tool_name in timeouts:
+        return timeouts[tool_name]
+    return TOOL_TIMEOUTS.get(tool_name, DEFAULT_TOOL_TIMEOUT)
+
+
+def _as_tool_call(tool_call: dict) -> dict:
+    # Invoking a tool with a ToolCall (rather than its bare args) makes it return a ToolMessage.
+    return {"name": tool_call['name'], "args": tool_call['args'], "id": tool_call['id'], "type": "tool_call"}
+
+
+def _success(tool_call: dict, message: ToolMessage, elapsed: float) -> ToolExecution:
+    result = message.artifact if message.artifact is not None else message.content
+    # The (possibly large) result is only formatted when DEBUG output is enabled.
+    logger.debug("---Tool '%s' executed, result: %s---", tool_call['name'], message.content)
+    tracer.emit(tool_call['name'], "tool", elapsed, result_chars=len(str(message.content)))
+    return ToolExecution(tool_call, message, result=result, elapsed=elapsed)
+
+
+def _failure(tool_call: dict, error: str, elapsed: float = 0.0) -> ToolExecution:
+    logger.warning("---Error executing tool '%s': %s---", tool_call['name'], error)
+    tracer.emit(tool_call['name'], "tool", elapsed, error=error)
+    message = ToolMessage(content=f"Error: {error}", tool_call_id=tool_call['id'], name=tool_call['name'], status="error")
+    return ToolExecution(tool_call, message, error=error, elapsed=elapsed)
+
+
+def _not_found(tool_call: dict) -> ToolExecution:
+    error = f"Tool '{tool_call['name']}' not found."
+    logger.warning("---%s---", error)
+    tracer.emit(tool_call['name'], "tool", 0.0, error=error)
+    message = ToolMessage(content=error, tool_call_id=tool_call['id'], name=tool_call['name'], status="error")
+    return ToolExecution(tool_call, message, error=error)
+
+
+def execute_tool_calls(tool_calls: List[dict], tools_by_name: Optional[Dict[str, BaseTool]] = None,
+                       timeouts: Optional[Dict[str, float]] = None) -> List[ToolExecution]:
+    """
+    Executes the tool calls of one AIMessage concurrently on the shared thread pool.
+
+    A turn with several independent calls takes as long as its slowest call rather than the sum
+    of all calls. A call that exceeds its timeout is reported as an error (the worker thread is
+    left to finish in the background, since threads cannot be interrupted).
+
+    Args:
+        tool_calls (List[dict]): The tool calls from an AIMessage.
+        tools_by_name (Optional[Dict[str, BaseTool]]): Tool index to resolve names against.
+                                                       Defaults to all tools.
+        timeouts (Optional[Dict[str, float]]): Per-tool timeout overrides in seconds.
+
+    Returns:
+        List[ToolExecution]: One result per tool call, in the same order as 'tool_calls'.
+    """
+    index = TOOLS_BY_NAME if tools_by_name is None else tools_by_name
+    results: List[Optional[ToolExecution]] = [None] * len(tool_calls)
+    pending = []
+
+    for position, tool_call in enumerate(tool_calls):
+        executed_tool = index.get(tool_call['name'])
+        if executed_tool is None:
+            results[position] = _not_found(tool_call)
+            continue
+        started = time.perf_counter()
+        future = _tool_pool.submit(executed_tool.invoke, _as_tool_call(tool_call))
+        pending.append((position, tool_call, future, started))
+
+    for position, tool_call, future, started in pending:
+        # Each call gets its own deadline measured from submission, so waiting on one call
+        # does not eat into the budget of calls that were already running alongside it.
+        remaining = started + _timeout_for(tool_call['name'], timeouts) - time.perf_counter()
+        try:
+            message = future.result(timeout=max(remaining, 0))
+            results[position] = _success(tool_call, message, time.perf_counter() - started)
+        except FutureTimeoutError:
+            future.cancel()
+            results[position] = _failure(tool_call, f"Tool '{tool_call['name']}' timed out after "
+                                                    f"{_timeout_for(tool_call['name'], timeouts):g}s",
+                                         time.perf_counter() - started)
+        except Exception as e:
+            results[position] = _failure(tool_call, str(e), time.perf_counter() - started)
+
+    return results
+
+
+async def aexecute_tool_calls(tool_calls: List[dict], tools_by_name: Optional[Dict[str, BaseTool]] = None,
+                              timeouts: Optional[Dict[str, float]] = None) -> List[ToolExecution]:
+    """
+    Async variant of 'execute_tool_calls': runs the tool calls concurrently on the event loop
+    via 'ainvoke' (synchronous tools are run in the loop's default executor by LangChain) and
+    cancels calls that exceed their timeout.
+
+    Args:
+        tool_calls (List[dict]): The tool calls from an AIMessage.
+        tools_by_name (Optional[Dict[str, BaseTool]]): Tool index to resolve names against.
+                                                       Defaults to all tools.
+        timeouts (Optional[Dict[str, float]]): Per-tool timeout overrides in seconds.
+
+    Returns:
+        List[ToolExecution]: One result per tool call, in the same order as 'tool_calls'.
+    """
+    index = TOOLS_BY_NAME if tools_by_name is None else tools_by_name
+
+    async def run_one(tool_call: dict) -> ToolExecution:
+        executed_tool = index.get(tool_call['name'])
+        if executed_tool is None:
+            return _not_found(tool_call)
+        timeout = _timeout_for(tool_call['name'], timeouts)
+        started = time.perf_counter()
+        try:
+            message = await asyncio.wait_for(executed_tool.ainvoke(_as_tool_call(tool_call)), timeout=timeout)
+            return _success(tool_call, message, time.perf_counter() - started)
+        except asyncio.TimeoutError:
+            return _failure(tool_call, f"Tool '{tool_call['name']}' timed out after {timeout:g}s",
+                            time.perf_counter() - started)
+        except Exception as e:
+            return _failure(tool_call, str(e), time.perf_counter() - started)
+
+    # gather preserves the order of its arguments, so results line up with 'tool_calls'.
+    return list(await asyncio.gather(*(run_one(tool_call) for tool_call in tool_calls)))
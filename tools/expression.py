@@ -0,0 +1,258 @@
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+import ast
+import math
+import operator
+import time
+
+# --- Safe Expression Engine ---
+# Evaluates a complete arithmetic expression such as "(3+4)*5 - 2/7" or "mean(values) * 2" in a
+# single tool call, so multi-step math does not need one LLM round trip per operation. The
+# expression is parsed with 'ast' and only a whitelist of node types is interpreted: numbers,
+# arithmetic operators, list literals, named constants/variables and calls to whitelisted math
+# functions. There is no attribute access, subscripting, comprehension or call to arbitrary
+# Python, so evaluating untrusted input cannot reach the interpreter. Lists are evaluated as
+# NumPy arrays, so operations over thousands of values are vectorized. Every evaluation is bounded
+# in input size, AST size, array size, integer size and wall time; the size of an array result is
+# checked from the operands' shapes before it is allocated.
+
+
+class ExpressionError(ValueError):
+    """Raised for expressions that are invalid, unsupported or exceed the evaluation limits."""
+
+
+@dataclass
+class ExpressionLimits:
+    """Upper bounds applied to every evaluation."""
+    max_chars: int = 20_000
+    """Maximum length of the expression text."""
+    max_nodes: int = 10_000
+    """Maximum number of AST nodes in the parsed expression."""
+    max_elements: int = 1_000_000
+    """Maximum number of elements of any array (input values or intermediate results)."""
+    max_int_bits: int = 4_096
+    """Maximum size of an exact integer result; larger powers must be computed in floating point."""
+    max_seconds: float = 1.0
+    """Wall-time budget, checked before every AST node is evaluated."""
+
+
+# Operators with NumPy-compatible semantics; scalars stay Python numbers (exact integers).
+_BINARY_OPERATORS: Dict[type, Callable[[Any, Any], Any]] = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: operator.pow,
+}
+_UNARY_OPERATORS: Dict[type, Callable[[Any], Any]] = {
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg,
+}
+# Common notations the LLM or the user may use, rewritten to Python operators before parsing.
+_NOTATION = {"^": "**", "×": "*", "÷": "/", "−": "-"}
+
+
+def _functions(np) -> Dict[str, Callable[..., Any]]:
+    # Whitelisted functions. Reductions accept one array or several scalars: 'max(values)' and
+    # 'max(3, 7)' both work.
+    def reduction(func: Callable[[Any], Any]) -> Callable[..., Any]:
+        def reduce(*args):
+            if not args:
+                raise ExpressionError(f"{func.__name__}() needs at least one argument")
+            return func(np.asarray(args[0] if len(args) == 1 else args, dtype=float))
+        return reduce
+
+    def rounded(value, decimals=0):
+        return np.round(value, int(decimals))
+
+    return {
+        # Element-wise
+        "abs": np.abs, "sqrt": np.sqrt, "exp": np.exp, "log": np.log, "log2": np.log2, "log10": np.log10,
+        "sin": np.sin, "cos": np.cos, "tan": np.tan, "asin": np.arcsin, "acos": np.arccos, "atan": np.arctan,
+        "floor": np.floor, "ceil": np.ceil, "round": rounded, "radians": np.radians, "degrees": np.degrees,
+        # Reductions
+        "sum": reduction(np.sum), "mean": reduction(np.mean), "median": reduction(np.median),
+        "std": reduction(np.std), "var": reduction(np.var), "min": reduction(np.min), "max": reduction(np.max),
+        "prod": reduction(np.prod), "len": lambda value: int(np.size(value)),
+        # Array operations
+        "cumsum": np.cumsum, "sort": np.sort, "diff": np.diff,
+        "percentile": lambda value, q: np.percentile(np.asarray(value, dtype=float), q),
+    }
+
+
+class SafeExpressionEvaluator:
+    """
+    Evaluates arithmetic expressions over numbers and NumPy arrays within strict limits.
+    """
+
+    def __init__(self, limits: Optional[ExpressionLimits] = None):
+        """
+        Args:
+            limits (Optional[ExpressionLimits]): The evaluation limits (defaults to ExpressionLimits()).
+        """
+        self.limits = limits or ExpressionLimits()
+        self._np = None
+        self._functions: Dict[str, Callable[..., Any]] = {}
+
+    def _numpy(self):
+        # NumPy is imported on first evaluation rather than when the tools are loaded.
+        if self._np is None:
+            import numpy as np
+            # 'dot' is bound to the evaluator so its result size is checked before it is computed.
+            self._functions = {**_functions(np), "dot": self._dot}
+            self._np = np
+        return self._np
+
+    def evaluate(self, expression: str, variables: Optional[Dict[str, Any]] = None) -> Any:
+        """
+        Evaluates an expression.
+
+        Args:
+            expression (str): The expression, e.g. "(3+4)*5 - 2/7" or "sum(values) / len(values)".
+            variables (Optional[Dict[str, Any]]): Named numbers or lists of numbers the expression may
+                                                  refer to (lists become NumPy arrays).
+
+        Returns:
+            Any: An int or float for scalar results, or a NumPy array.
+
+        Raises:
+            ExpressionError: If the expression is invalid, unsupported or exceeds a limit.
+        """
+        np = self._numpy()
+        limits = self.limits
+        if len(expression) > limits.max_chars:
+            raise ExpressionError(f"Expression is longer than {limits.max_chars} characters")
+        for notation, python in _NOTATION.items():
+            expression = expression.replace(notation, python)
+        try:
+            tree = ast.parse(expression.strip(), mode="eval")
+        except SyntaxError as e:
+            raise ExpressionError(f"Invalid expression: {e.msg}") from None
+        except (RecursionError, MemoryError):
+            raise ExpressionError("Expression is nested too deeply") from None
+        node_count = sum(1 for _ in ast.walk(tree))
+        if node_count > limits.max_nodes:
+            raise ExpressionError(f"Expression has {node_count} nodes (limit {limits.max_nodes})")
+
+        names = {"pi": math.pi, "e": math.e, "tau": math.tau, "inf": math.inf}
+        for name, value in (variables or {}).items():
+            if isinstance(value, (list, tuple)):
+                names[name] = self._checked(np.asarray(value, dtype=float))
+            elif isinstance(value, (int, float)):
+                names[name] = self._checked(value)
+            else:
+                raise ExpressionError(f"Variable '{name}' must be a number or a list of numbers")
+
+        deadline = time.perf_counter() + limits.max_seconds
+        with np.errstate(all="ignore"): # Overflow and invalid operations on arrays yield inf/nan
+            try:
+                return self._eval(tree.body, names, deadline)
+            except ExpressionError:
+                raise
+            except ZeroDivisionError:
+                raise ExpressionError("Division by zero") from None
+            except RecursionError:
+                raise ExpressionError("Expression is nested too deeply") from None
+            except OverflowError:
+                raise ExpressionError("Result is too large for a float") from None
+            except (ArithmeticError, TypeError, ValueError) as e:
+                raise ExpressionError(str(e)) from None
+
+    def _checked(self, value: Any) -> Any:
+        # Enforces the size limits on every intermediate result.
+        if isinstance(value, bool):
+            raise ExpressionError("Boolean values are not supported")
+        if isinstance(value, (complex, self._np.complexfloating)):
+            raise ExpressionError("Result is a complex number (e.g., a fractional power of a negative number); "
+                                  "only real results are supported")
+        if isinstance(value, int) and value.bit_length() > self.limits.max_int_bits:
+            raise ExpressionError(f"Integer result exceeds {self.limits.max_int_bits} bits; use floats (e.g., 2.0 ** 1000)")
+        if isinstance(value, self._np.ndarray):
+            if value.size > self.limits.max_elements:
+                raise ExpressionError(f"Array of {value.size} elements exceeds the limit of {self.limits.max_elements}")
+            if value.dtype.kind == "c":
+                raise ExpressionError("Result contains complex numbers; only real results are supported")
+            if value.dtype.kind not in "biuf":
+                raise ExpressionError("Only numeric arrays are supported")
+        return value
+
+    def _check_size(self, shape: tuple) -> None:
+        # Bounds an array result by its shape before it is allocated: broadcasting two arrays that
+        # are each within the limit, e.g. (N, 1) * (1, N), can produce N² elements.
+        size = math.prod(shape)
+        if size > self.limits.max_elements:
+            raise ExpressionError(f"Array of {size} elements exceeds the limit of {self.limits.max_elements}")
+
+    def _check_broadcast(self, left: Any, right: Any) -> None:
+        np = self._np
+        try:
+            shape = np.broadcast_shapes(np.shape(left), np.shape(right))
+        except ValueError:
+            return # Incompatible shapes; the operator raises the error
+        self._check_size(shape)
+
+    def _dot(self, left: Any, right: Any) -> Any:
+        np = self._np
+        a, b = np.shape(left), np.shape(right)
+        if not a or not b:
+            self._check_size(a or b)
+        elif a[-1] == b[0 if len(b) == 1 else -2]:
+            self._check_size(a[:-1] + b[:-2] + b[-1:] if len(b) > 1 else a[:-1])
+        return np.dot(left, right)
+
+    def _power(self, base: Any, exponent: Any) -> Any:
+        # Exact integer powers are bounded before computing them, so '9 ** 9 ** 9' fails fast.
+        if isinstance(base, int) and isinstance(exponent, int) and exponent > 0 and abs(base) > 1:
+            if (abs(base).bit_length() - 1) * exponent > self.limits.max_int_bits:
+                raise ExpressionError(f"Integer result exceeds {self.limits.max_int_bits} bits; "
+                                      "use floats (e.g., 2.0 ** 1000)")
+        return base ** exponent
+
+    def _eval(self, node: ast.AST, names: Dict[str, Any], deadline: float) -> Any:
+        if time.perf_counter() > deadline:
+            raise ExpressionError(f"Evaluation exceeded {self.limits.max_seconds:g}s")
+
+        if isinstance(node, ast.Constant):
+            if isinstance(node.value, (int, float)) and not isinstance(node.value, bool):
+                return self._checked(node.value)
+            raise ExpressionError(f"Unsupported constant: {node.value!r}")
+
+        if isinstance(node, ast.Name):
+            if node.id not in names:
+                raise ExpressionError(f"Unknown name: '{node.id}'")
+            return names[node.id]
+
+        if isinstance(node, ast.BinOp) and type(node.op) in _BINARY_OPERATORS:
+            left = self._eval(node.left, names, deadline)
+            right = self._eval(node.right, names, deadline)
+            self._check_broadcast(left, right)
+            if isinstance(node.op, ast.Pow):
+                return self._checked(self._power(left, right))
+            return self._checked(_BINARY_OPERATORS[type(node.op)](left, right))
+
+        if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY_OPERATORS:
+            return _UNARY_OPERATORS[type(node.op)](self._eval(node.operand, names, deadline))
+
+        if isinstance(node, (ast.List, ast.Tuple)):
+            items = [self._eval(item, names, deadline) for item in node.elts]
+            self._check_size((sum(self._np.size(item) for item in items),))
+            return self._checked(self._np.asarray(items, dtype=float))
+
+        if isinstance(node, ast.Call):
+            if not isinstance(node.func, ast.Name) or node.func.id not in self._functions:
+                name = node.func.id if isinstance(node.func, ast.Name) else ast.unparse(node.func)
+                raise ExpressionError(f"Unsupported function: '{name}' (available: {', '.join(sorted(self._functions))})")
+            if node.keywords:
+                raise ExpressionError("Keyword arguments are not supported")
+            args = [self._eval(arg, names, deadline) for arg in node.args]
+            result = self._functions[node.func.id](*args)
+            # NumPy scalars are returned as Python numbers.
+            return self._checked(result.item() if isinstance(result, self._np.generic) else result)
+
+        raise ExpressionError(f"Unsupported syntax: {type(node).__name__}")
+
+
+# Shared evaluator used by the 'evaluate_expression' tool.
+expression_evaluator = SafeExpressionEvaluator()
@@ -0,0 +1,241 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple, Union
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+# --- Per-Ticker News Cache ---
+# Popular tickers are requested again and again within seconds. The cache keeps the most recent
+# articles for each ticker and serves them according to their age:
+#   - fresh   (age < ttl):                  served from memory
+#   - stale   (ttl <= age < ttl+stale_ttl): served immediately while a background refresh runs
+#   - expired (older, or never fetched):    fetched synchronously
+# Concurrent misses for the same ticker share a single fetch (single-flight), and entries can
+# optionally be written through to a sqlite file so they survive process restarts.
+
+# A fetcher returns the articles for a ticker and raises on failure (failures are never cached).
+NewsFetcher = Callable[[str], List[Dict[str, str]]]
+
+
+def article_fingerprint(article: Dict[str, str]) -> str:
+    """
+    Computes a stable fingerprint for a news article from its normalized title and summary,
+    so the same story syndicated under several tickers (or fetched twice) can be recognized.
+
+    Args:
+        article (Dict[str, str]): The article with 'title' and 'summary' keys.
+
+    Returns:
+        str: A short hex digest identifying the article.
+    """
+    title = " ".join(str(article.get('title', '')).lower().split())
+    summary = " ".join(str(article.get('summary', '')).lower().split())
+    return hashlib.sha1(f"{title}\n{summary}".encode("utf-8")).hexdigest()[:16]
+
+
+@dataclass
+class NewsCacheStats:
+    """Counters describing how requests were served."""
+    hits: int = 0
+    stale_hits: int = 0
+    misses: int = 0
+    disk_hits: int = 0
+    refreshes: int = 0
+    errors: int = 0
+
+    def as_dict(self) -> dict:
+        return dict(self.__dict__)
+
+
+class NewsCache:
+    """
+    TTL cache with stale-while-revalidate and single-flight fetching for stock news.
+    """
+
+    def __init__(self, fetcher: NewsFetcher, ttl: float = 300.0, stale_ttl: float = 1800.0,
+                 db_path: Optional[str] = None, max_refresh_workers: int = 4,
+                 max_batch_workers: int = 8, clock: Callable[[], float] = time.time):
+        """
+        Args:
+            fetcher (NewsFetcher): Function fetching the articles for a ticker (e.g., via yfinance).
+            ttl (float): Seconds an entry is considered fresh.
+            stale_ttl (float): Additional seconds a stale entry may still be served while refreshing.
+            db_path (Optional[str]): Path of an optional sqlite file that persists entries across restarts.
+            max_refresh_workers (int): Maximum number of concurrent background refreshes.
+            max_batch_workers (int): Maximum number of concurrent fetches in 'get_many'.
+            clock (Callable[[], float]): Time source, replaceable for deterministic tests.
+        """
+        self.fetcher = fetcher
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.clock = clock
+        self.stats = NewsCacheStats()
+        self._entries: Dict[str, Tuple[float, List[Dict[str, str]]]] = {}
+        self._in_flight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._refresh_pool = ThreadPoolExecutor(max_workers=max_refresh_workers, thread_name_prefix="news-refresh")
+        self._batch_pool = ThreadPoolExecutor(max_workers=max_batch_workers, thread_name_prefix="news-batch")
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        if db_path:
+            self.enable_persistence(db_path)
+
+    # --- Persistence ---
+
+    def enable_persistence(self, db_path: str) -> None:
+        """
+        Writes entries through to a sqlite file and reads them back on a memory miss.
+
+        Args:
+            db_path (str): Path of the sqlite file (created if missing).
+        """
+        connection = sqlite3.connect(db_path, check_same_thread=False)
+        connection.execute("CREATE TABLE IF NOT EXISTS news (ticker TEXT PRIMARY KEY, fetched_at REAL, articles TEXT)")
+        connection.commit()
+        with self._db_lock:
+            self._db = connection
+
+    def _load(self, key: str) -> Optional[Tuple[float, List[Dict[str, str]]]]:
+        if self._db is None:
+            return None
+        with self._db_lock:
+            row = self._db.execute("SELECT fetched_at, articles FROM news WHERE ticker = ?", (key,)).fetchone()
+        return (row[0], json.loads(row[1])) if row else None
+
+    def _store(self, key: str, fetched_at: float, articles: List[Dict[str, str]]) -> None:
+        if self._db is None:
+            return
+        with self._db_lock:
+            self._db.execute("INSERT OR REPLACE INTO news (ticker, fetched_at, articles) VALUES (?, ?, ?)",
+                             (key, fetched_at, json.dumps(articles)))
+            self._db.commit()
+
+    # --- Fetching ---
+
+    def _fetch(self, key: str) -> List[Dict[str, str]]:
+        """
+        Fetches a ticker, sharing the fetch with any concurrent caller for the same ticker.
+        """
+        with self._lock:
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = self._in_flight[key] = Future()
+
+        if not owner:
+            # Another caller is already fetching this ticker; wait for its result.
+            return future.result()
+
+        try:
+            articles = self.fetcher(key)
+            fetched_at = self.clock()
+            with self._lock:
+                self._entries[key] = (fetched_at, articles)
+            self._store(key, fetched_at, articles)
+            future.set_result(articles)
+            return articles
+        except Exception as e:
+            with self._lock:
+                self.stats.errors += 1
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    def _refresh_in_background(self, key: str) -> None:
+        with self._lock:
+            if key in self._in_flight:
+                return # A refresh (or synchronous fetch) is already running
+            self.stats.refreshes += 1
+
+        def refresh():
+            try:
+                self._fetch(key)
+            except Exception:
+                pass # The stale entry keeps being served; the error is counted in stats
+
+        self._refresh_pool.submit(refresh)
+
+    def get(self, ticker: str) -> List[Dict[str, str]]:
+        """
+        Returns the articles for a ticker, fetching them only when necessary.
+
+        Args:
+            ticker (str): The stock ticker symbol (case-insensitive).
+
+        Returns:
+            List[Dict[str, str]]: The cached or freshly fetched articles.
+
+        Raises:
+            Exception: Whatever the fetcher raised, if no usable entry was available.
+        """
+        key = ticker.strip().upper()
+        now = self.clock()
+
+        with self._lock:
+            entry = self._entries.get(key)
+
+        if entry is None:
+            entry = self._load(key)
+            if entry is not None:
+                with self._lock:
+                    self._entries.setdefault(key, entry)
+                    self.stats.disk_hits += 1
+
+        if entry is not None:
+            fetched_at, articles = entry
+            age = now - fetched_at
+            if age < self.ttl:
+                with self._lock:
+                    self.stats.hits += 1
+                return articles
+            if age < self.ttl + self.stale_ttl:
+                with self._lock:
+                    self.stats.stale_hits += 1
+                self._refresh_in_background(key)
+                return articles
+
+        with self._lock:
+            self.stats.misses += 1
+        return self._fetch(key)
+
+    def get_many(self, tickers: List[str]) -> Dict[str, Union[List[Dict[str, str]], Exception]]:
+        """
+        Returns the articles for several tickers, fetching the missing ones concurrently, so an
+        N-ticker lookup takes about as long as the slowest single fetch.
+
+        Args:
+            tickers (List[str]): The stock ticker symbols (case-insensitive, duplicates ignored).
+
+        Returns:
+            Dict[str, Union[List[Dict[str, str]], Exception]]: The articles per (uppercased) ticker in
+            request order, or the exception raised while fetching that ticker.
+        """
+        keys = list(dict.fromkeys(ticker.strip().upper() for ticker in tickers if ticker and ticker.strip()))
+        futures = {key: self._batch_pool.submit(self.get, key) for key in keys}
+        results: Dict[str, Union[List[Dict[str, str]], Exception]] = {}
+        for key, future in futures.items():
+            try:
+                results[key] = future.result()
+            except Exception as e:
+                results[key] = e
+        return results
+
+    def invalidate(self, ticker: Optional[str] = None) -> None:
+        """Drops one ticker's entry, or all entries if no ticker is given (memory and disk)."""
+        with self._lock:
+            if ticker is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(ticker.strip().upper(), None)
+        if self._db is not None:
+            with self._db_lock:
+                if ticker is None:
+                    self._db.execute("DELETE FROM news")
+                else:
+                    self._db.execute("DELETE FROM news WHERE ticker = ?", (ticker.strip().upper(),))
+                self._db.commit()
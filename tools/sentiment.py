@@ -0,0 +1,205 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+import re
+import threading
+
+from tools.news_cache import article_fingerprint
+
+# --- Local News Sentiment ---
+# Scores news articles with a finance-oriented word lexicon instead of an LLM. All articles of a
+# request that have not been scored before are tokenized once and scored together with NumPy:
+# every token is mapped to its lexicon weight, a weight is flipped when one of the two preceding
+# tokens negates it ("not profitable"), and the weights are summed per article with a single
+# 'bincount'. The sum is squashed into [-1, 1] (s / sqrt(s^2 + alpha), as in VADER).
+# Scores are cached by article fingerprint, so an article syndicated under several tickers or
+# fetched again a minute later is never rescored.
+
+# Word -> weight. Positive weights indicate good news for the stock, negative ones bad news.
+LEXICON: Dict[str, float] = {
+    # Strongly positive
+    "surge": 3.0, "surges": 3.0, "surged": 3.0, "soar": 3.0, "soars": 3.0, "soared": 3.0, "skyrocket": 3.0,
+    "record": 2.0, "beat": 2.5, "beats": 2.5, "outperform": 2.5, "outperforms": 2.5, "outperformed": 2.5,
+    "upgrade": 2.5, "upgraded": 2.5, "upgrades": 2.5, "breakthrough": 2.5, "blowout": 2.5, "rally": 2.5,
+    "rallies": 2.5, "rallied": 2.5, "bullish": 2.5, "boom": 2.5, "booming": 2.5, "strong": 2.0, "stronger": 2.0,
+    # Positive
+    "gain": 1.5, "gains": 1.5, "gained": 1.5, "rise": 1.5, "rises": 1.5, "rose": 1.5, "rising": 1.5, "jump": 2.0,
+    "jumps": 2.0, "jumped": 2.0, "climb": 1.5, "climbs": 1.5, "climbed": 1.5, "growth": 1.5, "grow": 1.5,
+    "grows": 1.5, "grew": 1.5, "profit": 1.5, "profits": 1.5, "profitable": 1.5, "profitability": 1.5,
+    "expand": 1.0, "expands": 1.0, "expansion": 1.0, "improve": 1.5, "improves": 1.5, "improved": 1.5,
+    "improvement": 1.5, "optimistic": 2.0, "optimism": 2.0, "positive": 1.5, "success": 2.0, "successful": 2.0,
+    "win": 2.0, "wins": 2.0, "won": 2.0, "innovative": 1.5, "innovation": 1.0, "demand": 0.5, "buy": 1.0,
+    "recovery": 1.5, "recover": 1.5, "recovers": 1.5, "rebound": 1.5, "rebounds": 1.5, "exceed": 2.0,
+    "exceeds": 2.0, "exceeded": 2.0, "upside": 1.5, "dividend": 1.0, "buyback": 1.5, "partnership": 1.0,
+    "approval": 1.5, "approved": 1.5, "launch": 0.5, "launches": 0.5, "robust": 1.5, "solid": 1.0,
+    "momentum": 1.0, "accelerate": 1.0, "accelerating": 1.0, "higher": 1.0, "high": 0.5, "top": 0.5,
+    "opportunity": 1.0, "opportunities": 1.0, "confident": 1.5, "confidence": 1.0, "leading": 1.0, "leader": 1.0,
+    # Negative
+    "fall": -1.5, "falls": -1.5, "fell": -1.5, "falling": -1.5, "drop": -1.5, "drops": -1.5, "dropped": -1.5,
+    "decline": -1.5, "declines": -1.5, "declined": -1.5, "declining": -1.5, "loss": -2.0, "losses": -2.0,
+    "lose": -1.5, "loses": -1.5, "lost": -1.5, "weak": -2.0, "weaker": -2.0, "weakness": -2.0, "miss": -2.0,
+    "misses": -2.0, "missed": -2.0, "lower": -1.0, "low": -0.5, "cut": -1.5, "cuts": -1.5, "slow": -1.0,
+    "slows": -1.0, "slowdown": -1.5, "slowing": -1.0, "risk": -1.0, "risks": -1.0, "risky": -1.5,
+    "concern": -1.5, "concerns": -1.5, "worried": -1.5, "worry": -1.5, "worries": -1.5, "uncertain": -1.0,
+    "uncertainty": -1.0, "volatile": -1.0, "volatility": -1.0, "pressure": -1.0, "pressures": -1.0,
+    "decrease": -1.5, "decreased": -1.5, "sell": -1.0, "selloff": -2.5, "bearish": -2.5, "negative": -1.5,
+    "layoff": -2.0, "layoffs": -2.0, "lawsuit": -2.0, "lawsuits": -2.0, "probe": -1.5, "investigation": -1.5,
+    "fine": -0.5, "fined": -2.0, "penalty": -2.0, "recall": -2.0, "recalls": -2.0, "delay": -1.5,
+    "delays": -1.5, "delayed": -1.5, "warning": -2.0, "warns": -2.0, "warned": -2.0, "headwind": -1.5,
+    "headwinds": -1.5, "shortfall": -2.0, "debt": -0.5, "tariff": -1.0, "tariffs": -1.0, "ban": -1.5,
+    "banned": -1.5, "dispute": -1.0, "fail": -2.0, "fails": -2.0, "failed": -2.0, "failure": -2.0,
+    # Strongly negative
+    "plunge": -3.0, "plunges": -3.0, "plunged": -3.0, "plummet": -3.0, "plummets": -3.0, "plummeted": -3.0,
+    "crash": -3.0, "crashes": -3.0, "crashed": -3.0, "tumble": -2.5, "tumbles": -2.5, "tumbled": -2.5,
+    "slump": -2.5, "slumps": -2.5, "slumped": -2.5, "downgrade": -2.5, "downgraded": -2.5, "downgrades": -2.5,
+    "bankruptcy": -3.0, "bankrupt": -3.0, "fraud": -3.0, "scandal": -3.0, "default": -2.5, "crisis": -2.5,
+    "underperform": -2.5, "underperforms": -2.5, "underperformed": -2.5, "collapse": -3.0, "collapsed": -3.0,
+}
+# Tokens that flip the weight of the (up to two) following tokens.
+NEGATIONS = frozenset({"not", "no", "never", "without", "hardly", "barely", "nor", "cannot", "neither"})
+# Scores within (-NEUTRAL_BAND, NEUTRAL_BAND) are labeled 'neutral'.
+NEUTRAL_BAND = 0.05
+
+_TOKEN = re.compile(r"[a-z]+(?:'[a-z]+)?")
+
+
+@dataclass
+class SentimentCacheStats:
+    """Counters describing how article scores were obtained."""
+    hits: int = 0
+    scored: int = 0
+    batches: int = 0
+
+    def as_dict(self) -> dict:
+        return dict(self.__dict__)
+
+
+def label(score: float) -> str:
+    """Maps a score in [-1, 1] to 'positive', 'negative' or 'neutral'."""
+    if score >= NEUTRAL_BAND:
+        return "positive"
+    if score <= -NEUTRAL_BAND:
+        return "negative"
+    return "neutral"
+
+
+def summarize(scores: List[float]) -> dict:
+    """
+    Summarizes article scores.
+
+    Returns:
+        dict: The mean 'score' (rounded to 3 decimals), its 'label', the number of 'articles' and
+              the number of 'positive', 'negative' and 'neutral' ones.
+    """
+    labels = [label(score) for score in scores]
+    mean = sum(scores) / len(scores) if scores else 0.0
+    return {
+        "score": round(mean, 3),
+        "label": label(mean),
+        "articles": len(scores),
+        "positive": labels.count("positive"),
+        "negative": labels.count("negative"),
+        "neutral": labels.count("neutral"),
+    }
+
+
+class SentimentScorer:
+    """
+    Lexicon-based sentiment scorer, vectorized over a batch of articles, with a per-article cache.
+    """
+
+    def __init__(self, lexicon: Optional[Dict[str, float]] = None, alpha: float = 15.0, max_entries: int = 50_000):
+        """
+        Args:
+            lexicon (Optional[Dict[str, float]]): Word -> weight (defaults to LEXICON).
+            alpha (float): Normalization constant; larger values need more sentiment words for a strong score.
+            max_entries (int): Maximum number of cached article scores (least recently used are evicted).
+        """
+        self.lexicon = dict(LEXICON if lexicon is None else lexicon)
+        self.alpha = alpha
+        self.max_entries = max_entries
+        self.stats = SentimentCacheStats()
+        self._scores: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._weights = None # NumPy array of lexicon weights, built on first use
+
+    def _vocabulary(self):
+        # Index 0 is reserved for tokens outside the lexicon (weight 0).
+        import numpy as np
+        if self._weights is None:
+            self._index = {word: i for i, word in enumerate(self.lexicon, start=1)}
+            self._weights = np.array([0.0, *self.lexicon.values()])
+        return np, self._index, self._weights
+
+    def score_texts(self, texts: List[str]) -> List[float]:
+        """
+        Scores a batch of texts in one vectorized pass (no caching).
+
+        Returns:
+            List[float]: One score in [-1, 1] per text.
+        """
+        if not texts:
+            return []
+        np, index, weights = self._vocabulary()
+        token_ids: List[int] = []
+        negators: List[bool] = []
+        owners: List[int] = []
+        for position, text in enumerate(texts):
+            tokens = _TOKEN.findall(text.lower())
+            token_ids.extend(index.get(token, 0) for token in tokens)
+            negators.extend(token in NEGATIONS or token.endswith("n't") for token in tokens)
+            owners.extend([position] * len(tokens))
+        ids = np.asarray(token_ids, dtype=np.int64)
+        owner = np.asarray(owners, dtype=np.int64)
+        negator = np.asarray(negators, dtype=bool)
+
+        # A token is negated when one of the two preceding tokens of the same text is a negator.
+        negated = np.zeros(len(ids), dtype=bool)
+        for shift in (1, 2):
+            if len(ids) > shift:
+                negated[shift:] |= negator[:-shift] & (owner[shift:] == owner[:-shift])
+        token_weights = np.where(negated, -weights[ids], weights[ids])
+        sums = np.bincount(owner, weights=token_weights, minlength=len(texts))
+        return (sums / np.sqrt(sums * sums + self.alpha)).tolist()
+
+    def score_articles(self, articles: List[Dict[str, str]]) -> List[float]:
+        """
+        Scores articles (title and summary), reusing cached scores by article fingerprint.
+
+        Args:
+            articles (List[Dict[str, str]]): Articles with 'title' and 'summary' keys.
+
+        Returns:
+            List[float]: One score in [-1, 1] per article, in input order.
+        """
+        fingerprints = [article_fingerprint(article) for article in articles]
+        scores: Dict[str, float] = {}
+        with self._lock:
+            for fingerprint in fingerprints:
+                if fingerprint in self._scores and fingerprint not in scores:
+                    self._scores.move_to_end(fingerprint)
+                    scores[fingerprint] = self._scores[fingerprint]
+                    self.stats.hits += 1
+
+        # Articles not seen before (each fingerprint once, even if repeated in this batch).
+        pending = {fingerprint: article for fingerprint, article in zip(fingerprints, articles) if fingerprint not in scores}
+        if pending:
+            texts = [f"{article.get('title', '')}. {article.get('summary', '')}" for article in pending.values()]
+            new_scores = dict(zip(pending, self.score_texts(texts)))
+            scores.update(new_scores)
+            with self._lock:
+                self.stats.scored += len(new_scores)
+                self.stats.batches += 1
+                self._scores.update(new_scores)
+                while len(self._scores) > self.max_entries:
+                    self._scores.popitem(last=False)
+        return [scores[fingerprint] for fingerprint in fingerprints]
+
+    def clear(self) -> None:
+        """Drops all cached scores."""
+        with self._lock:
+            self._scores.clear()
+
+
+# Shared scorer used by the stock news agent.
+sentiment_scorer = SentimentScorer()
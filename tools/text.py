@@ -0,0 +1,215 @@
+from collections import Counter
+from typing import Dict, Iterator, List, Optional
+import re
+
+# --- Local Text Engine ---
+# Text operations that need no LLM: statistics, regex extraction, de-duplication, keywords and
+# extractive summaries. They run in linear time over the text (with precompiled patterns), so
+# even long documents are processed in milliseconds instead of being sent to the model.
+# 'chunk_text' splits long documents lazily at paragraph or sentence boundaries for the map-reduce
+# summarization in 'agents/map_reduce.py'.
+
+# Built-in extraction patterns, by name.
+PATTERNS: Dict[str, re.Pattern] = {
+    "emails": re.compile(r"\b[\w.+-]+@[\w-]+(?:\.[\w-]+)+\b"),
+    "urls": re.compile(r"\bhttps?://[^\s<>\"')\]]+"),
+    "phones": re.compile(r"(?<![\w+])\+?\d[\d ()./-]{6,}\d\b"),
+    "dates": re.compile(r"\b(?:\d{4}-\d{2}-\d{2}|\d{1,2}[/.]\d{1,2}[/.]\d{2,4}|"
+                        r"\d{1,2} (?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]* \d{4}|"
+                        r"(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]* \d{1,2},? \d{4})\b"),
+    "numbers": re.compile(r"(?<![\w.])[-+]?\d+(?:[.,]\d+)*(?:%|\b)"),
+    "hashtags": re.compile(r"(?<!\w)#\w+"),
+    "mentions": re.compile(r"(?<![\w@])@\w+"),
+}
+
+_WORD = re.compile(r"[^\W\d_](?:[^\W_]|['-](?=[^\W_]))*")
+_SENTENCE_END = re.compile(r"(?<=[.!?])[\"')\]]*\s+(?=[\"'(\[]?[A-Z0-9])")
+_PARAGRAPH = re.compile(r"\n\s*\n")
+# Common English words that carry no topic; ignored by 'keywords' and 'extractive_summary'.
+STOPWORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been before being below
+between both but by can could did do does doing down during each even few for from further had has have
+having he her here hers herself him himself his how however i if in into is it its itself just like may
+me might more most must my myself new no nor not now of off on once one only or other our ours ourselves
+out over own same she should so some such than that the their theirs them themselves then there these
+they this those through to too two under until up upon us very was we were what when where which while
+who whom why will with within without would yet you your yours yourself yourselves
+""".split())
+
+
+def words(text: str) -> List[str]:
+    """Splits a text into words (letters with inner apostrophes or hyphens), lowercased."""
+    return [word.lower() for word in _WORD.findall(text)]
+
+
+def sentences(text: str) -> List[str]:
+    """Splits a text into sentences at '.', '!' or '?' followed by whitespace and a capital or digit."""
+    return [sentence.strip() for paragraph in _PARAGRAPH.split(text)
+            for sentence in _SENTENCE_END.split(paragraph) if sentence.strip()]
+
+
+def text_statistics(text: str, top: int = 10) -> dict:
+    """
+    Counts the characters, words, sentences, lines and paragraphs of a text.
+
+    Args:
+        text (str): The text.
+        top (int): Number of most frequent words to report (stopwords excluded).
+
+    Returns:
+        dict: The counts, the number of distinct words, the average word and sentence lengths and
+              the most frequent words.
+    """
+    all_words = words(text)
+    sentence_count = len(sentences(text))
+    counts = Counter(word for word in all_words if word not in STOPWORDS)
+    return {
+        "characters": len(text),
+        "words": len(all_words),
+        "unique_words": len(set(all_words)),
+        "sentences": sentence_count,
+        "lines": text.count("\n") + 1 if text else 0,
+        "paragraphs": len([p for p in _PARAGRAPH.split(text) if p.strip()]),
+        "avg_word_length": round(sum(map(len, all_words)) / len(all_words), 2) if all_words else 0.0,
+        "avg_sentence_words": round(len(all_words) / sentence_count, 2) if sentence_count else 0.0,
+        "top_words": counts.most_common(top),
+    }
+
+
+def extract(text: str, kind: str, limit: int = 100) -> List[str]:
+    """
+    Extracts the distinct matches of a built-in pattern, in order of first appearance.
+
+    Args:
+        text (str): The text.
+        kind (str): One of PATTERNS ('emails', 'urls', 'phones', 'dates', 'numbers', 'hashtags', 'mentions').
+        limit (int): Maximum number of matches returned.
+
+    Returns:
+        List[str]: The matches.
+
+    Raises:
+        ValueError: If the kind is unknown.
+    """
+    pattern = PATTERNS.get(kind)
+    if pattern is None:
+        raise ValueError(f"Unknown pattern '{kind}' (supported: {', '.join(PATTERNS)})")
+    matches: Dict[str, None] = {}
+    for match in pattern.finditer(text):
+        matches.setdefault(match.group(0).rstrip(".,;:"), None)
+        if len(matches) >= limit:
+            break
+    return list(matches)
+
+
+def deduplicate(text: str, unit: str = "lines") -> dict:
+    """
+    Removes repeated lines or sentences, keeping the first occurrence. Comparison ignores case and
+    surrounding whitespace.
+
+    Args:
+        text (str): The text.
+        unit (str): 'lines' or 'sentences'.
+
+    Returns:
+        dict: The de-duplicated 'text', and the number of units 'kept' and 'removed'.
+    """
+    parts = text.splitlines() if unit == "lines" else sentences(text)
+    seen = set()
+    kept = []
+    for part in parts:
+        key = " ".join(part.split()).lower()
+        if key and key in seen:
+            continue
+        seen.add(key)
+        kept.append(part)
+    return {"text": ("\n" if unit == "lines" else " ").join(kept), "kept": len(kept), "removed": len(parts) - len(kept)}
+
+
+def keywords(text: str, top: int = 10) -> List[str]:
+    """
+    Ranks the words and two-word phrases of a text by frequency, ignoring stopwords. A phrase is
+    reported instead of its words when it occurs at least twice.
+
+    Returns:
+        List[str]: The 'top' keywords, most frequent first.
+    """
+    unigrams: Counter = Counter()
+    bigrams: Counter = Counter()
+    for sentence in sentences(text):
+        tokens = [word for word in words(sentence) if len(word) > 2]
+        unigrams.update(word for word in tokens if word not in STOPWORDS)
+        bigrams.update(f"{a} {b}" for a, b in zip(tokens, tokens[1:]) if a not in STOPWORDS and b not in STOPWORDS)
+    # Two-word phrases count double, so a repeated phrase outranks its individual words.
+    scores = Counter({phrase: count * 2 for phrase, count in bigrams.items() if count >= 2})
+    covered = {word for phrase in scores for word in phrase.split()}
+    scores.update({word: count for word, count in unigrams.items() if word not in covered})
+    return [phrase for phrase, _ in scores.most_common(top)]
+
+
+def extractive_summary(text: str, max_sentences: int = 3) -> List[str]:
+    """
+    Picks the sentences that best cover the text's frequent words, in their original order.
+
+    Args:
+        text (str): The text.
+        max_sentences (int): Number of sentences to keep.
+
+    Returns:
+        List[str]: The selected sentences.
+    """
+    candidates = list(dict.fromkeys(sentences(text))) # Repeated sentences are candidates once
+    if len(candidates) <= max_sentences:
+        return candidates
+    frequencies = Counter(word for word in words(text) if word not in STOPWORDS)
+    if not frequencies:
+        return candidates[:max_sentences]
+    peak = frequencies.most_common(1)[0][1]
+
+    def score(sentence: str) -> float:
+        # Mean normalized frequency of the sentence's content words, so long sentences are not favored.
+        content = [word for word in words(sentence) if word not in STOPWORDS]
+        return sum(frequencies[word] for word in content) / (peak * len(content)) if content else 0.0
+
+    ranked = sorted(range(len(candidates)), key=lambda i: score(candidates[i]), reverse=True)[:max_sentences]
+    return [candidates[i] for i in sorted(ranked)]
+
+
+def chunk_text(text: str, max_chars: int = 6_000, overlap: int = 200) -> Iterator[str]:
+    """
+    Lazily splits a text into chunks of at most 'max_chars' characters. Chunks end at a paragraph
+    break, a sentence end or a space when one is found in the second half of the chunk, and each
+    chunk repeats the last 'overlap' characters of the previous one for context.
+
+    Args:
+        text (str): The text.
+        max_chars (int): Maximum chunk size.
+        overlap (int): Characters shared between consecutive chunks (must be below max_chars / 2).
+
+    Yields:
+        str: The chunks, in order.
+    """
+    start = 0
+    length = len(text)
+    while start < length:
+        end = min(start + max_chars, length)
+        if end < length:
+            window = text[start + max_chars // 2:end]
+            for separator in ("\n\n", ". ", "\n", " "):
+                cut = window.rfind(separator)
+                if cut != -1:
+                    end = start + max_chars // 2 + cut + len(separator)
+                    break
+        chunk = text[start:end].strip()
+        if chunk:
+            yield chunk
+        if end >= length:
+            break
+        start = max(end - overlap, start + 1)
+
+
+def preview(text: str, max_chars: Optional[int] = 2_000) -> str:
+    """Shortens a text for display, marking how much was cut."""
+    if max_chars is None or len(text) <= max_chars:
+        return text
+    return f"{text[:max_chars].rstrip()}\n... ({len(text) - max_chars} more characters)"
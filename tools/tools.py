@@ -1,7 +1,19 @@
 from langchain_core.tools import tool
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
+import json
+import logging
 import operator
-import yfinance as yf # Import yfinance for fetching stock data
+import os
+
+from tools.news_cache import NewsCache, article_fingerprint
+from tools.expression import expression_evaluator
+from tools.datasets import dataset_engine
+
+logger = logging.getLogger(__name__)
+
+# Freshness settings (in seconds) for the shared stock news cache.
+NEWS_CACHE_TTL = 300 # Articles younger than this are served from the cache
+NEWS_CACHE_STALE_TTL = 1800 # Older articles are served up to this much longer while refreshing in the background
 
 # --- Functions decorated with @tool ---
 # These functions are exposed to LLMs that have been bound to 'tools'.
@@ -24,7 +36,7 @@ def perform_calculation(a: float, b: float, operation: str) -> float:
     Raises:
         ValueError: If an unsupported operation is provided or division by zero is attempted.
     """
-    print(f"---Executing perform_calculation tool with {a} {operation} {b}---")
+    logger.info("---Executing perform_calculation tool with %s %s %s---", a, operation, b)
     if operation == 'add':
         return operator.add(a, b)
     elif operation == 'subtract':
@@ -39,8 +51,113 @@ def perform_calculation(a: float, b: float, operation: str) -> float:
         raise ValueError(f"Unsupported operation: {operation}")
 
 
-@tool
-def get_stock_news(ticker: str) -> List[Dict[str, str]]:
+# Number of elements of an array result shown to the LLM; the full result travels as the artifact.
+EXPRESSION_RESULT_PREVIEW = 20
+
+
+@tool(response_format="content_and_artifact")
+def evaluate_expression(expression: str, values: Optional[List[float]] = None) -> Tuple[str, Any]:
+    """
+    Evaluates a complete math expression in one call. Prefer this over several 'perform_calculation'
+    calls for anything beyond a single operation.
+
+    Supports + - * / // % ** (or ^), parentheses, the constants pi and e, list literals such as
+    [1, 2, 3] (evaluated element-wise) and the functions abs, sqrt, exp, log, log2, log10, sin, cos,
+    tan, asin, acos, atan, floor, ceil, round, radians, degrees, sum, mean, median, std, var, min,
+    max, prod, len, cumsum, sort, diff, dot and percentile.
+
+    Args:
+        expression (str): The expression, e.g. "(3+4)*5 - 2/7", "sqrt(2) * pi" or "sum(values) / len(values)".
+        values (Optional[List[float]]): A list of numbers the expression can refer to as 'values',
+                                        e.g. the numbers the user asked to sum or average.
+
+    Returns:
+        Tuple[str, Any]: The JSON text shown to the LLM, and the result attached to the ToolMessage as
+                         its artifact: a number, or a list of numbers for element-wise results.
+
+    Raises:
+        ExpressionError: If the expression is invalid, uses unsupported syntax or exceeds the size
+                         or time limits.
+    """
+    logger.info("---Executing evaluate_expression tool: %s---", expression)
+    result = expression_evaluator.evaluate(expression, {"values": values} if values is not None else None)
+    if not hasattr(result, "tolist"):
+        return json.dumps(result), result
+    result = result.tolist()
+    if isinstance(result, list) and len(result) > EXPRESSION_RESULT_PREVIEW:
+        # A long array is summarized for the LLM instead of sending every element back.
+        preview = json.dumps(result[:EXPRESSION_RESULT_PREVIEW])[:-1]
+        return f"{preview}, ...] ({len(result)} values)", result
+    return json.dumps(result), result
+
+
+def fetch_news_from_yfinance(ticker: str) -> List[Dict[str, str]]:
+    """
+    Fetches the latest news headlines and summaries for a given stock ticker from yfinance.
+    This is the uncached network call behind 'get_stock_news'.
+
+    Args:
+        ticker (str): The stock ticker symbol (e.g., "AAPL", "MSFT", "GOOG").
+
+    Returns:
+        List[Dict[str, str]]: A list of dictionaries with the 'title' and 'summary' of each article
+                               (empty if no news was found).
+
+    Raises:
+        Exception: Any error raised by yfinance while fetching the news.
+    """
+    logger.info("---Fetching news for ticker: %s using yfinance---", ticker)
+    # Imported on first fetch: yfinance (and pandas behind it) is slow to import and most
+    # requests never fetch news.
+    import yfinance as yf
+
+    # Create a Ticker object for the given stock symbol
+    stock = yf.Ticker(ticker)
+
+    # Fetch news articles associated with the stock
+    news_list = stock.news or []
+
+    extracted_news = []
+    for article in news_list:
+        # yfinance news structure varies; safely extract title and summary.
+        # Assuming 'title' and 'summary' are directly accessible or nested under 'content'
+        title = article.get('title', 'No Title Found')
+        summary = article.get('summary', 'No Summary Found')
+
+        # Some yfinance versions might nest 'title' and 'summary' under a 'content' key,
+        # so we'll add a fallback check if initial direct access fails.
+        if title == 'No Title Found' and 'content' in article and isinstance(article['content'], dict):
+            title = article['content'].get('title', 'No Title Found')
+        if summary == 'No Summary Found' and 'content' in article and isinstance(article['content'], dict):
+            summary = article['content'].get('summary', 'No Summary Found')
+
+        extracted_news.append({"title": title, "summary": summary})
+
+    return extracted_news
+
+
+def _with_content(result: Any) -> Tuple[str, Any]:
+    """
+    Pairs a structured tool result with its text form for tools using
+    response_format="content_and_artifact": the LLM sees the JSON text, while the result itself
+    travels on the ToolMessage's 'artifact' and never has to be parsed back from a string.
+    """
+    return json.dumps(result, ensure_ascii=False), result
+
+
+# Shared per-ticker news cache (TTL + stale-while-revalidate + single-flight).
+# Set the NEWS_CACHE_DB_PATH environment variable to persist entries in a sqlite file across restarts.
+# Tests and benchmarks can inject a fake fetcher via 'news_cache.fetcher = ...' to run offline.
+news_cache = NewsCache(
+    fetcher=fetch_news_from_yfinance,
+    ttl=NEWS_CACHE_TTL,
+    stale_ttl=NEWS_CACHE_STALE_TTL,
+    db_path=os.environ.get("NEWS_CACHE_DB_PATH"),
+)
+
+
+@tool(response_format="content_and_artifact")
+def get_stock_news(ticker: str) -> Tuple[str, List[Dict[str, str]]]:
     """
     Fetches the latest news headlines and summaries for a given stock ticker using yfinance.
 
@@ -48,45 +165,135 @@ def get_stock_news(ticker: str) -> List[Dict[str, str]]:
         ticker (str): The stock ticker symbol (e.g., "AAPL", "MSFT", "GOOG").
 
     Returns:
-        List[Dict[str, str]]: A list of dictionaries, where each dictionary contains
-                               'title' and 'summary' of a news article.
-                               Returns a list containing an error message string if fetching fails or no news is found.
+        Tuple[str, List[Dict[str, str]]]: The JSON text shown to the LLM, and the structured result
+                               attached to the ToolMessage as its artifact: a list of dictionaries, where
+                               each dictionary contains 'title' and 'summary' of a news article.
+                               The list contains an error message string if fetching fails or no news is found.
     """
-    print(f"---Executing get_stock_news tool for ticker: {ticker} using yfinance---")
+    logger.info("---Executing get_stock_news tool for ticker: %s---", ticker)
 
     try:
-        # Create a Ticker object for the given stock symbol
-        stock = yf.Ticker(ticker)
+        # Served from the news cache; yfinance is only called for missing or expired tickers.
+        articles = news_cache.get(ticker)
+
+        if not articles:
+            return _with_content([f"No recent news found for ticker {ticker.upper()}."])
 
-        # Fetch news articles associated with the stock
-        news_list = stock.news
+        # Return copies so callers cannot modify the cached articles.
+        return _with_content([dict(article) for article in articles])
+
+    except Exception as e:
+        logger.warning("---Error fetching news using yfinance: %s---", e)
+        return _with_content([f"Error fetching news for {ticker.upper()}: {e}"])
 
-        if not news_list:
-            return [f"No recent news found for ticker {ticker.upper()}."]
 
-        extracted_news = []
-        for article in news_list:
-            # yfinance news structure varies; safely extract title and summary.
-            # Assuming 'title' and 'summary' are directly accessible or nested under 'content'
-            title = article.get('title', 'No Title Found')
-            summary = article.get('summary', 'No Summary Found')
+def merge_ticker_news(news_by_ticker: Dict[str, List[Dict[str, str]]]) -> List[Dict[str, Any]]:
+    """
+    Merges per-ticker article lists into one list of unique articles. An article that appears
+    under several tickers (e.g., an industry story) is kept once and tagged with all its tickers.
 
-            # Some yfinance versions might nest 'title' and 'summary' under a 'content' key,
-            # so we'll add a fallback check if initial direct access fails.
-            if title == 'No Title Found' and 'content' in article and isinstance(article['content'], dict):
-                title = article['content'].get('title', 'No Title Found')
-            if summary == 'No Summary Found' and 'content' in article and isinstance(article['content'], dict):
-                summary = article['content'].get('summary', 'No Summary Found')
+    Args:
+        news_by_ticker (Dict[str, List[Dict[str, str]]]): Articles per ticker, in request order.
 
-            extracted_news.append({"title": title, "summary": summary})
+    Returns:
+        List[Dict[str, Any]]: Unique articles with 'title', 'summary' and 'tickers' keys.
+    """
+    unique_articles: Dict[str, Dict[str, Any]] = {}
+    for ticker, articles in news_by_ticker.items():
+        for article in articles:
+            merged = unique_articles.setdefault(article_fingerprint(article), {
+                "title": article.get('title', 'No Title Found'),
+                "summary": article.get('summary', 'No Summary Found'),
+                "tickers": [],
+            })
+            if ticker not in merged["tickers"]:
+                merged["tickers"].append(ticker)
+    return list(unique_articles.values())
 
-        return extracted_news
 
-    except Exception as e:
-        print(f"---Error fetching news using yfinance: {e}---")
-        return [f"Error fetching news for {ticker.upper()}: {e}"]
+@tool(response_format="content_and_artifact")
+def get_stock_news_batch(tickers: List[str]) -> Tuple[str, Dict[str, Any]]:
+    """
+    Fetches the latest news headlines and summaries for several stock tickers at once.
+    Use this instead of multiple 'get_stock_news' calls when the user asks about more than one ticker.
+
+    Args:
+        tickers (List[str]): The stock ticker symbols (e.g., ["AAPL", "MSFT", "NVDA"]).
+
+    Returns:
+        Tuple[str, Dict[str, Any]]: The JSON text shown to the LLM, and the structured result attached
+                        to the ToolMessage as its artifact, a dictionary with:
+                        'articles': a list of unique articles, each with 'title', 'summary' and the
+                                    'tickers' it relates to (articles shared across tickers appear once);
+                        'errors': a mapping of ticker to error message for tickers that could not be fetched
+                                  or have no recent news.
+    """
+    logger.info("---Executing get_stock_news_batch tool for tickers: %s---", tickers)
+
+    # All tickers are fetched concurrently through the news cache.
+    news_by_ticker: Dict[str, List[Dict[str, str]]] = {}
+    errors: Dict[str, str] = {}
+    for ticker, result in news_cache.get_many(tickers).items():
+        if isinstance(result, Exception):
+            logger.warning("---Error fetching news using yfinance: %s---", result)
+            errors[ticker] = f"Error fetching news for {ticker}: {result}"
+        elif not result:
+            errors[ticker] = f"No recent news found for ticker {ticker}."
+        else:
+            news_by_ticker[ticker] = result
+
+    return _with_content({"articles": merge_ticker_news(news_by_ticker), "errors": errors})
+
+
+@tool(response_format="content_and_artifact")
+def describe_dataset(path: str) -> Tuple[str, Dict[str, Any]]:
+    """
+    Describes a local CSV or Parquet file: its row count, columns and types, and summary statistics
+    (count, nulls, mean, std, min, max) of the numeric columns and the number of distinct values of
+    the other columns. Call this first to learn which columns a dataset has.
+
+    Args:
+        path (str): Path of the file, relative to the data directory (e.g., "sales/2024.parquet").
+
+    Returns:
+        Tuple[str, Dict[str, Any]]: The JSON text shown to the LLM, and the same profile attached to the
+                                    ToolMessage as its artifact.
+
+    Raises:
+        DatasetError: If the file is missing, outside the data directory or of an unsupported type.
+    """
+    logger.info("---Executing describe_dataset tool for: %s---", path)
+    # The file is scanned in chunks once; the profile is cached until the file changes.
+    return _with_content(dataset_engine.profile(path).as_dict())
+
+
+@tool(response_format="content_and_artifact")
+def aggregate_dataset(path: str, column: str, aggregation: str = "mean", group_by: Optional[List[str]] = None,
+                      limit: int = 20) -> Tuple[str, Dict[str, Any]]:
+    """
+    Aggregates a numeric column of a local CSV or Parquet file, optionally per group
+    (e.g., the total 'revenue' per 'region'). Works on files larger than memory.
+
+    Args:
+        path (str): Path of the file, relative to the data directory.
+        column (str): The numeric column to aggregate.
+        aggregation (str): One of 'count', 'sum', 'mean', 'min', 'max', 'std', 'var'.
+        group_by (Optional[List[str]]): Columns to group by (e.g., ["region"]); omit to aggregate the whole column.
+        limit (int): Maximum number of groups to return, largest values first (at most 100).
+
+    Returns:
+        Tuple[str, Dict[str, Any]]: The JSON text shown to the LLM, and the result attached to the
+                                    ToolMessage as its artifact: the 'value' for a whole column, or the
+                                    'top' groups with their values and row counts, the total number of
+                                    'groups' and whether the list was 'truncated'.
+
+    Raises:
+        DatasetError: If the file, the columns or the aggregation are invalid, or there are too many groups.
+    """
+    logger.info("---Executing aggregate_dataset tool: %s(%s) by %s in %s---", aggregation, column, group_by, path)
+    return _with_content(dataset_engine.aggregate(path, column, aggregation, group_by=group_by, limit=limit))
 
 
 # List of all tools available to the multi-agent system.
 # Agents whose LLMs are bound to 'tools' can invoke any function in this list.
-tools = [perform_calculation, get_stock_news]
\ No newline at end of file
+tools = [perform_calculation, evaluate_expression, get_stock_news, get_stock_news_batch, describe_dataset, aggregate_dataset]
\ No newline at end of file